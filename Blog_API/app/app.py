@@ -6,6 +6,7 @@ from flask_cors import CORS
 from flask_bcrypt import Bcrypt # IMPORTACIÓN
 from dotenv import load_dotenv
 from flask_jwt_extended import JWTManager
+from werkzeug.middleware.proxy_fix import ProxyFix
 
 load_dotenv()
 jwt = JWTManager()
@@ -17,13 +18,27 @@ from .models import db # Models usa 'db', que se inicializa aquí.
 # lo harán cuando se llamen sus métodos, momento en el cual la app ya debería estar configurada.
 
 from .routes import main_bp
+from .consultas import init_contador_consultas
+from .cache import init_cache
+from .cola_contacto import init_cola_contacto
+from .metricas import init_metricas
+from .perfilado import init_perfilado
+from .importacion import registrar_comandos
+from .serializacion import init_json
+from .pool_bd import opciones_engine, init_pool
+from .replicas import CABECERA_PRIMARIA, binds_replicas, init_replicas
+from .snapshot import init_snapshot
+from .cambios import init_cambios
+from .esquema import init_esquema
 # Puedes crear la instancia de bcrypt aquí
 bcrypt = Bcrypt()
 
 
 def create_app():
     current_app = Flask(__name__)
-    CORS(current_app, resources={r"/*": {"origins": "*"}})
+    # expose_headers permite al frontend leer el cursor de paginación de GET /entradas y el plazo
+    # de lectura desde la primaria tras escribir (replicas.py), que reenvía en sus peticiones
+    CORS(current_app, resources={r"/*": {"origins": "*"}}, expose_headers=['X-Next-Cursor', 'Link', CABECERA_PRIMARIA])
 
     database_uri = os.getenv('DATABASE_URI')
     if not database_uri:
@@ -32,16 +47,111 @@ def create_app():
     current_app.config['SQLALCHEMY_DATABASE_URI'] = database_uri
     current_app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     current_app.config['SQLALCHEMY_ECHO'] = False
+    # Pool de conexiones por proceso (cada worker de gunicorn tiene el suyo): DB_POOL_SIZE fijas
+    # más DB_MAX_OVERFLOW en ráfagas; una petición espera como mucho DB_POOL_TIMEOUT segundos.
+    # DB_POOL_RECYCLE debe quedar por debajo del wait_timeout de MySQL (y de proxies intermedios).
+    current_app.config['DB_POOL_SIZE'] = int(os.getenv('DB_POOL_SIZE', 10))
+    current_app.config['DB_MAX_OVERFLOW'] = int(os.getenv('DB_MAX_OVERFLOW', 20))
+    current_app.config['DB_POOL_TIMEOUT'] = int(os.getenv('DB_POOL_TIMEOUT', 10))
+    current_app.config['DB_POOL_RECYCLE'] = int(os.getenv('DB_POOL_RECYCLE', 280))
+    current_app.config['DB_POOL_PRE_PING'] = os.getenv('DB_POOL_PRE_PING', 'True').lower() == 'true'
+    current_app.config['SQLALCHEMY_ENGINE_OPTIONS'] = opciones_engine(current_app.config)
+    # Réplicas de lectura opcionales (URIs separadas por comas): las lecturas de GET van a ellas.
+    # Un cliente que acaba de escribir lee de la primaria durante REPLICA_STICKY_SECONDS; una réplica
+    # que falla queda fuera durante REPLICA_RETRY_SECONDS.
+    current_app.config['SQLALCHEMY_BINDS'] = binds_replicas(os.getenv('DATABASE_REPLICA_URIS'))
+    current_app.config['REPLICA_STICKY_SECONDS'] = int(os.getenv('REPLICA_STICKY_SECONDS', 5))
+    current_app.config['REPLICA_RETRY_SECONDS'] = int(os.getenv('REPLICA_RETRY_SECONDS', 30))
+    # Añade X-Query-Count a cada respuesta (útil en desarrollo para detectar N+1)
+    current_app.config['QUERY_COUNT_HEADER'] = os.getenv('QUERY_COUNT_HEADER', 'False').lower() == 'true'
+    # Caché de respuestas de las rutas públicas de lectura
+    current_app.config['RESPONSE_CACHE_ENABLED'] = os.getenv('RESPONSE_CACHE_ENABLED', 'True').lower() == 'true'
+    current_app.config['RESPONSE_CACHE_MAX_ENTRIES'] = int(os.getenv('RESPONSE_CACHE_MAX_ENTRIES', 512))
+    current_app.config['RESPONSE_CACHE_TTL'] = int(os.getenv('RESPONSE_CACHE_TTL', 60))
+    # 'memoria' (por proceso), 'sqlite' (compartida entre workers de una máquina) o 'redis'
+    current_app.config['CACHE_BACKEND'] = os.getenv('CACHE_BACKEND', 'memoria')
+    current_app.config['CACHE_SQLITE_PATH'] = os.getenv('CACHE_SQLITE_PATH', os.path.join(current_app.instance_path, 'cache_respuestas.sqlite3'))
+    current_app.config['CACHE_REDIS_URL'] = os.getenv('CACHE_REDIS_URL', 'redis://localhost:6379/0')
     # ... otras configuraciones de la app ...
     current_app.config['JWT_SECRET_KEY'] = os.getenv('JWT_SECRET_KEY') # Asegúrate de tener esto para JWT
+    # bcrypt: coste (los hashes con otro coste se regeneran en el siguiente login) y concurrencia máxima
+    current_app.config['BCRYPT_LOG_ROUNDS'] = int(os.getenv('BCRYPT_LOG_ROUNDS', 12))
+    current_app.config['BCRYPT_MAX_CONCURRENCY'] = int(os.getenv('BCRYPT_MAX_CONCURRENCY', 2))
+    current_app.config['BCRYPT_MAX_PENDING'] = int(os.getenv('BCRYPT_MAX_PENDING', 16))
+    # Segundos que una petición espera su hash antes de responder 503
+    current_app.config['BCRYPT_TIMEOUT'] = float(os.getenv('BCRYPT_TIMEOUT', 10))
+    # GET /metrics (Prometheus); METRICS_TOKEN opcional para exigir un Bearer al scraper
+    current_app.config['METRICS_ENABLED'] = os.getenv('METRICS_ENABLED', 'True').lower() == 'true'
+    current_app.config['METRICS_TOKEN'] = os.getenv('METRICS_TOKEN')
+    # Consultas de SLOW_QUERY_THRESHOLD_MS o más van al log (vacío = desactivado)
+    umbral_lentas = os.getenv('SLOW_QUERY_THRESHOLD_MS', '200')
+    current_app.config['SLOW_QUERY_THRESHOLD_MS'] = float(umbral_lentas) if umbral_lentas else None
+    current_app.config['SLOW_QUERY_LOG_SIZE'] = int(os.getenv('SLOW_QUERY_LOG_SIZE', 100))
+    # Perfilador bajo demanda (X-Perfil: 1 o ?_perfil=1, sólo administradores)
+    current_app.config['PROFILER_ENABLED'] = os.getenv('PROFILER_ENABLED', 'True').lower() == 'true'
+    current_app.config['PROFILE_DIR'] = os.getenv('PROFILE_DIR', os.path.join(current_app.instance_path, 'perfiles'))
+    current_app.config['PROFILE_MAX_FILES'] = int(os.getenv('PROFILE_MAX_FILES', 50))
+    # Cola write-behind de /mensajecontacto: spool SQLite local, volcado en lotes a mensajes_contacto
+    current_app.config['CONTACT_QUEUE_ENABLED'] = os.getenv('CONTACT_QUEUE_ENABLED', 'True').lower() == 'true'
+    current_app.config['CONTACT_QUEUE_PATH'] = os.getenv('CONTACT_QUEUE_PATH', os.path.join(current_app.instance_path, 'cola_contacto.sqlite3'))
+    current_app.config['CONTACT_QUEUE_MAX_PENDING'] = int(os.getenv('CONTACT_QUEUE_MAX_PENDING', 10000))
+    current_app.config['CONTACT_FLUSH_BATCH'] = int(os.getenv('CONTACT_FLUSH_BATCH', 500))
+    current_app.config['CONTACT_FLUSH_INTERVAL'] = float(os.getenv('CONTACT_FLUSH_INTERVAL', 1.0))
+    # Por IP: ráfaga de CONTACT_RATE_BURST mensajes y recarga de CONTACT_RATE_PER_MINUTE por minuto
+    current_app.config['CONTACT_RATE_BURST'] = int(os.getenv('CONTACT_RATE_BURST', 5))
+    current_app.config['CONTACT_RATE_PER_MINUTE'] = float(os.getenv('CONTACT_RATE_PER_MINUTE', 2))
+    # Proxies (nginx, balanceador) delante de la app: con PROXY_FIX_HOPS > 0 la IP del cliente sale de
+    # X-Forwarded-For; con 0 se usa la de la conexión (la cabecera la puede falsear cualquiera)
+    current_app.config['PROXY_FIX_HOPS'] = int(os.getenv('PROXY_FIX_HOPS', 0))
+    current_app.config['CONTACT_DEDUP_WINDOW'] = int(os.getenv('CONTACT_DEDUP_WINDOW', 3600))
+    # orjson (si está instalado) para codificar las respuestas JSON; con False, el módulo json estándar
+    current_app.config['FAST_JSON_ENABLED'] = os.getenv('FAST_JSON_ENABLED', 'True').lower() == 'true'
+    # Instantánea estática del contenido publicado (flask generar-snapshot). Con SNAPSHOT_DIR configurado
+    # los cambios en entradas se anotan en SNAPSHOT_JOURNAL_PATH para la regeneración incremental.
+    current_app.config['SNAPSHOT_DIR'] = os.getenv('SNAPSHOT_DIR')
+    current_app.config['SNAPSHOT_JOURNAL_PATH'] = os.getenv('SNAPSHOT_JOURNAL_PATH', os.path.join(current_app.instance_path, 'snapshot_pendientes.ndjson'))
+    current_app.config['SNAPSHOT_BASE_URL'] = os.getenv('SNAPSHOT_BASE_URL', '')
+    current_app.config['SNAPSHOT_TITLE'] = os.getenv('SNAPSHOT_TITLE', 'Blog')
+    current_app.config['SNAPSHOT_LATEST_COUNT'] = int(os.getenv('SNAPSHOT_LATEST_COUNT', 20))
+    # GET /entradas/cambios sólo entrega cambios con más de estos segundos de antigüedad, para no
+    # adelantar el token a transacciones con fecha anterior que aún no han confirmado
+    current_app.config['CHANGES_FEED_LAG_SECONDS'] = int(os.getenv('CHANGES_FEED_LAG_SECONDS', 2))
+    # Búsqueda: 'mysql' (índice FULLTEXT) o 'memoria'; vacío = según el motor de la base. El índice en
+    # memoria se sincroniza con la tabla como mucho una vez cada SEARCH_SYNC_INTERVAL segundos, releyendo
+    # las filas de los últimos SEARCH_SYNC_LAG_SECONDS (escrituras que aún no habían confirmado)
+    current_app.config['SEARCH_BACKEND'] = os.getenv('SEARCH_BACKEND')
+    current_app.config['SEARCH_SYNC_INTERVAL'] = float(os.getenv('SEARCH_SYNC_INTERVAL', 1.0))
+    current_app.config['SEARCH_SYNC_LAG_SECONDS'] = int(os.getenv('SEARCH_SYNC_LAG_SECONDS', 2))
+    # Número máximo de subpeticiones en POST /batch
+    current_app.config['BATCH_MAX_REQUESTS'] = int(os.getenv('BATCH_MAX_REQUESTS', 20))
+    # Segundos que un admin degradado o borrado puede seguir usando su token en otros workers
+    current_app.config['AUTH_VERSION_CACHE_TTL'] = int(os.getenv('AUTH_VERSION_CACHE_TTL', 30))
+
+    if current_app.config['PROXY_FIX_HOPS']:
+        hops = current_app.config['PROXY_FIX_HOPS']
+        current_app.wsgi_app = ProxyFix(current_app.wsgi_app, x_for=hops, x_proto=hops, x_host=hops)
 
     # Inicializar extensiones
+    init_json(current_app)
     db.init_app(current_app)
     bcrypt.init_app(current_app) # <--- INICIALIZACIÓN DE BCRYPT CON LA APP
     jwt.init_app(current_app)  # O con 'app' si usas 'app = Flask(__name__)'
+    init_pool(current_app, db)
+    init_replicas(current_app, db)
+    init_contador_consultas(current_app, db)
+    init_cache(current_app, db)
+    init_cambios(current_app, db)
+    init_cola_contacto(current_app)
+    init_metricas(current_app, db)
+    init_perfilado(current_app)
 
     # Registrar Blueprints
     current_app.register_blueprint(main_bp) # Puedes añadir un prefijo, ej: url_prefix='/api'
+    # flask importar-contenido / exportar-contenido
+    registrar_comandos(current_app)
+    init_snapshot(current_app, db)
+    # flask actualizar-esquema: columnas e índices nuevos en una base creada con una versión anterior
+    init_esquema(current_app)
     return current_app
 
 app = create_app() 
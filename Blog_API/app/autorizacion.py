@@ -0,0 +1,54 @@
+# Blog_API/app/autorizacion.py
+# Autorización de administradores sin consultar la BD en cada petición.
+# El token JWT lleva los claims `is_admin` y `tv` (versión de token del autor). Una versión
+# distinta a la actual, o un autor que ya no existe, invalida el token: degradar a un admin,
+# cambiar su contraseña o borrarlo incrementa/elimina su versión.
+# Las versiones vigentes se cachean en memoria y se recargan (una consulta para todos los
+# autores) como mucho cada AUTH_VERSION_CACHE_TTL segundos.
+import threading
+import time
+from flask import current_app
+from .models import db, Autor
+
+
+class CacheVersionesToken:
+    """Mapa autor_id -> token_version, recargado de forma perezosa cuando caduca."""
+
+    def __init__(self, ttl=30):
+        self.ttl = ttl
+        self._versiones = {}
+        self._caduca = 0.0
+        self._lock = threading.Lock()
+
+    def version(self, autor_id):
+        """Versión vigente del autor, o None si no existe."""
+        with self._lock:
+            if time.monotonic() >= self._caduca:
+                self._versiones = dict(db.session.query(Autor.id, Autor.token_version).all())
+                self._caduca = time.monotonic() + self.ttl
+            return self._versiones.get(autor_id)
+
+    def invalidar(self):
+        """Fuerza la recarga en la próxima comprobación (tras degradar o borrar un autor)."""
+        with self._lock:
+            self._caduca = 0.0
+
+
+def obtener_cache_versiones():
+    cache = current_app.extensions.get('versiones_token')
+    if cache is None:
+        cache = current_app.extensions['versiones_token'] = CacheVersionesToken(
+            ttl=current_app.config.get('AUTH_VERSION_CACHE_TTL', 30)
+        )
+    return cache
+
+
+def claims_para(autor):
+    """Claims adicionales del access token de `autor`."""
+    return {'is_admin': bool(autor.is_admin), 'tv': autor.token_version or 0}
+
+
+def token_vigente(autor_id, claims):
+    """True si el token pertenece a un autor existente y su versión sigue siendo la actual."""
+    version = obtener_cache_versiones().version(autor_id)
+    return version is not None and claims.get('tv') == version
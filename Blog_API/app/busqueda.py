@@ -0,0 +1,299 @@
+# Blog_API/app/busqueda.py
+# Búsqueda de texto completo sobre entradas (títulos, resúmenes y contenido en es/en/de, y el slug).
+# - MySQL: índice FULLTEXT y MATCH ... AGAINST en modo booleano (ver índice ft_entradas_busqueda, que
+#   crea `flask actualizar-esquema` en bases existentes). Si la base aún no lo tiene se usa el índice
+#   en memoria en lugar de fallar en cada búsqueda.
+# - Resto de motores (SQLite en pruebas): índice invertido en memoria con ranking BM25.
+# Ambos devuelven ids ordenados por relevancia; la ruta carga después sólo esa página de entradas.
+import bisect
+import math
+import re
+import threading
+import time
+import unicodedata
+from datetime import timedelta
+from flask import current_app
+from sqlalchemy import func, inspect
+from sqlalchemy.dialects.mysql import match
+from .models import db, Entrada, EntradaEliminada
+
+# Peso de cada campo en el índice en memoria: un término en el título cuenta más que en el cuerpo
+PESOS_CAMPOS = {'titulo': 3, 'resumen': 2, 'contenido': 1, 'slug': 3}
+IDIOMAS = ('es', 'en', 'de')
+CAMPOS_TRADUCIDOS = ('titulo', 'resumen', 'contenido')
+# Mismas columnas, en el mismo orden, que el índice FULLTEXT (MATCH exige esa lista exacta)
+COLUMNAS_TEXTO = [f'{campo}_{idioma}' for campo in CAMPOS_TRADUCIDOS for idioma in IDIOMAS] + ['slug']
+
+LONGITUD_MINIMA_TERMINO = 2
+MAX_EXPANSIONES_PREFIJO = 50
+
+PALABRAS_VACIAS = frozenset('''
+    de la el en los las del un una por con para al lo como mas pero sus le ya o este si porque esta
+    the and of to in is it that for on with as was are be this by or an at from
+    der die das und ist im den von zu mit ein eine auf für nicht sich des dem
+'''.split())
+
+_ETIQUETAS_HTML = re.compile(r'<[^>]+>')
+_NO_PALABRA = re.compile(r'\W+')
+
+
+def tokenizar(texto):
+    """Minúsculas, sin acentos ni HTML, sin palabras vacías."""
+    if not texto:
+        return []
+    texto = _ETIQUETAS_HTML.sub(' ', texto)
+    texto = unicodedata.normalize('NFKD', texto.lower())
+    texto = ''.join(c for c in texto if not unicodedata.combining(c))
+    return [t for t in _NO_PALABRA.split(texto)
+            if len(t) >= LONGITUD_MINIMA_TERMINO and t not in PALABRAS_VACIAS]
+
+
+class IndiceInvertido:
+    """
+    Índice invertido en memoria con puntuación BM25. El último término de la consulta
+    se trata como prefijo, para que la búsqueda funcione mientras se escribe.
+    Se sincroniza de forma incremental con la tabla: reindexa las filas con fecha_actualizacion
+    posterior a la última sincronización y purga las que tienen lápida en entradas_eliminadas
+    (ver cambios.py). Como mucho una sincronización cada `intervalo` segundos.
+    Las fechas se asignan en el flush y la fila se ve al confirmar: cada sincronización vuelve a
+    leer desde `retraso` segundos antes de la última marca, para no saltarse una fila que se
+    confirmó después de que otra más reciente ya se hubiera indexado.
+    """
+
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self, intervalo=1.0, retraso=2):
+        self.intervalo = intervalo
+        self.retraso = timedelta(seconds=retraso)
+        self._lock = threading.RLock()
+        self._postings = {}     # termino -> {entrada_id: frecuencia ponderada}
+        self._terminos = []     # vocabulario ordenado, para expandir prefijos con bisect
+        self._documentos = {}   # entrada_id -> (longitud, publicado, terminos)
+        self._longitud_total = 0
+        self._marca = None      # mayor fecha_actualizacion indexada
+        self._marca_bajas = None  # mayor fecha_eliminacion purgada
+        self._sincronizado_en = None
+
+    def __len__(self):
+        return len(self._documentos)
+
+    def indexar(self, entrada_id, textos, publicado):
+        """`textos` es un dict columna -> texto (COLUMNAS_TEXTO)."""
+        frecuencias = {}
+        for columna, texto in textos.items():
+            peso = PESOS_CAMPOS[columna.split('_', 1)[0]]
+            for termino in tokenizar(texto):
+                frecuencias[termino] = frecuencias.get(termino, 0) + peso
+        with self._lock:
+            self.eliminar(entrada_id)
+            for termino, frecuencia in frecuencias.items():
+                posting = self._postings.get(termino)
+                if posting is None:
+                    posting = self._postings[termino] = {}
+                    bisect.insort(self._terminos, termino)
+                posting[entrada_id] = frecuencia
+            longitud = sum(frecuencias.values())
+            self._documentos[entrada_id] = (longitud, publicado, tuple(frecuencias))
+            self._longitud_total += longitud
+
+    def eliminar(self, entrada_id):
+        with self._lock:
+            documento = self._documentos.pop(entrada_id, None)
+            if documento is None:
+                return
+            longitud, _, terminos = documento
+            self._longitud_total -= longitud
+            for termino in terminos:
+                posting = self._postings.get(termino)
+                if posting is None:
+                    continue
+                posting.pop(entrada_id, None)
+                if not posting:
+                    del self._postings[termino]
+                    indice = bisect.bisect_left(self._terminos, termino)
+                    if indice < len(self._terminos) and self._terminos[indice] == termino:
+                        del self._terminos[indice]
+
+    def _expandir_prefijo(self, prefijo):
+        inicio = bisect.bisect_left(self._terminos, prefijo)
+        expansiones = []
+        for termino in self._terminos[inicio:]:
+            if not termino.startswith(prefijo) or len(expansiones) >= MAX_EXPANSIONES_PREFIJO:
+                break
+            expansiones.append(termino)
+        return expansiones
+
+    def buscar(self, consulta, solo_publicadas=False, limite=20, offset=0):
+        """Devuelve ([(entrada_id, puntuacion)], total) con semántica AND entre términos."""
+        terminos = tokenizar(consulta)
+        if not terminos:
+            return [], 0
+        with self._lock:
+            num_docs = len(self._documentos)
+            if not num_docs:
+                return [], 0
+            media = self._longitud_total / num_docs
+            # Cada grupo es un término de la consulta; el último admite cualquier término con ese prefijo
+            grupos = [[t] for t in terminos[:-1]] + [self._expandir_prefijo(terminos[-1])]
+            puntuaciones = None
+            for grupo in grupos:
+                del_grupo = {}
+                for termino in grupo:
+                    posting = self._postings.get(termino)
+                    if not posting:
+                        continue
+                    idf = _idf(num_docs, len(posting))
+                    for entrada_id, frecuencia in posting.items():
+                        longitud = self._documentos[entrada_id][0]
+                        parcial = idf * frecuencia * (self.K1 + 1) / (
+                            frecuencia + self.K1 * (1 - self.B + self.B * longitud / media)
+                        )
+                        del_grupo[entrada_id] = max(del_grupo.get(entrada_id, 0.0), parcial)
+                if puntuaciones is None:
+                    puntuaciones = del_grupo
+                else:
+                    puntuaciones = {i: p + del_grupo[i] for i, p in puntuaciones.items() if i in del_grupo}
+                if not puntuaciones:
+                    return [], 0
+            if solo_publicadas:
+                puntuaciones = {i: p for i, p in puntuaciones.items() if self._documentos[i][1]}
+        ordenados = sorted(puntuaciones.items(), key=lambda par: (-par[1], -par[0]))
+        return [(i, round(p, 4)) for i, p in ordenados[offset:offset + limite]], len(ordenados)
+
+    def sincronizar(self):
+        """Reindexa las entradas modificadas y elimina las borradas desde la última vez."""
+        with self._lock:
+            ahora = time.monotonic()
+            if self._sincronizado_en is not None and ahora - self._sincronizado_en < self.intervalo:
+                return
+            self._sincronizado_en = ahora
+            if self._marca is None:
+                # Carga completa: las lápidas anteriores son de entradas que ya no se van a leer
+                self._marca_bajas = db.session.query(func.max(EntradaEliminada.fecha_eliminacion)).scalar()
+            else:
+                # >= porque varias filas pueden compartir el mismo segundo de fecha; eliminar es idempotente
+                bajas = db.session.query(EntradaEliminada.entrada_id, EntradaEliminada.fecha_eliminacion)
+                if self._marca_bajas is not None:
+                    bajas = bajas.filter(EntradaEliminada.fecha_eliminacion >= self._marca_bajas - self.retraso)
+                for entrada_id, fecha in bajas:
+                    self.eliminar(entrada_id)
+                    if self._marca_bajas is None or fecha > self._marca_bajas:
+                        self._marca_bajas = fecha
+
+            columnas = [Entrada.id, Entrada.estado, Entrada.fecha_actualizacion] + [getattr(Entrada, c) for c in COLUMNAS_TEXTO]
+            query = db.session.query(*columnas)
+            if self._marca is not None:
+                query = query.filter(Entrada.fecha_actualizacion >= self._marca - self.retraso)
+            for fila in query.execution_options(yield_per=500):
+                textos = {c: getattr(fila, c) for c in COLUMNAS_TEXTO}
+                self.indexar(fila.id, textos, fila.estado == 'publicado')
+                if self._marca is None or fila.fecha_actualizacion > self._marca:
+                    self._marca = fila.fecha_actualizacion
+
+
+def _idf(num_docs, frecuencia_documental):
+    return math.log(1 + (num_docs - frecuencia_documental + 0.5) / (frecuencia_documental + 0.5))
+
+
+def consulta_booleana_mysql(consulta):
+    """'gato neg' -> '+gato +neg*' (todos los términos obligatorios, el último como prefijo)."""
+    terminos = tokenizar(consulta)
+    if not terminos:
+        return ''
+    return ' '.join([f'+{t}' for t in terminos[:-1]] + [f'+{terminos[-1]}*'])
+
+
+class BusquedaMySQL:
+    """Búsqueda delegada en el índice FULLTEXT de MySQL."""
+
+    nombre = 'mysql'
+
+    def buscar(self, consulta, solo_publicadas=False, limite=20, offset=0):
+        booleana = consulta_booleana_mysql(consulta)
+        if not booleana:
+            return [], 0
+        relevancia = match(*[getattr(Entrada, c) for c in COLUMNAS_TEXTO], against=booleana).in_boolean_mode()
+        query = db.session.query(Entrada.id, relevancia.label('puntuacion')).filter(relevancia > 0)
+        if solo_publicadas:
+            query = query.filter(Entrada.estado == 'publicado')
+        total = query.order_by(None).count()
+        filas = query.order_by(relevancia.desc(), Entrada.id.desc()).limit(limite).offset(offset).all()
+        return [(fila.id, round(float(fila.puntuacion), 4)) for fila in filas], total
+
+
+class BusquedaMemoria:
+    """Índice invertido en memoria (por proceso), sincronizado antes de cada búsqueda."""
+
+    nombre = 'memoria'
+
+    def __init__(self, intervalo=1.0, retraso=2):
+        self.indice = IndiceInvertido(intervalo, retraso)
+
+    def buscar(self, consulta, solo_publicadas=False, limite=20, offset=0):
+        self.indice.sincronizar()
+        return self.indice.buscar(consulta, solo_publicadas=solo_publicadas, limite=limite, offset=offset)
+
+
+def indice_fulltext_disponible():
+    """True si la tabla entradas tiene un índice sobre exactamente COLUMNAS_TEXTO."""
+    indices = inspect(db.engine).get_indexes(Entrada.__tablename__)
+    return any(set(indice['column_names']) == set(COLUMNAS_TEXTO) for indice in indices)
+
+
+def obtener_motor_busqueda():
+    """Motor de la app actual; SEARCH_BACKEND ('mysql' o 'memoria') o, si no, según el dialecto."""
+    motor = current_app.extensions.get('busqueda')
+    if motor is None:
+        tipo = current_app.config.get('SEARCH_BACKEND') or ('mysql' if db.engine.dialect.name == 'mysql' else 'memoria')
+        if tipo == 'mysql' and not indice_fulltext_disponible():
+            current_app.logger.warning(
+                "Falta el índice FULLTEXT de entradas (ejecuta `flask actualizar-esquema`): "
+                "se usa la búsqueda en memoria."
+            )
+            tipo = 'memoria'
+        if tipo == 'mysql':
+            motor = BusquedaMySQL()
+        else:
+            motor = BusquedaMemoria(current_app.config.get('SEARCH_SYNC_INTERVAL', 1.0),
+                                    current_app.config.get('SEARCH_SYNC_LAG_SECONDS', 2))
+        current_app.extensions['busqueda'] = motor
+    return motor
+
+
+def _cargar(ids, solo_publicadas):
+    query = Entrada.query.filter(Entrada.id.in_(ids))
+    return query.filter(Entrada.estado == 'publicado') if solo_publicadas else query
+
+
+def buscar_entradas(consulta, solo_publicadas=False, limite=20, offset=0, opciones=()):
+    """
+    Devuelve ([(Entrada, puntuacion)], total) en orden de relevancia. Las entradas se cargan
+    con una única consulta IN aplicando `opciones` (proyección / carga por lotes).
+    Con `solo_publicadas` la carga vuelve a filtrar por estado: decide la fila, no el índice
+    (el de memoria puede ir hasta SEARCH_SYNC_INTERVAL por detrás).
+    """
+    resultados, total = obtener_motor_busqueda().buscar(
+        consulta, solo_publicadas=solo_publicadas, limite=limite, offset=offset
+    )
+    if not resultados:
+        return [], total
+    ids = [entrada_id for entrada_id, _ in resultados]
+    por_id = {e.id: e for e in _cargar(ids, solo_publicadas).options(*opciones)}
+    return [(por_id[i], p) for i, p in resultados if i in por_id], total
+
+
+def buscar_registros(consulta, esquema, solo_publicadas=False, limite=20, offset=0):
+    """
+    Como buscar_entradas(), pero devuelve ([(dict, puntuacion)], total) serializados con
+    `esquema` (un EsquemaFilas de Entrada), sin crear instancias ORM.
+    """
+    resultados, total = obtener_motor_busqueda().buscar(
+        consulta, solo_publicadas=solo_publicadas, limite=limite, offset=offset
+    )
+    if not resultados:
+        return [], total
+    ids = [entrada_id for entrada_id, _ in resultados]
+    filas = esquema.consulta(_cargar(ids, solo_publicadas)).all()
+    por_id = {fila.id: registro for fila, registro in zip(filas, esquema.serializar(filas))}
+    return [(por_id[i], p) for i, p in resultados if i in por_id], total
@@ -0,0 +1,187 @@
+# Blog_API/app/cache.py
+# Caché de respuestas (LRU + TTL) para las rutas públicas de lectura.
+# Cada entrada guarda el cuerpo ya serializado y se etiqueta con las tablas de las que depende;
+# al confirmar una transacción que toca alguna de esas tablas se invalidan sus claves.
+# El almacenamiento es intercambiable (memoria, fichero SQLite o Redis): ver cache_backends.py.
+import json
+import time
+from functools import wraps
+from urllib.parse import urlencode
+from flask import current_app, g, request, has_app_context
+from sqlalchemy import event
+from .cache_backends import crear_backend
+from .replicas import lee_de_primaria, obtener_enrutador
+
+# Cabeceras de la respuesta original que se conservan en la caché
+CABECERAS_CACHEADAS = ('Content-Type', 'ETag', 'Last-Modified', 'Cache-Control', 'X-Next-Cursor', 'Link', 'Content-Language')
+
+# Mientras un worker regenera una clave, los demás esperan hasta ESPERA_MAXIMA segundos
+# a que aparezca en la caché en lugar de lanzar la misma consulta contra MySQL.
+TTL_BLOQUEO = 10
+ESPERA_MAXIMA = 2.0
+INTERVALO_ESPERA = 0.05
+
+# Con réplicas, cada tabla invalidada queda marcada en el backend (visible para todos los workers)
+# durante REPLICA_STICKY_SECONDS: lo que una réplica devuelva en ese plazo puede no incluir aún la
+# escritura, así que se sirve pero no se guarda en la caché.
+PREFIJO_RETRASO = 'retraso:'
+
+
+def empaquetar(status, cabeceras, cuerpo):
+    """Serializa una respuesta como bytes: cabecera JSON, salto de línea y cuerpo."""
+    return json.dumps([status, cabeceras]).encode('utf-8') + b'\n' + cuerpo
+
+
+def desempaquetar(valor):
+    cabecera, cuerpo = valor.split(b'\n', 1)
+    status, cabeceras = json.loads(cabecera)
+    return status, cabeceras, cuerpo
+
+
+def obtener_cache():
+    return current_app.extensions.get('cache_respuestas')
+
+
+def clave_peticion():
+    """Ruta + argumentos ordenados, para que ?a=1&b=2 y ?b=2&a=1 compartan entrada."""
+    args = sorted(request.args.items(multi=True))
+    return f"{request.path}?{urlencode(args)}"
+
+
+def cacheado(*tablas):
+    """
+    Decorador para vistas GET públicas. `tablas` son los __tablename__ de los que depende
+    la respuesta; una escritura confirmada en cualquiera de ellas invalida la entrada.
+    Sólo se guardan respuestas 200; los 304 de un acierto se resuelven sin tocar la BD.
+    Si el backend falla (p. ej. Redis caído) la vista se sirve sin caché. Tampoco se guardan
+    las lecturas de una réplica dentro del plazo de retraso de una de las `tablas`.
+    """
+    def decorador(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            cache = obtener_cache()
+            # Un cliente que acaba de escribir lee de la primaria, no de lo que otro dejó en la caché
+            if cache is None or lee_de_primaria():
+                return fn(*args, **kwargs)
+
+            clave = clave_peticion()
+            try:
+                guardada = cache.get(clave)
+                bloqueada = False
+                if guardada is None:
+                    bloqueada = cache.bloquear(clave, TTL_BLOQUEO)
+                    if not bloqueada:
+                        guardada = _esperar_valor(cache, clave)
+            except Exception as e:
+                current_app.logger.warning(f"Caché de respuestas no disponible: {str(e)}")
+                return fn(*args, **kwargs)
+
+            if guardada is not None:
+                return _respuesta_cacheada(guardada)
+
+            try:
+                response = current_app.make_response(fn(*args, **kwargs))
+                if response.status_code == 200 and not response.is_streamed and not _lectura_atrasada(cache, tablas):
+                    cabeceras = [(k, v) for k, v in response.headers.items() if k in CABECERAS_CACHEADAS]
+                    try:
+                        cache.set(clave, empaquetar(200, cabeceras, response.get_data()), tablas)
+                    except Exception as e:
+                        current_app.logger.warning(f"No se pudo guardar en la caché de respuestas: {str(e)}")
+            finally:
+                if bloqueada:
+                    try:
+                        cache.liberar(clave)
+                    except Exception:
+                        pass
+            response.headers['X-Cache'] = 'MISS'
+            return response
+        return wrapper
+    return decorador
+
+
+def _esperar_valor(cache, clave):
+    """Otro worker está generando la clave: sondea la caché un tiempo acotado."""
+    limite = time.monotonic() + ESPERA_MAXIMA
+    while time.monotonic() < limite:
+        time.sleep(INTERVALO_ESPERA)
+        valor = cache.get(clave)
+        if valor is not None:
+            return valor
+    return None
+
+
+def _marcar_retraso(cache, tablas, segundos):
+    """Abre (o renueva) el plazo de retraso de las réplicas para `tablas`."""
+    for tabla in tablas:
+        cache.liberar(PREFIJO_RETRASO + tabla)
+        cache.bloquear(PREFIJO_RETRASO + tabla, segundos)
+
+
+def _lectura_atrasada(cache, tablas):
+    """True si la petición leyó de una réplica y alguna de `tablas` está en su plazo de retraso."""
+    if g.get('replica_lectura') is None:
+        return False
+    for tabla in tablas:
+        clave = PREFIJO_RETRASO + tabla
+        # El plazo es un bloqueo del backend: si se puede tomar es que no había ninguno abierto
+        if not cache.bloquear(clave, TTL_BLOQUEO):
+            return True
+        cache.liberar(clave)
+    return False
+
+
+def _respuesta_cacheada(valor):
+    status, cabeceras, cuerpo = desempaquetar(valor)
+    response = current_app.response_class(cuerpo, status=status, headers=cabeceras)
+    response.headers['X-Cache'] = 'HIT'
+    return response.make_conditional(request)
+
+
+def _tablas_modificadas(session):
+    return session.info.setdefault('tablas_modificadas', set())
+
+
+def marcar_modificado(session, *tablas):
+    """Para escrituras que no pasan por el flush del ORM (UPDATE/INSERT masivos)."""
+    _tablas_modificadas(session).update(tablas)
+
+
+def _registrar_cambios(session, flush_context):
+    tablas = _tablas_modificadas(session)
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        tablas.add(obj.__table__.name)
+
+
+def _invalidar_cambios(session):
+    tablas = session.info.pop('tablas_modificadas', None)
+    if tablas and has_app_context():
+        cache = obtener_cache()
+        if cache is not None:
+            try:
+                cache.invalidar(*tablas)
+                if obtener_enrutador() is not None:
+                    _marcar_retraso(cache, tablas, current_app.config.get('REPLICA_STICKY_SECONDS', 5))
+            except Exception as e:
+                current_app.logger.error(f"No se pudo invalidar la caché para {sorted(tablas)}: {str(e)}")
+
+
+def _descartar_cambios(session):
+    session.info.pop('tablas_modificadas', None)
+
+
+def init_cache(app, db):
+    """
+    Crea el backend indicado en CACHE_BACKEND y engancha la invalidación a los eventos de
+    sesión: lo que se modifica en un flush se invalida al hacer commit. Con un backend
+    compartido (sqlite/redis) la invalidación la ven todos los workers a la vez.
+    """
+    if not app.config.get('RESPONSE_CACHE_ENABLED', True):
+        return
+    app.extensions['cache_respuestas'] = crear_backend(app.config)
+
+    sesion = db.session.session_factory.class_
+    for nombre, listener in (('after_flush', _registrar_cambios),
+                             ('after_commit', _invalidar_cambios),
+                             ('after_rollback', _descartar_cambios)):
+        if not event.contains(sesion, nombre, listener):
+            event.listen(sesion, nombre, listener)
@@ -0,0 +1,454 @@
+# Blog_API/app/cache_backends.py
+# Backends intercambiables para la caché de respuestas (ver cache.py).
+# - CacheLRU: memoria del proceso. Rápida, pero cada worker de gunicorn tiene la suya.
+# - CacheSQLite: fichero SQLite compartido por todos los workers de una misma máquina.
+# - CacheRedis: cualquier servidor que hable el protocolo de Redis (RESP), compartido entre máquinas.
+# Todos guardan valores `bytes` etiquetados; invalidar una etiqueta en un backend compartido
+# lo ve inmediatamente cualquier worker, y el bloqueo por clave evita que un worker frío
+# lance la misma consulta pesada N veces a la vez.
+import os
+import socket
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlparse
+
+
+class BackendCache:
+    """Interfaz común. Los contadores son del proceso actual."""
+
+    def __init__(self, ttl=60):
+        self.ttl = ttl
+        self._lock_contadores = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.expulsiones = 0
+        self.caducadas = 0
+        self.invalidaciones = 0
+
+    def _contar(self, contador, n=1):
+        with self._lock_contadores:
+            setattr(self, contador, getattr(self, contador) + n)
+
+    def get(self, clave):
+        raise NotImplementedError
+
+    def set(self, clave, valor, etiquetas=()):
+        raise NotImplementedError
+
+    def invalidar(self, *etiquetas):
+        raise NotImplementedError
+
+    def limpiar(self):
+        raise NotImplementedError
+
+    def bloquear(self, clave, ttl):
+        """Toma un bloqueo con caducidad sobre `clave`. True si se obtuvo."""
+        raise NotImplementedError
+
+    def liberar(self, clave):
+        raise NotImplementedError
+
+    def num_entradas(self):
+        return None
+
+    def estadisticas(self):
+        with self._lock_contadores:
+            consultas = self.aciertos + self.fallos
+            return {
+                'backend': self.nombre,
+                'entradas': self.num_entradas(),
+                'ttl': self.ttl,
+                'aciertos': self.aciertos,
+                'fallos': self.fallos,
+                'ratio_aciertos': round(self.aciertos / consultas, 4) if consultas else None,
+                'expulsiones': self.expulsiones,
+                'caducadas': self.caducadas,
+                'invalidaciones': self.invalidaciones,
+            }
+
+
+class CacheLRU(BackendCache):
+    """Diccionario acotado con expulsión LRU, caducidad por TTL e índice de etiquetas."""
+
+    nombre = 'memoria'
+
+    def __init__(self, max_entradas=512, ttl=60):
+        super().__init__(ttl)
+        self.max_entradas = max_entradas
+        self._datos = OrderedDict()  # clave -> (expira_en, etiquetas, valor)
+        self._por_etiqueta = {}      # etiqueta -> set(claves)
+        self._bloqueos = {}          # clave -> expira_en
+        self._lock = threading.Lock()
+
+    def get(self, clave):
+        with self._lock:
+            item = self._datos.get(clave)
+            if item is None:
+                self._contar('fallos')
+                return None
+            if item[0] <= time.monotonic():
+                self._quitar(clave)
+                self._contar('caducadas')
+                self._contar('fallos')
+                return None
+            self._datos.move_to_end(clave)
+            self._contar('aciertos')
+            return item[2]
+
+    def set(self, clave, valor, etiquetas=()):
+        with self._lock:
+            if clave in self._datos:
+                self._quitar(clave)
+            self._datos[clave] = (time.monotonic() + self.ttl, tuple(etiquetas), valor)
+            for etiqueta in etiquetas:
+                self._por_etiqueta.setdefault(etiqueta, set()).add(clave)
+            while len(self._datos) > self.max_entradas:
+                clave_antigua = next(iter(self._datos))
+                self._quitar(clave_antigua)
+                self._contar('expulsiones')
+
+    def invalidar(self, *etiquetas):
+        """Elimina todas las claves asociadas a cualquiera de las etiquetas."""
+        with self._lock:
+            for etiqueta in etiquetas:
+                for clave in list(self._por_etiqueta.get(etiqueta, ())):
+                    self._quitar(clave)
+                    self._contar('invalidaciones')
+
+    def limpiar(self):
+        with self._lock:
+            self._datos.clear()
+            self._por_etiqueta.clear()
+
+    def bloquear(self, clave, ttl):
+        with self._lock:
+            ahora = time.monotonic()
+            if self._bloqueos.get(clave, 0) > ahora:
+                return False
+            self._bloqueos[clave] = ahora + ttl
+            return True
+
+    def liberar(self, clave):
+        with self._lock:
+            self._bloqueos.pop(clave, None)
+
+    def num_entradas(self):
+        return len(self._datos)
+
+    def _quitar(self, clave):
+        _, etiquetas, _ = self._datos.pop(clave)
+        for etiqueta in etiquetas:
+            claves = self._por_etiqueta.get(etiqueta)
+            if claves is not None:
+                claves.discard(clave)
+                if not claves:
+                    del self._por_etiqueta[etiqueta]
+
+    def estadisticas(self):
+        datos = super().estadisticas()
+        datos['max_entradas'] = self.max_entradas
+        return datos
+
+
+class CacheSQLite(BackendCache):
+    """
+    Caché en un fichero SQLite (modo WAL) compartido por los procesos de una misma máquina.
+    La expulsión LRU usa la columna `usado`, que se refresca como mucho una vez por segundo
+    por clave para no convertir cada acierto en una escritura.
+    """
+
+    nombre = 'sqlite'
+
+    ESQUEMA = (
+        "CREATE TABLE IF NOT EXISTS cache (clave TEXT PRIMARY KEY, valor BLOB NOT NULL, "
+        "expira REAL NOT NULL, usado REAL NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS ix_cache_usado ON cache (usado)",
+        "CREATE TABLE IF NOT EXISTS cache_etiquetas (etiqueta TEXT NOT NULL, clave TEXT NOT NULL, "
+        "PRIMARY KEY (etiqueta, clave))",
+        "CREATE TABLE IF NOT EXISTS cache_bloqueos (clave TEXT PRIMARY KEY, expira REAL NOT NULL)",
+    )
+
+    def __init__(self, ruta, max_entradas=2048, ttl=60):
+        super().__init__(ttl)
+        self.ruta = ruta
+        self.max_entradas = max_entradas
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(ruta)), exist_ok=True)
+        conn = self._conexion()
+        for sentencia in self.ESQUEMA:
+            conn.execute(sentencia)
+
+    def _conexion(self):
+        # sqlite3 no permite compartir conexiones entre hilos (ni entre procesos tras un fork)
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.ruta, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, clave):
+        conn = self._conexion()
+        fila = conn.execute("SELECT valor, expira, usado FROM cache WHERE clave = ?", (clave,)).fetchone()
+        if fila is None:
+            self._contar('fallos')
+            return None
+        valor, expira, usado = fila
+        ahora = time.time()
+        if expira <= ahora:
+            conn.execute("DELETE FROM cache WHERE clave = ? AND expira <= ?", (clave, ahora))
+            self._contar('caducadas')
+            self._contar('fallos')
+            return None
+        if ahora - usado > 1:
+            conn.execute("UPDATE cache SET usado = ? WHERE clave = ?", (ahora, clave))
+        self._contar('aciertos')
+        return bytes(valor)
+
+    def set(self, clave, valor, etiquetas=()):
+        conn = self._conexion()
+        ahora = time.time()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (clave, valor, expira, usado) VALUES (?, ?, ?, ?)",
+                (clave, sqlite3.Binary(valor), ahora + self.ttl, ahora)
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO cache_etiquetas (etiqueta, clave) VALUES (?, ?)",
+                [(etiqueta, clave) for etiqueta in etiquetas]
+            )
+            total = conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+            sobrantes = total - self.max_entradas
+            if sobrantes > 0:
+                conn.execute(
+                    "DELETE FROM cache WHERE clave IN (SELECT clave FROM cache ORDER BY usado LIMIT ?)",
+                    (sobrantes,)
+                )
+                conn.execute("DELETE FROM cache_etiquetas WHERE clave NOT IN (SELECT clave FROM cache)")
+                self._contar('expulsiones', sobrantes)
+
+    def invalidar(self, *etiquetas):
+        if not etiquetas:
+            return
+        conn = self._conexion()
+        marcas = ','.join('?' * len(etiquetas))
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            borradas = conn.execute(
+                f"DELETE FROM cache WHERE clave IN (SELECT clave FROM cache_etiquetas WHERE etiqueta IN ({marcas}))",
+                etiquetas
+            ).rowcount
+            conn.execute("DELETE FROM cache_etiquetas WHERE clave NOT IN (SELECT clave FROM cache)")
+        self._contar('invalidaciones', borradas)
+
+    def limpiar(self):
+        conn = self._conexion()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("DELETE FROM cache")
+            conn.execute("DELETE FROM cache_etiquetas")
+
+    def bloquear(self, clave, ttl):
+        conn = self._conexion()
+        ahora = time.time()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("DELETE FROM cache_bloqueos WHERE clave = ? AND expira <= ?", (clave, ahora))
+            return conn.execute(
+                "INSERT OR IGNORE INTO cache_bloqueos (clave, expira) VALUES (?, ?)", (clave, ahora + ttl)
+            ).rowcount == 1
+
+    def liberar(self, clave):
+        self._conexion().execute("DELETE FROM cache_bloqueos WHERE clave = ?", (clave,))
+
+    def num_entradas(self):
+        return self._conexion().execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+    def estadisticas(self):
+        datos = super().estadisticas()
+        datos['max_entradas'] = self.max_entradas
+        datos['ruta'] = self.ruta
+        return datos
+
+
+class ErrorRESP(Exception):
+    """Respuesta de error (-ERR ...) del servidor Redis."""
+
+
+class ClienteRESP:
+    """
+    Cliente mínimo del protocolo de Redis (RESP2) sobre un socket TCP, suficiente para la caché.
+    Evita añadir la dependencia `redis`; cualquier servidor compatible (Redis, Valkey, KeyDB
+    o un sustituto local en pruebas) sirve.
+    """
+
+    def __init__(self, host='localhost', port=6379, db=0, password=None, timeout=2.0):
+        self.host = host
+        self.port = port
+        self.db = db
+        self.password = password
+        self.timeout = timeout
+        self._sock = None
+        self._buffer = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def desde_url(cls, url, **kwargs):
+        partes = urlparse(url)
+        db = int(partes.path.lstrip('/') or 0)
+        return cls(host=partes.hostname or 'localhost', port=partes.port or 6379, db=db,
+                   password=partes.password, **kwargs)
+
+    def _conectar(self):
+        self._sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self._buffer = self._sock.makefile('rb')
+        self._pid = os.getpid()
+        if self.password:
+            self._enviar('AUTH', self.password)
+        if self.db:
+            self._enviar('SELECT', self.db)
+
+    def cerrar(self):
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            finally:
+                self._sock = None
+                self._buffer = None
+
+    def execute(self, *args):
+        with self._lock:
+            # Tras un fork el socket heredado es del proceso padre
+            if self._sock is None or self._pid != os.getpid():
+                self._conectar()
+            try:
+                return self._enviar(*args)
+            except (OSError, EOFError):
+                # Un reintento con conexión nueva (p. ej. el servidor cerró una conexión ociosa)
+                self.cerrar()
+                self._conectar()
+                return self._enviar(*args)
+
+    def _enviar(self, *args):
+        partes = [b'*%d\r\n' % len(args)]
+        for arg in args:
+            if isinstance(arg, str):
+                arg = arg.encode('utf-8')
+            elif not isinstance(arg, bytes):
+                arg = str(arg).encode('utf-8')
+            partes.append(b'$%d\r\n%s\r\n' % (len(arg), arg))
+        self._sock.sendall(b''.join(partes))
+        return self._leer()
+
+    def _leer(self):
+        linea = self._buffer.readline()
+        if not linea:
+            raise EOFError('Conexión cerrada por el servidor')
+        tipo, resto = linea[:1], linea[1:-2]
+        if tipo == b'+':
+            return resto.decode('utf-8')
+        if tipo == b'-':
+            raise ErrorRESP(resto.decode('utf-8'))
+        if tipo == b':':
+            return int(resto)
+        if tipo == b'$':
+            longitud = int(resto)
+            if longitud == -1:
+                return None
+            datos = self._buffer.read(longitud + 2)
+            return datos[:-2]
+        if tipo == b'*':
+            longitud = int(resto)
+            if longitud == -1:
+                return None
+            return [self._leer() for _ in range(longitud)]
+        raise ErrorRESP(f'Respuesta RESP desconocida: {linea!r}')
+
+
+class CacheRedis(BackendCache):
+    """
+    Caché en un servidor Redis compartido. La expulsión LRU la hace el propio servidor
+    (configurar maxmemory-policy allkeys-lru); aquí sólo se fija el TTL de cada clave.
+    Las etiquetas son SETs con las claves que dependen de ellas.
+    """
+
+    nombre = 'redis'
+
+    def __init__(self, cliente, ttl=60, prefijo='blog:cache:'):
+        super().__init__(ttl)
+        self.cliente = cliente
+        self.prefijo = prefijo
+
+    def _clave_valor(self, clave):
+        return f"{self.prefijo}v:{clave}"
+
+    def _clave_etiqueta(self, etiqueta):
+        return f"{self.prefijo}t:{etiqueta}"
+
+    def get(self, clave):
+        valor = self.cliente.execute('GET', self._clave_valor(clave))
+        if valor is None:
+            self._contar('fallos')
+            return None
+        self._contar('aciertos')
+        return valor
+
+    def set(self, clave, valor, etiquetas=()):
+        ttl_ms = int(self.ttl * 1000)
+        self.cliente.execute('SET', self._clave_valor(clave), valor, 'PX', ttl_ms)
+        for etiqueta in etiquetas:
+            clave_etiqueta = self._clave_etiqueta(etiqueta)
+            self.cliente.execute('SADD', clave_etiqueta, clave)
+            # El SET de la etiqueta vive al menos tanto como la clave más reciente que referencia
+            self.cliente.execute('PEXPIRE', clave_etiqueta, ttl_ms)
+
+    def invalidar(self, *etiquetas):
+        for etiqueta in etiquetas:
+            clave_etiqueta = self._clave_etiqueta(etiqueta)
+            claves = self.cliente.execute('SMEMBERS', clave_etiqueta) or []
+            if claves:
+                borradas = self.cliente.execute('DEL', *[self._clave_valor(c.decode('utf-8')) for c in claves])
+                self._contar('invalidaciones', borradas)
+            self.cliente.execute('DEL', clave_etiqueta)
+
+    def limpiar(self):
+        cursor = b'0'
+        while True:
+            cursor, claves = self.cliente.execute('SCAN', cursor, 'MATCH', f"{self.prefijo}*", 'COUNT', 500)
+            if claves:
+                self.cliente.execute('DEL', *claves)
+            if cursor in (b'0', 0, '0'):
+                break
+
+    def bloquear(self, clave, ttl):
+        respuesta = self.cliente.execute('SET', f"{self.prefijo}l:{clave}", '1', 'NX', 'PX', int(ttl * 1000))
+        return respuesta == 'OK'
+
+    def liberar(self, clave):
+        self.cliente.execute('DEL', f"{self.prefijo}l:{clave}")
+
+    def estadisticas(self):
+        datos = super().estadisticas()
+        datos['servidor'] = f"{self.cliente.host}:{self.cliente.port}/{self.cliente.db}" if isinstance(self.cliente, ClienteRESP) else None
+        return datos
+
+
+def crear_backend(config):
+    """Construye el backend indicado en CACHE_BACKEND ('memoria', 'sqlite' o 'redis')."""
+    tipo = config.get('CACHE_BACKEND', 'memoria')
+    ttl = config.get('RESPONSE_CACHE_TTL', 60)
+    max_entradas = config.get('RESPONSE_CACHE_MAX_ENTRIES', 512)
+    if tipo == 'memoria':
+        return CacheLRU(max_entradas=max_entradas, ttl=ttl)
+    if tipo == 'sqlite':
+        return CacheSQLite(config.get('CACHE_SQLITE_PATH', 'cache_respuestas.sqlite3'), max_entradas=max_entradas, ttl=ttl)
+    if tipo == 'redis':
+        cliente = ClienteRESP.desde_url(config.get('CACHE_REDIS_URL', 'redis://localhost:6379/0'))
+        return CacheRedis(cliente, ttl=ttl, prefijo=config.get('CACHE_REDIS_PREFIX', 'blog:cache:'))
+    raise RuntimeError(f"CACHE_BACKEND desconocido: {tipo!r}. Usa 'memoria', 'sqlite' o 'redis'.")
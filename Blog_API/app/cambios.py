@@ -0,0 +1,104 @@
+# Blog_API/app/cambios.py
+# Feed de cambios de entradas (GET /entradas/cambios?since=<token>) para que frontends, CDNs y cachés
+# se sincronicen en O(cambios) en lugar de volver a leer todo /entradas.
+# - Altas y modificaciones: entradas con fecha_actualizacion posterior al token, por el índice
+#   (fecha_actualizacion, id). Los borradores se incluyen igual que en /entradas (con su 'estado').
+# - Bajas: al borrar una Entrada con el ORM (delete_entrada) se inserta en la misma transacción una
+#   lápida en entradas_eliminadas (id, slug, fecha_eliminacion).
+# Las dos secuencias se mezclan en el orden (fecha, clase, id), clase 0 = entrada y 1 = lápida; el token
+# es la posición (opaca) del último cambio entregado.
+# Las fechas las pone la app al hacer flush y el commit llega después (y MySQL guarda TIMESTAMP con
+# resolución de segundos): un cambio con fecha t puede hacerse visible cuando ya se sirvió t. Por eso el
+# feed sólo entrega cambios con fecha anterior a ahora - CHANGES_FEED_LAG_SECONDS y lee siempre de la
+# primaria (una réplica retrasada haría avanzar el token por delante de cambios que aún no tiene).
+import base64
+from datetime import datetime, timedelta
+from sqlalchemy import event, or_, and_
+from .models import Entrada, EntradaEliminada
+
+CLASE_ENTRADA = 0
+CLASE_ELIMINADA = 1
+# Posición detrás de cualquier cambio con la misma fecha: "todo hasta esta fecha entregado"
+CLASE_FIN = 2
+
+
+class TokenInvalido(ValueError):
+    """El token recibido en ?since= no se pudo decodificar."""
+
+
+def codificar_token(fecha, clase, ultimo_id):
+    crudo = f"{fecha.isoformat()}|{clase}|{ultimo_id}".encode('utf-8')
+    return base64.urlsafe_b64encode(crudo).decode('ascii').rstrip('=')
+
+
+def decodificar_token(token):
+    """Devuelve la posición (fecha, clase, id) codificada en el token."""
+    try:
+        relleno = '=' * (-len(token) % 4)
+        fecha_str, clase_str, id_str = base64.urlsafe_b64decode(token + relleno).decode('utf-8').split('|')
+        return datetime.fromisoformat(fecha_str), int(clase_str), int(id_str)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise TokenInvalido(str(e))
+
+
+def _posteriores(query, columna_fecha, columna_id, clase, posicion):
+    """Filas de `clase` posteriores a `posicion` en el orden (fecha, clase, id), en forma de rango para el índice."""
+    if posicion is None:
+        return query
+    fecha, clase_token, ultimo_id = posicion
+    if clase > clase_token:
+        return query.filter(columna_fecha >= fecha)
+    if clase < clase_token:
+        return query.filter(columna_fecha > fecha)
+    return query.filter(or_(columna_fecha > fecha, and_(columna_fecha == fecha, columna_id > ultimo_id)))
+
+
+def leer_cambios(esquema, limite, token=None, retraso=2):
+    """
+    Hasta `limite` cambios posteriores a `token`, en orden. `esquema` serializa las entradas y debe
+    incluir 'id' y 'fecha_actualizacion'. Devuelve (cambios, siguiente_token, hay_mas).
+    """
+    posicion = decodificar_token(token) if token else None
+    hasta = datetime.utcnow() - timedelta(seconds=retraso)
+
+    entradas = _posteriores(Entrada.query, Entrada.fecha_actualizacion, Entrada.id, CLASE_ENTRADA, posicion).filter(
+        Entrada.fecha_actualizacion <= hasta
+    ).order_by(Entrada.fecha_actualizacion, Entrada.id).limit(limite + 1)
+    bajas = _posteriores(
+        EntradaEliminada.query, EntradaEliminada.fecha_eliminacion, EntradaEliminada.id, CLASE_ELIMINADA, posicion
+    ).filter(
+        EntradaEliminada.fecha_eliminacion <= hasta
+    ).order_by(EntradaEliminada.fecha_eliminacion, EntradaEliminada.id).limit(limite + 1)
+
+    # Cada secuencia trae limite + 1 filas: la mezcla de las dos basta para llenar la página y saber si hay más
+    pendientes = [((r['fecha_actualizacion'], CLASE_ENTRADA, r['id']), {'tipo': 'actualizada', 'entrada': r})
+                  for r in esquema.serializar(esquema.consulta(entradas).all())]
+    pendientes += [((b.fecha_eliminacion, CLASE_ELIMINADA, b.id), {
+        'tipo': 'eliminada', 'id': b.entrada_id, 'slug': b.slug, 'fecha_eliminacion': b.fecha_eliminacion
+    }) for b in bajas]
+    pendientes.sort(key=lambda par: par[0])
+
+    hay_mas = len(pendientes) > limite
+    pagina = pendientes[:limite]
+    if hay_mas:
+        siguiente = codificar_token(*pagina[-1][0])
+    elif posicion is not None and posicion[0] > hasta:
+        # Un token de una instancia con el reloj adelantado no hace retroceder la posición
+        siguiente = token
+    else:
+        # Al día: no queda nada hasta `hasta`, el cliente puede continuar desde ahí
+        siguiente = codificar_token(hasta, CLASE_FIN, 0)
+    return [cambio for _, cambio in pagina], siguiente, hay_mas
+
+
+def _registrar_bajas(session, flush_context, instancias):
+    for obj in session.deleted:
+        if isinstance(obj, Entrada):
+            session.add(EntradaEliminada(entrada_id=obj.id, slug=obj.slug))
+
+
+def init_cambios(app, db):
+    """Registra las lápidas de entradas borradas en el flush de la sesión."""
+    sesion = db.session.session_factory.class_
+    if not event.contains(sesion, 'before_flush', _registrar_bajas):
+        event.listen(sesion, 'before_flush', _registrar_bajas)
@@ -0,0 +1,277 @@
+# Blog_API/app/cola_contacto.py
+# Ingesta diferida (write-behind) de POST /mensajecontacto.
+# La petición sólo valida, aplica el límite por IP y la supresión de duplicados y encola el
+# mensaje en un fichero SQLite local (modo WAL, compartido por los workers de la máquina);
+# responde 202 sin tocar MySQL. Un hilo por proceso vuelca la cola en lotes a mensajes_contacto
+# con un único INSERT por lote, así que un pico o una inundación de bots se convierte en unas
+# pocas escrituras agrupadas en lugar de un commit por mensaje.
+# - Contrapresión: con CONTACT_QUEUE_MAX_PENDING mensajes pendientes se responde 503.
+# - Límite por IP: cubeta de tokens (CONTACT_RATE_BURST, recarga CONTACT_RATE_PER_MINUTE) -> 429.
+# - Duplicados: el mismo email + asunto + mensaje dentro de CONTACT_DEDUP_WINDOW se descarta.
+# La entrega es "al menos una vez": si el proceso muere entre el commit en MySQL y el borrado
+# de la cola, el lote reclamado se vuelve a insertar cuando caduca su reclamación.
+# Tras un reinicio, la primera petición de cada worker arranca el volcador si la cola no está vacía.
+# El límite por IP usa request.remote_addr: detrás de un proxy hay que configurar PROXY_FIX_HOPS.
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import insert
+from .models import db, MensajeContacto
+from .cache import marcar_modificado
+
+# Segundos tras los que un lote reclamado y no confirmado vuelve a estar disponible
+TTL_RECLAMACION = 60
+# Cada cuántos volcados se purgan cubetas y huellas caducadas
+PURGAR_CADA = 60
+
+
+class ColaLlena(RuntimeError):
+    """Hay demasiados mensajes pendientes de volcar; el cliente debe reintentar más tarde."""
+
+
+class LimiteExcedido(RuntimeError):
+    """La IP ha agotado su cubeta de tokens. `reintentar` son los segundos hasta el siguiente token."""
+
+    def __init__(self, reintentar):
+        super().__init__('Demasiados mensajes desde esta dirección.')
+        self.reintentar = reintentar
+
+
+class ColaContacto:
+    ESQUEMA = (
+        "CREATE TABLE IF NOT EXISTS pendientes (id INTEGER PRIMARY KEY AUTOINCREMENT, datos TEXT NOT NULL, "
+        "recibido REAL NOT NULL, reclamado TEXT, reclamado_en REAL)",
+        "CREATE INDEX IF NOT EXISTS ix_pendientes_reclamado ON pendientes (reclamado)",
+        "CREATE TABLE IF NOT EXISTS huellas (huella TEXT PRIMARY KEY, expira REAL NOT NULL)",
+        "CREATE TABLE IF NOT EXISTS cubetas (ip TEXT PRIMARY KEY, tokens REAL NOT NULL, actualizado REAL NOT NULL)",
+    )
+
+    def __init__(self, ruta, max_pendientes=10000, tamano_lote=500, intervalo=1.0,
+                 rafaga=5, por_minuto=2.0, ventana_duplicados=3600):
+        self.ruta = ruta
+        self.max_pendientes = max_pendientes
+        self.tamano_lote = tamano_lote
+        self.intervalo = intervalo
+        self.rafaga = rafaga
+        self.recarga = por_minuto / 60.0
+        self.ventana_duplicados = ventana_duplicados
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._despertar = threading.Event()
+        self._hilo = None
+        self._pid = None
+        self._revisado_pid = None
+        # Contadores del proceso actual
+        self.encolados = 0
+        self.duplicados = 0
+        self.limitados = 0
+        self.rechazados = 0
+        self.volcados = 0
+        self.lotes = 0
+        self.errores_volcado = 0
+        self.ultimo_volcado_ms = None
+        self.tiempo_volcado_ms = 0.0
+        os.makedirs(os.path.dirname(os.path.abspath(ruta)), exist_ok=True)
+        conn = self._conexion()
+        for sentencia in self.ESQUEMA:
+            conn.execute(sentencia)
+
+    def _conexion(self):
+        # Como en CacheSQLite: una conexión por hilo y por proceso
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.ruta, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _contar(self, contador, n=1):
+        with self._lock:
+            setattr(self, contador, getattr(self, contador) + n)
+
+    # --- Lado de la petición ---
+
+    def encolar(self, datos, ip):
+        """
+        Encola `datos` (dict con los campos del mensaje). Devuelve False si es un duplicado
+        reciente (no se encola). Lanza LimiteExcedido o ColaLlena.
+        """
+        ahora = time.time()
+        huella = hashlib.sha256('\x1f'.join(
+            (datos.get(c) or '').strip().lower() for c in ('email_remitente', 'asunto', 'mensaje')
+        ).encode('utf-8')).hexdigest()
+        conn = self._conexion()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            self._consumir_token(conn, ip, ahora)
+            fila = conn.execute("SELECT expira FROM huellas WHERE huella = ?", (huella,)).fetchone()
+            if fila is not None and fila[0] > ahora:
+                self._contar('duplicados')
+                return False
+            pendientes = conn.execute("SELECT COUNT(*) FROM pendientes").fetchone()[0]
+            if pendientes >= self.max_pendientes:
+                self._contar('rechazados')
+                raise ColaLlena('La cola de mensajes de contacto está llena.')
+            conn.execute("INSERT OR REPLACE INTO huellas (huella, expira) VALUES (?, ?)",
+                         (huella, ahora + self.ventana_duplicados))
+            conn.execute("INSERT INTO pendientes (datos, recibido) VALUES (?, ?)",
+                         (json.dumps(datos, ensure_ascii=False), ahora))
+        self._contar('encolados')
+        self._asegurar_volcador()
+        if pendientes + 1 >= self.tamano_lote:
+            self._despertar.set()
+        return True
+
+    def _consumir_token(self, conn, ip, ahora):
+        fila = conn.execute("SELECT tokens, actualizado FROM cubetas WHERE ip = ?", (ip,)).fetchone()
+        tokens = self.rafaga if fila is None else min(self.rafaga, fila[0] + (ahora - fila[1]) * self.recarga)
+        if tokens < 1:
+            self._contar('limitados')
+            reintentar = (1 - tokens) / self.recarga if self.recarga else 60
+            # El rollback del `with` descarta la transacción; la cubeta no cambia
+            raise LimiteExcedido(max(1, int(reintentar + 0.999)))
+        conn.execute("INSERT OR REPLACE INTO cubetas (ip, tokens, actualizado) VALUES (?, ?, ?)",
+                     (ip, tokens - 1, ahora))
+
+    # --- Volcado a MySQL ---
+
+    def _asegurar_volcador(self):
+        # Los hilos no sobreviven a un fork: cada worker arranca el suyo la primera vez que encola
+        with self._lock:
+            if self._hilo is not None and self._hilo.is_alive() and self._pid == os.getpid():
+                return
+            app = current_app._get_current_object()
+            self._pid = os.getpid()
+            self._despertar = threading.Event()
+            self._hilo = threading.Thread(target=self._bucle, args=(app,), name='volcador-contacto', daemon=True)
+            self._hilo.start()
+
+    def reanudar(self):
+        """Arranca el volcador si quedan mensajes de una ejecución anterior. Una vez por proceso."""
+        if self._revisado_pid == os.getpid():
+            return
+        self._revisado_pid = os.getpid()
+        if self._conexion().execute("SELECT 1 FROM pendientes LIMIT 1").fetchone():
+            self._asegurar_volcador()
+
+    def _bucle(self, app):
+        vueltas = 0
+        while True:
+            self._despertar.wait(self.intervalo)
+            self._despertar.clear()
+            try:
+                with app.app_context():
+                    # Se vacía la cola lote a lote mientras haya trabajo
+                    while self.volcar() >= self.tamano_lote:
+                        pass
+                vueltas += 1
+                if vueltas % PURGAR_CADA == 0:
+                    self.purgar()
+            except Exception as e:
+                app.logger.error(f"Error en el volcador de mensajes de contacto: {str(e)}")
+
+    def volcar(self):
+        """Reclama un lote, lo inserta en mensajes_contacto y lo borra de la cola. Devuelve su tamaño."""
+        conn = self._conexion()
+        marca = uuid.uuid4().hex
+        ahora = time.time()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "UPDATE pendientes SET reclamado = ?, reclamado_en = ? WHERE id IN ("
+                "SELECT id FROM pendientes WHERE reclamado IS NULL OR reclamado_en < ? ORDER BY id LIMIT ?)",
+                (marca, ahora, ahora - TTL_RECLAMACION, self.tamano_lote)
+            )
+        filas = conn.execute("SELECT datos, recibido FROM pendientes WHERE reclamado = ? ORDER BY id", (marca,)).fetchall()
+        if not filas:
+            return 0
+
+        inicio = time.perf_counter()
+        mensajes = []
+        for datos, recibido in filas:
+            mensaje = json.loads(datos)
+            mensaje['fecha_envio'] = datetime.utcfromtimestamp(recibido)
+            mensajes.append(mensaje)
+        try:
+            db.session.execute(insert(MensajeContacto), mensajes)
+            marcar_modificado(db.session, MensajeContacto.__tablename__)
+            db.session.commit()
+        except Exception:
+            # El lote sigue reclamado y se reintentará cuando caduque la reclamación
+            db.session.rollback()
+            self._contar('errores_volcado')
+            raise
+        with conn:
+            conn.execute("DELETE FROM pendientes WHERE reclamado = ?", (marca,))
+
+        duracion = (time.perf_counter() - inicio) * 1000
+        with self._lock:
+            self.volcados += len(filas)
+            self.lotes += 1
+            self.ultimo_volcado_ms = round(duracion, 2)
+            self.tiempo_volcado_ms += duracion
+        return len(filas)
+
+    def purgar(self):
+        """Elimina huellas caducadas y cubetas que ya estarían llenas."""
+        ahora = time.time()
+        llena_tras = self.rafaga / self.recarga if self.recarga else 3600
+        conn = self._conexion()
+        with conn:
+            conn.execute("DELETE FROM huellas WHERE expira <= ?", (ahora,))
+            conn.execute("DELETE FROM cubetas WHERE actualizado < ?", (ahora - llena_tras,))
+
+    # --- Métricas ---
+
+    def estadisticas(self):
+        conn = self._conexion()
+        profundidad, mas_antiguo = conn.execute("SELECT COUNT(*), MIN(recibido) FROM pendientes").fetchone()
+        with self._lock:
+            return {
+                'profundidad': profundidad,
+                'max_pendientes': self.max_pendientes,
+                'antiguedad_s': round(time.time() - mas_antiguo, 3) if mas_antiguo else 0,
+                'encolados': self.encolados,
+                'duplicados': self.duplicados,
+                'limitados': self.limitados,
+                'rechazados': self.rechazados,
+                'volcados': self.volcados,
+                'lotes': self.lotes,
+                'errores_volcado': self.errores_volcado,
+                'ultimo_volcado_ms': self.ultimo_volcado_ms,
+                'volcado_medio_ms': round(self.tiempo_volcado_ms / self.lotes, 2) if self.lotes else None,
+            }
+
+
+def obtener_cola_contacto():
+    """Cola de la app actual, o None si CONTACT_QUEUE_ENABLED está desactivado (INSERT síncrono)."""
+    return current_app.extensions.get('cola_contacto')
+
+
+def _reanudar_volcador():
+    cola = obtener_cola_contacto()
+    if cola is not None:
+        cola.reanudar()
+
+
+def init_cola_contacto(app):
+    if not app.config.get('CONTACT_QUEUE_ENABLED', True):
+        return
+    app.before_request(_reanudar_volcador)
+    app.extensions['cola_contacto'] = ColaContacto(
+        app.config['CONTACT_QUEUE_PATH'],
+        max_pendientes=app.config.get('CONTACT_QUEUE_MAX_PENDING', 10000),
+        tamano_lote=app.config.get('CONTACT_FLUSH_BATCH', 500),
+        intervalo=app.config.get('CONTACT_FLUSH_INTERVAL', 1.0),
+        rafaga=app.config.get('CONTACT_RATE_BURST', 5),
+        por_minuto=app.config.get('CONTACT_RATE_PER_MINUTE', 2.0),
+        ventana_duplicados=app.config.get('CONTACT_DEDUP_WINDOW', 3600),
+    )
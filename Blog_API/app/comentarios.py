@@ -0,0 +1,97 @@
+# Blog_API/app/comentarios.py
+# Comentarios en hilo de las entradas y su moderación.
+# - arbol_comentarios(): una página de hilos (comentarios raíz) con todas sus respuestas en una
+#   única consulta: una CTE recursiva que parte de las raíces de la página y baja por
+#   comentario_padre_id sólo a través de comentarios APROBADOS. El árbol se monta en Python en
+#   O(n) con un dict id -> nodo, sin recorrer la relación comentarios_hijos (N+1 por nivel).
+# - moderar(): cambia el estado de muchos comentarios con un único UPDATE ... WHERE id IN (...)
+#   y recalcula Entrada.num_comentarios de las entradas afectadas, de modo que los listados
+#   dan el número de comentarios sin leer la tabla comentarios.
+from sqlalchemy import select, update, func
+from sqlalchemy.orm import aliased
+from .models import db, Entrada, Comentario
+from .cache import marcar_modificado
+from .snapshot import marcar_entradas
+
+ESTADOS_COMENTARIO = ('PENDIENTE', 'APROBADO', 'SPAM')
+ESTADO_PUBLICO = 'APROBADO'
+# Representación pública: sin email del autor ni estado (sólo se publican los aprobados)
+CAMPOS_COMENTARIO = ('id', 'comentario_padre_id', 'nombre_autor', 'sitio_web_autor', 'contenido', 'fecha_creacion')
+MAX_IDS_MODERACION = 1000
+
+
+def arbol_comentarios(entrada_id, limite, despues=None):
+    """
+    Hilos de comentarios aprobados de una entrada, en orden de id (cronológico).
+    Cada nodo lleva sus respuestas en 'respuestas'. Pagina sobre los hilos: `despues` es el
+    id del último hilo de la página anterior. Devuelve (hilos, siguiente_cursor | None).
+    """
+    # limite + 1 raíces para saber si hay página siguiente sin un COUNT(*)
+    raices = select(Comentario.id).where(
+        Comentario.entrada_id == entrada_id,
+        Comentario.estado == ESTADO_PUBLICO,
+        Comentario.comentario_padre_id.is_(None)
+    )
+    if despues is not None:
+        raices = raices.where(Comentario.id > despues)
+    # Tabla derivada en lugar de IN (...): MySQL no admite LIMIT en una subconsulta IN
+    pagina = raices.order_by(Comentario.id).limit(limite + 1).subquery('pagina')
+
+    arbol = select(*[getattr(Comentario, c) for c in CAMPOS_COMENTARIO]).join(
+        pagina, pagina.c.id == Comentario.id
+    ).cte('arbol', recursive=True)
+    respuesta = aliased(Comentario)
+    arbol = arbol.union_all(
+        select(*[getattr(respuesta, c) for c in CAMPOS_COMENTARIO]).join(
+            arbol, respuesta.comentario_padre_id == arbol.c.id
+        ).where(respuesta.estado == ESTADO_PUBLICO)
+    )
+    filas = db.session.execute(select(arbol).order_by(arbol.c.id)).all()
+
+    nodos = {fila.id: dict(zip(CAMPOS_COMENTARIO, fila), respuestas=[]) for fila in filas}
+    hilos = []
+    for nodo in nodos.values():
+        padre = nodos.get(nodo['comentario_padre_id'])
+        (padre['respuestas'] if padre is not None else hilos).append(nodo)
+
+    siguiente_cursor = None
+    if len(hilos) > limite:
+        hilos = hilos[:limite]
+        siguiente_cursor = hilos[-1]['id']
+    return hilos, siguiente_cursor
+
+
+def recalcular_num_comentarios(entrada_ids=None):
+    """
+    Actualiza Entrada.num_comentarios con un UPDATE correlacionado (sin confirmar).
+    Sin `entrada_ids` recalcula todas las entradas.
+    """
+    aprobados = select(func.count(Comentario.id)).where(
+        Comentario.entrada_id == Entrada.id,
+        Comentario.estado == ESTADO_PUBLICO
+    ).scalar_subquery()
+    sentencia = update(Entrada).values(num_comentarios=aprobados)
+    if entrada_ids is not None:
+        sentencia = sentencia.where(Entrada.id.in_(entrada_ids))
+    db.session.execute(sentencia, execution_options={'synchronize_session': False})
+    marcar_modificado(db.session, Entrada.__tablename__)
+
+
+def moderar(ids, estado):
+    """
+    Pone `estado` a los comentarios `ids` con un único UPDATE y confirma.
+    Devuelve el número de comentarios que cambiaron de estado.
+    """
+    cambian = (Comentario.id.in_(ids), Comentario.estado != estado)
+    entrada_ids = db.session.execute(select(Comentario.entrada_id).where(*cambian).distinct()).scalars().all()
+    if not entrada_ids:
+        return 0
+    resultado = db.session.execute(
+        update(Comentario).where(*cambian).values(estado=estado),
+        execution_options={'synchronize_session': False}
+    )
+    marcar_modificado(db.session, Comentario.__tablename__)
+    recalcular_num_comentarios(entrada_ids)
+    marcar_entradas(db.session, entrada_ids)
+    db.session.commit()
+    return resultado.rowcount
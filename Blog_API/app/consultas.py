@@ -0,0 +1,113 @@
+# Blog_API/app/consultas.py
+# Contador de consultas SQL por petición, enganchado a los eventos del engine de SQLAlchemy.
+# Sirve para detectar regresiones N+1: cada petición sabe cuántas sentencias emitió (y cuánto
+# tiempo pasó esperando a la BD) y las pruebas pueden acotar ese número con ContadorConsultas.
+import threading
+import time
+from flask import g, has_app_context
+from sqlalchemy import event
+
+_local = threading.local()
+# Funciones (sentencia, parametros, executemany, duracion) llamadas tras cada consulta (ver perfilado.py)
+_observadores = []
+
+
+def observar_consultas(fn):
+    if fn not in _observadores:
+        _observadores.append(fn)
+    return fn
+
+
+def _contadores_activos():
+    if not hasattr(_local, 'contadores'):
+        _local.contadores = []
+    return _local.contadores
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_app_context():
+        g.num_consultas = g.get('num_consultas', 0) + 1
+    for contador in _contadores_activos():
+        contador.sentencias.append(statement)
+    conn.info.setdefault('inicio_consultas', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    inicios = conn.info.get('inicio_consultas')
+    if not inicios:
+        return
+    duracion = time.perf_counter() - inicios.pop()
+    if has_app_context():
+        g.tiempo_db = g.get('tiempo_db', 0.0) + duracion
+    for observador in _observadores:
+        observador(statement, parameters, executemany, duracion)
+
+
+def _handle_error(contexto):
+    # Una sentencia que falla no dispara after_cursor_execute: se descarta su marca de inicio
+    conn = contexto.connection
+    if conn is not None and conn.info.get('inicio_consultas'):
+        conn.info['inicio_consultas'].pop()
+
+
+def consultas_peticion_actual():
+    """Número de sentencias SQL emitidas en la petición (o contexto de app) actual."""
+    return g.get('num_consultas', 0) if has_app_context() else 0
+
+
+def tiempo_db_peticion_actual():
+    """Segundos acumulados ejecutando sentencias SQL en la petición actual."""
+    return g.get('tiempo_db', 0.0) if has_app_context() else 0.0
+
+
+class ContadorConsultas:
+    """
+    Cuenta las sentencias SQL ejecutadas dentro del bloque `with` en el hilo actual.
+    Con `maximo` lanza AssertionError al salir si se supera, p. ej.:
+
+        with ContadorConsultas(maximo=4):
+            client.get('/entradas?limit=100')
+    """
+
+    def __init__(self, maximo=None):
+        self.maximo = maximo
+        self.sentencias = []
+
+    @property
+    def total(self):
+        return len(self.sentencias)
+
+    def __enter__(self):
+        _contadores_activos().append(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _contadores_activos().remove(self)
+        if exc_type is None and self.maximo is not None and self.total > self.maximo:
+            detalle = '\n'.join(self.sentencias)
+            raise AssertionError(f"Se esperaban como máximo {self.maximo} consultas y se ejecutaron {self.total}:\n{detalle}")
+        return False
+
+
+def init_contador_consultas(app, db):
+    """Registra el listener en el engine y, si QUERY_COUNT_HEADER está activo, expone X-Query-Count."""
+    with app.app_context():
+        # Todos los engines: las lecturas pueden ir a una réplica (replicas.py)
+        for engine in db.engines.values():
+            for nombre, listener in (('before_cursor_execute', _before_cursor_execute),
+                                     ('after_cursor_execute', _after_cursor_execute),
+                                     ('handle_error', _handle_error)):
+                if not event.contains(engine, nombre, listener):
+                    event.listen(engine, nombre, listener)
+
+    @app.before_request
+    def _reiniciar_num_consultas():
+        # El contexto de app puede reutilizarse (p. ej. en pruebas con un contexto ya activo)
+        g.num_consultas = 0
+        g.tiempo_db = 0.0
+
+    @app.after_request
+    def _cabecera_num_consultas(response):
+        if app.config.get('QUERY_COUNT_HEADER'):
+            response.headers['X-Query-Count'] = str(consultas_peticion_actual())
+        return response
@@ -0,0 +1,96 @@
+# Blog_API/app/contrasenas.py
+# Hash de contraseñas con bcrypt fuera del hilo de la petición.
+# bcrypt libera el GIL, así que un pool pequeño de hilos limita cuántos hashes se calculan a la vez
+# (BCRYPT_MAX_CONCURRENCY) y una cola acotada (BCRYPT_MAX_PENDING) rechaza el exceso con 503
+# en lugar de dejar a todos los workers atascados en /login mientras las lecturas esperan.
+# Un hash que no termina en BCRYPT_TIMEOUT segundos también responde 503; su plaza queda ocupada
+# hasta que el hilo termina, para que el límite siga reflejando el trabajo real del pool.
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as TiempoAgotado
+from flask import current_app
+
+
+class SaturacionHash(RuntimeError):
+    """Hay demasiados hashes de contraseña pendientes; el cliente debe reintentar más tarde."""
+
+
+class EjecutorHash:
+    def __init__(self, max_concurrencia=2, max_pendientes=16, timeout=10):
+        self.max_concurrencia = max_concurrencia
+        self.max_pendientes = max_pendientes
+        self.timeout = timeout
+        self._plazas = threading.BoundedSemaphore(max_concurrencia + max_pendientes)
+        self._pool = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _obtener_pool(self):
+        # Los hilos no sobreviven a un fork: cada worker de gunicorn crea su propio pool
+        with self._lock:
+            if self._pool is None or self._pid != os.getpid():
+                self._pool = ThreadPoolExecutor(max_workers=self.max_concurrencia, thread_name_prefix='bcrypt')
+                self._pid = os.getpid()
+            return self._pool
+
+    def ejecutar(self, fn, *args):
+        if not self._plazas.acquire(blocking=False):
+            raise SaturacionHash('Demasiadas operaciones de contraseña en curso.')
+        try:
+            futuro = self._obtener_pool().submit(fn, *args)
+        except BaseException:
+            self._plazas.release()
+            raise
+        # La plaza se devuelve cuando la tarea termina o se cancela, no cuando la petición deja de esperar
+        futuro.add_done_callback(lambda _: self._plazas.release())
+        try:
+            return futuro.result(timeout=self.timeout)
+        except TiempoAgotado:
+            # Si aún estaba en cola ya no se ejecuta; si está en marcha, termina en segundo plano
+            futuro.cancel()
+            raise SaturacionHash('La operación de contraseña no terminó a tiempo.')
+
+
+def obtener_ejecutor():
+    ejecutor = current_app.extensions.get('ejecutor_hash')
+    if ejecutor is None:
+        ejecutor = current_app.extensions['ejecutor_hash'] = EjecutorHash(
+            max_concurrencia=current_app.config.get('BCRYPT_MAX_CONCURRENCY', 2),
+            max_pendientes=current_app.config.get('BCRYPT_MAX_PENDING', 16),
+            timeout=current_app.config.get('BCRYPT_TIMEOUT', 10)
+        )
+    return ejecutor
+
+
+def coste_de(hash_guardado):
+    """Factor de coste de un hash bcrypt ('$2b$12$...' -> 12), o None si no es bcrypt."""
+    try:
+        return int(hash_guardado.split('$')[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+def coste_configurado():
+    return current_app.config.get('BCRYPT_LOG_ROUNDS', 12)
+
+
+def generar_hash(password):
+    from app.app import bcrypt  # Import aquí, no arriba
+    return obtener_ejecutor().ejecutar(bcrypt.generate_password_hash, password).decode('utf-8')
+
+
+def verificar_hash(hash_guardado, password):
+    from app.app import bcrypt  # Import aquí, no arriba
+    return obtener_ejecutor().ejecutar(bcrypt.check_password_hash, hash_guardado, password)
+
+
+def verificar_ficticio(password):
+    """
+    Para emails desconocidos: verifica contra un hash ficticio con el coste actual, de modo que
+    la respuesta tarda lo mismo que con un email existente y no revela qué cuentas existen.
+    """
+    ficticio = current_app.extensions.get('hash_ficticio')
+    if ficticio is None or coste_de(ficticio) != coste_configurado():
+        ficticio = current_app.extensions['hash_ficticio'] = generar_hash(os.urandom(16).hex())
+    verificar_hash(ficticio, password)
+    return False
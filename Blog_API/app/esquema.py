@@ -0,0 +1,110 @@
+# Blog_API/app/esquema.py
+# Actualización del esquema de una base de datos existente. db.create_all() sólo crea las tablas que
+# faltan: no añade columnas ni índices a las tablas que ya existen.
+# `flask actualizar-esquema` compara la base con los modelos (inspector de SQLAlchemy) y aplica lo que
+# falte, en este orden por tabla: la tabla completa si no existe, las columnas de COLUMNAS_NUEVAS (con
+# el relleno de las filas existentes) y los índices declarados en los modelos (FULLTEXT sólo en MySQL).
+# Se puede ejecutar cuantas veces se quiera; con --sql imprime el SQL pendiente sin ejecutarlo.
+import json
+import click
+from sqlalchemy import inspect, create_mock_engine
+from .models import db
+from .comentarios import recalcular_num_comentarios
+
+# Columnas añadidas a tablas que ya existían: {tabla: ((columna, definición, definición en SQLite, relleno))}.
+# SQLite no admite ADD COLUMN con un DEFAULT no constante: la columna se crea con uno fijo y el relleno
+# le da su valor. Sin definición para SQLite se usa la general; el relleno es opcional.
+COLUMNAS_NUEVAS = {
+    'autor': (
+        # Versión de los JWT del autor (claim 'tv'); los tokens emitidos antes llevan 0
+        ('token_version', 'INTEGER NOT NULL DEFAULT 0', None, None),
+        # Validadores de GET condicional de /autores y /categorias
+        ('fecha_actualizacion', 'TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP',
+         "TIMESTAMP NOT NULL DEFAULT '1970-01-01 00:00:00'",
+         'UPDATE autor SET fecha_actualizacion = CURRENT_TIMESTAMP'),
+    ),
+    'entradas': (
+        # Número de comentarios aprobados (lo mantiene comentarios.moderar)
+        ('num_comentarios', 'INTEGER NOT NULL DEFAULT 0', None,
+         "UPDATE entradas SET num_comentarios = (SELECT COUNT(*) FROM comentarios "
+         "WHERE comentarios.entrada_id = entradas.id AND comentarios.estado = 'APROBADO')"),
+    ),
+    'categorias': (
+        ('fecha_actualizacion', 'TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP',
+         "TIMESTAMP NOT NULL DEFAULT '1970-01-01 00:00:00'",
+         'UPDATE categorias SET fecha_actualizacion = CURRENT_TIMESTAMP'),
+    ),
+}
+
+
+def _ddl(conexion, crear):
+    """Sentencias que `crear(bind)` emitiría en el dialecto de `conexion`, como texto (respeta ddl_if)."""
+    sentencias = []
+    simulado = create_mock_engine(
+        conexion.engine.url, lambda sql, *args, **kwargs: sentencias.append(str(sql.compile(dialect=simulado.dialect)).strip())
+    )
+    crear(simulado)
+    return sentencias
+
+
+def pasos_pendientes(conexion):
+    """[(descripción, [sentencias SQL])] de lo que falta en la base de `conexion`, en orden de aplicación."""
+    inspector = inspect(conexion)
+    tablas = set(inspector.get_table_names())
+    sqlite = conexion.dialect.name == 'sqlite'
+    pasos = []
+    for tabla in db.metadata.sorted_tables:
+        if tabla.name not in tablas:
+            pasos.append((f'tabla {tabla.name}', _ddl(conexion, tabla.create)))
+            continue
+        columnas = {c['name'] for c in inspector.get_columns(tabla.name)}
+        for columna, definicion, definicion_sqlite, relleno in COLUMNAS_NUEVAS.get(tabla.name, ()):
+            if columna not in columnas:
+                definicion = definicion_sqlite if sqlite and definicion_sqlite else definicion
+                sentencias = [f'ALTER TABLE {tabla.name} ADD COLUMN {columna} {definicion}']
+                if relleno:
+                    sentencias.append(relleno)
+                pasos.append((f'columna {tabla.name}.{columna}', sentencias))
+        indices = {i['name'] for i in inspector.get_indexes(tabla.name)}
+        for indice in sorted(tabla.indexes, key=lambda i: i.name):
+            if indice.name not in indices:
+                sentencias = _ddl(conexion, indice.create)
+                # Vacío si el índice no aplica a este motor (FULLTEXT fuera de MySQL)
+                if sentencias:
+                    pasos.append((f'índice {indice.name}', sentencias))
+    return pasos
+
+
+def actualizar_esquema(conexion):
+    """Aplica los pasos pendientes en `conexion` y devuelve sus descripciones."""
+    pasos = pasos_pendientes(conexion)
+    for _, sentencias in pasos:
+        for sentencia in sentencias:
+            # Sin parámetros: los literales ('00:00:00') no se interpretan como marcadores
+            conexion.exec_driver_sql(sentencia)
+    return [descripcion for descripcion, _ in pasos]
+
+
+def init_esquema(app):
+    """Registra `flask actualizar-esquema` y `flask recalcular-comentarios`."""
+
+    @app.cli.command('actualizar-esquema')
+    @click.option('--sql', 'solo_sql', is_flag=True, help='Imprime el SQL pendiente sin ejecutarlo.')
+    def actualizar_esquema_comando(solo_sql):
+        """Crea en una base existente las tablas, columnas e índices que falten."""
+        with db.engine.begin() as conexion:
+            if solo_sql:
+                for descripcion, sentencias in pasos_pendientes(conexion):
+                    click.echo(f'-- {descripcion}')
+                    for sentencia in sentencias:
+                        click.echo(f'{sentencia};')
+                return
+            aplicados = actualizar_esquema(conexion)
+        click.echo(json.dumps({'aplicados': aplicados}, ensure_ascii=False))
+
+    @app.cli.command('recalcular-comentarios')
+    def recalcular_comentarios_comando():
+        """Recalcula Entrada.num_comentarios de todas las entradas (p. ej. tras cambios hechos fuera de la API)."""
+        recalcular_num_comentarios()
+        db.session.commit()
+        click.echo('num_comentarios recalculado.')
@@ -0,0 +1,118 @@
+# Blog_API/app/lotes.py
+# POST /batch: varias lecturas de la API en una sola petición HTTP. Una página del frontend que pide
+# categorías, entradas y autores paga una sola vez el viaje de red, la conexión y el preflight CORS.
+# - Cada subpetición se despacha dentro del proceso (full_dispatch_request) con su propio contexto de
+#   aplicación: tiene su g y su sesión como una petición normal, pasa por los mismos hooks (métricas,
+#   caché de respuestas, réplicas) y hereda Authorization y cookies de la petición de lote.
+# - Sólo GET y sólo rutas de main_bp. Las subpeticiones idénticas (misma ruta y argumentos, en
+#   cualquier orden) se ejecutan una vez y comparten la respuesta. Es la única deduplicación: las
+#   consultas auxiliares que repiten rutas distintas (p. ej. la categoría de /categorias/<slug>/entradas
+#   y el listado /categorias) se ejecutan en cada una, cada subpetición con su propia sesión; entre
+#   lotes ya las comparte la caché de respuestas.
+# - Los cuerpos JSON se incrustan tal cual en la respuesta del lote, sin decodificarlos y volver a
+#   codificarlos.
+from urllib.parse import urlsplit, parse_qsl, urlencode
+from flask import current_app, request
+from werkzeug.exceptions import HTTPException
+from werkzeug.test import EnvironBuilder
+from .cache import CABECERAS_CACHEADAS
+
+# Cabeceras de la petición de lote que reciben las subpeticiones
+CABECERAS_HEREDADAS = ('Authorization', 'Cookie', 'Accept', 'Accept-Language', 'User-Agent')
+CABECERAS_LOTE = CABECERAS_CACHEADAS + ('X-Cache',)
+
+
+class LoteInvalido(ValueError):
+    """El cuerpo de POST /batch no tiene el formato esperado."""
+
+
+def leer_peticiones(datos, maximo):
+    """Valida {'peticiones': [{'id'?, 'metodo'?, 'ruta'}]}. Devuelve [(id, ruta)]."""
+    peticiones = datos.get('peticiones') if isinstance(datos, dict) else None
+    if not isinstance(peticiones, list) or not peticiones:
+        raise LoteInvalido('El cuerpo debe incluir "peticiones", una lista no vacía.')
+    if len(peticiones) > maximo:
+        raise LoteInvalido(f'Un lote admite como máximo {maximo} peticiones.')
+    leidas = []
+    for i, peticion in enumerate(peticiones):
+        if not isinstance(peticion, dict):
+            raise LoteInvalido(f'La petición {i} debe ser un objeto.')
+        ruta = peticion.get('ruta')
+        if not isinstance(ruta, str) or not ruta.startswith('/'):
+            raise LoteInvalido(f'La petición {i} necesita una "ruta" que empiece por "/".')
+        if str(peticion.get('metodo', 'GET')).upper() != 'GET':
+            raise LoteInvalido(f'La petición {i}: sólo se admiten subpeticiones GET.')
+        leidas.append((peticion.get('id', i), ruta))
+    return leidas
+
+
+def _clave(ruta):
+    """Ruta con los argumentos ordenados, como la clave de la caché de respuestas."""
+    partes = urlsplit(ruta)
+    return f"{partes.path}?{urlencode(sorted(parse_qsl(partes.query, keep_blank_values=True)))}"
+
+
+def _es_de_blueprint(ruta, blueprint):
+    adaptador = current_app.url_map.bind('localhost')
+    try:
+        endpoint, _ = adaptador.match(urlsplit(ruta).path, method='GET')
+    except HTTPException:
+        # 404 / 405: se deja que el despacho genere la respuesta de error habitual
+        return True
+    return endpoint.startswith(f'{blueprint}.')
+
+
+def _entorno(ruta):
+    """Entorno WSGI de GET `ruta` con el host, la IP y las CABECERAS_HEREDADAS de la petición de lote."""
+    constructor = EnvironBuilder(
+        path=ruta, method='GET', base_url=request.host_url,
+        headers={k: request.headers[k] for k in CABECERAS_HEREDADAS if k in request.headers},
+        environ_base={'REMOTE_ADDR': request.remote_addr},
+    )
+    try:
+        return constructor.get_environ()
+    finally:
+        constructor.close()
+
+
+def _despachar(ruta):
+    """Ejecuta GET `ruta` dentro del proceso. Devuelve (status, cabeceras, tipo, cuerpo)."""
+    with current_app.app_context(), current_app.request_context(_entorno(ruta)):
+        try:
+            response = current_app.full_dispatch_request()
+        except Exception as e:
+            current_app.logger.error(f"Error en la subpetición de lote {ruta}: {str(e)}")
+            return 500, {}, None, None
+        # Dentro del contexto: los streams (stream_with_context) se consumen aquí
+        cuerpo = response.get_data()
+        cabeceras_respuesta = {k: v for k, v in response.headers.items() if k in CABECERAS_LOTE}
+        return response.status_code, cabeceras_respuesta, response.mimetype, cuerpo
+
+
+def _fragmento(id_peticion, status, cabeceras, tipo, cuerpo):
+    """Elemento de 'respuestas' ya codificado. Un cuerpo JSON se incrusta sin volver a codificarlo."""
+    proveedor = current_app.json
+    if not cuerpo:
+        valor = b'null'
+    elif tipo == 'application/json':
+        valor = cuerpo
+    else:
+        valor = proveedor.dumps(cuerpo.decode('utf-8', 'replace')).encode('utf-8')
+    cabecera = proveedor.dumps({'id': id_peticion, 'status': status, 'cabeceras': cabeceras}).encode('utf-8')
+    # '{...}' -> '{..., "cuerpo": <valor>}'
+    return cabecera[:-1] + b',"cuerpo":' + valor + b'}'
+
+
+def ejecutar_lote(peticiones, blueprint):
+    """Despacha las subpeticiones en orden y devuelve el cuerpo JSON del lote (bytes)."""
+    resultados = {}
+    fragmentos = []
+    for id_peticion, ruta in peticiones:
+        if not _es_de_blueprint(ruta, blueprint):
+            fragmentos.append(_fragmento(id_peticion, 404, {}, None, None))
+            continue
+        clave = _clave(ruta)
+        if clave not in resultados:
+            resultados[clave] = _despachar(ruta)
+        fragmentos.append(_fragmento(id_peticion, *resultados[clave]))
+    return b'{"respuestas":[' + b','.join(fragmentos) + b']}'
@@ -0,0 +1,225 @@
+# Blog_API/app/metricas.py
+# Métricas en formato de texto de Prometheus para GET /metrics.
+# Por petición se registran: contador por endpoint / método / estado, histograma de latencia,
+# número de consultas SQL y tiempo total en la BD (ver consultas.py). Además se mide la espera
+# al pedir una conexión al pool. El estado de la caché de respuestas, del pool y de la cola de
+# contacto se lee en el momento del scrape, así que no añade trabajo a las peticiones.
+# Los valores son del proceso: con varios workers de gunicorn cada uno expone los suyos
+# (Prometheus debe scrapear cada worker o usar un único proceso por contenedor).
+import bisect
+import threading
+import time
+from flask import g, request, current_app
+from .consultas import consultas_peticion_actual, tiempo_db_peticion_actual
+
+LIMITES_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LIMITES_CONSULTAS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+LIMITES_ESPERA_POOL = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+CONTENT_TYPE_PROMETHEUS = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escapar(valor):
+    return str(valor).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _etiquetas(nombres, valores, extra=''):
+    pares = [f'{n}="{_escapar(v)}"' for n, v in zip(nombres, valores)]
+    if extra:
+        pares.append(extra)
+    return '{' + ','.join(pares) + '}' if pares else ''
+
+
+def _numero(valor):
+    if valor == float('inf'):
+        return '+Inf'
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+class Contador:
+    tipo = 'counter'
+
+    def __init__(self, nombre, ayuda, etiquetas=()):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = etiquetas
+        self._valores = {}
+        self._lock = threading.Lock()
+
+    def inc(self, valores=(), n=1):
+        with self._lock:
+            self._valores[valores] = self._valores.get(valores, 0) + n
+
+    def lineas(self):
+        with self._lock:
+            valores = sorted(self._valores.items())
+        for clave, valor in valores:
+            yield f'{self.nombre}{_etiquetas(self.etiquetas, clave)} {_numero(valor)}'
+
+
+class Histograma:
+    tipo = 'histogram'
+
+    def __init__(self, nombre, ayuda, etiquetas=(), limites=LIMITES_LATENCIA):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = etiquetas
+        self.limites = tuple(limites)
+        self._series = {}  # valores de etiquetas -> [cubos..., suma, cuenta]
+        self._lock = threading.Lock()
+
+    def observar(self, valores, valor):
+        indice = bisect.bisect_left(self.limites, valor)
+        with self._lock:
+            serie = self._series.get(valores)
+            if serie is None:
+                serie = self._series[valores] = [0] * (len(self.limites) + 3)
+            serie[indice] += 1
+            serie[-2] += valor
+            serie[-1] += 1
+
+    def lineas(self):
+        with self._lock:
+            series = sorted((clave, list(serie)) for clave, serie in self._series.items())
+        for clave, serie in series:
+            acumulado = 0
+            for limite, cuenta in zip(self.limites + (float('inf'),), serie[:-2]):
+                acumulado += cuenta
+                le = 'le="%s"' % _numero(limite)
+                yield f'{self.nombre}_bucket{_etiquetas(self.etiquetas, clave, le)} {acumulado}'
+            yield f'{self.nombre}_sum{_etiquetas(self.etiquetas, clave)} {_numero(serie[-2])}'
+            yield f'{self.nombre}_count{_etiquetas(self.etiquetas, clave)} {serie[-1]}'
+
+
+class RegistroMetricas:
+    def __init__(self):
+        self.metricas = []
+        self.colectores = []
+        self.peticiones = self._registrar(Contador(
+            'blog_http_peticiones_total', 'Peticiones HTTP atendidas.', ('endpoint', 'metodo', 'estado')))
+        self.latencia = self._registrar(Histograma(
+            'blog_http_duracion_segundos', 'Tiempo hasta generar la respuesta.', ('endpoint', 'metodo')))
+        self.consultas = self._registrar(Histograma(
+            'blog_db_consultas_por_peticion', 'Sentencias SQL emitidas por petición.', ('endpoint',), LIMITES_CONSULTAS))
+        self.tiempo_db = self._registrar(Histograma(
+            'blog_db_tiempo_por_peticion_segundos', 'Tiempo total ejecutando SQL por petición.', ('endpoint',)))
+        self.espera_pool = self._registrar(Histograma(
+            'blog_db_pool_espera_segundos', 'Espera al obtener una conexión del pool.', (), LIMITES_ESPERA_POOL))
+
+    def _registrar(self, metrica):
+        self.metricas.append(metrica)
+        return metrica
+
+    def colector(self, fn):
+        """Registra una función que devuelve [(nombre, tipo, ayuda, [(etiquetas_dict, valor)])] en cada scrape."""
+        self.colectores.append(fn)
+        return fn
+
+    def exponer(self):
+        lineas = []
+        for metrica in self.metricas:
+            lineas.append(f'# HELP {metrica.nombre} {metrica.ayuda}')
+            lineas.append(f'# TYPE {metrica.nombre} {metrica.tipo}')
+            lineas.extend(metrica.lineas())
+        for colector in self.colectores:
+            try:
+                familias = colector()
+            except Exception as e:
+                current_app.logger.warning(f"No se pudieron leer métricas de {colector.__name__}: {str(e)}")
+                continue
+            for nombre, tipo, ayuda, muestras in familias:
+                lineas.append(f'# HELP {nombre} {ayuda}')
+                lineas.append(f'# TYPE {nombre} {tipo}')
+                for etiquetas, valor in muestras:
+                    if valor is None:
+                        continue
+                    lineas.append(f'{nombre}{_etiquetas(tuple(etiquetas), tuple(etiquetas.values()))} {_numero(valor)}')
+        return '\n'.join(lineas) + '\n'
+
+
+def obtener_metricas():
+    return current_app.extensions.get('metricas')
+
+
+def _colector_pool(engine):
+    def pool_bd():
+        pool = engine.pool
+        muestras = []
+        for nombre, metodo, ayuda in (
+            ('blog_db_pool_tamano', 'size', 'Tamaño configurado del pool.'),
+            ('blog_db_pool_en_uso', 'checkedout', 'Conexiones prestadas en este momento.'),
+            ('blog_db_pool_libres', 'checkedin', 'Conexiones disponibles en el pool.'),
+            ('blog_db_pool_desbordamiento', 'overflow', 'Conexiones por encima de pool_size.'),
+        ):
+            if hasattr(pool, metodo):
+                muestras.append((nombre, 'gauge', ayuda, [({}, getattr(pool, metodo)())]))
+        return muestras
+    return pool_bd
+
+
+def _colector_cache():
+    from .cache import obtener_cache
+    cache = obtener_cache()
+    if cache is None:
+        return []
+    e = cache.estadisticas()
+    etiquetas = {'backend': e['backend']}
+    return [
+        ('blog_cache_aciertos_total', 'counter', 'Aciertos de la caché de respuestas.', [(etiquetas, e['aciertos'])]),
+        ('blog_cache_fallos_total', 'counter', 'Fallos de la caché de respuestas.', [(etiquetas, e['fallos'])]),
+        ('blog_cache_ratio_aciertos', 'gauge', 'Aciertos / consultas a la caché.', [(etiquetas, e['ratio_aciertos'])]),
+        ('blog_cache_expulsiones_total', 'counter', 'Entradas expulsadas por tamaño.', [(etiquetas, e['expulsiones'])]),
+        ('blog_cache_invalidaciones_total', 'counter', 'Invalidaciones por escritura.', [(etiquetas, e['invalidaciones'])]),
+        ('blog_cache_entradas', 'gauge', 'Entradas guardadas en la caché.', [(etiquetas, e['entradas'])]),
+    ]
+
+
+def _colector_cola_contacto():
+    from .cola_contacto import obtener_cola_contacto
+    cola = obtener_cola_contacto()
+    if cola is None:
+        return []
+    e = cola.estadisticas()
+    familias = [
+        ('blog_contacto_cola_profundidad', 'gauge', 'Mensajes de contacto pendientes de volcar.', [({}, e['profundidad'])]),
+        ('blog_contacto_cola_antiguedad_segundos', 'gauge', 'Antigüedad del mensaje pendiente más antiguo.', [({}, e['antiguedad_s'])]),
+    ]
+    for clave in ('encolados', 'duplicados', 'limitados', 'rechazados', 'volcados', 'errores_volcado'):
+        familias.append((f'blog_contacto_{clave}_total', 'counter', f'Mensajes de contacto: {clave}.', [({}, e[clave])]))
+    if e['ultimo_volcado_ms'] is not None:
+        familias.append(('blog_contacto_ultimo_volcado_segundos', 'gauge', 'Duración del último volcado.',
+                         [({}, e['ultimo_volcado_ms'] / 1000)]))
+    return familias
+
+
+def init_metricas(app, db):
+    """Registra los hooks de petición, la instrumentación del pool y los colectores."""
+    if not app.config.get('METRICS_ENABLED', True):
+        return
+    registro = app.extensions['metricas'] = RegistroMetricas()
+    # La espera de checkout la mide pool_bd.py (init_pool se llama antes)
+    estadisticas_pool = app.extensions.get('pool_bd')
+    if estadisticas_pool is not None:
+        estadisticas_pool.observadores.append(lambda espera: registro.espera_pool.observar((), espera))
+    with app.app_context():
+        registro.colector(_colector_pool(db.engine))
+    registro.colector(_colector_cache)
+    registro.colector(_colector_cola_contacto)
+
+    @app.before_request
+    def _inicio_peticion():
+        g.inicio_peticion = time.perf_counter()
+
+    @app.after_request
+    def _registrar_peticion(response):
+        inicio = g.pop('inicio_peticion', None)
+        if inicio is None:
+            return response
+        endpoint = request.endpoint or 'sin_ruta'
+        if endpoint == 'main.metrics':
+            return response
+        registro.peticiones.inc((endpoint, request.method, str(response.status_code)))
+        registro.latencia.observar((endpoint, request.method), time.perf_counter() - inicio)
+        registro.consultas.observar((endpoint,), consultas_peticion_actual())
+        registro.tiempo_db.observar((endpoint,), tiempo_db_peticion_actual())
+        return response
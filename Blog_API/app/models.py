@@ -1,7 +1,10 @@
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
 from flask import current_app
-db = SQLAlchemy()
+from sqlalchemy.orm import load_only, selectinload
+from .replicas import SesionEnrutada
+# La sesión envía las lecturas de las peticiones GET a las réplicas, si las hay (ver replicas.py)
+db = SQLAlchemy(session_options={'class_': SesionEnrutada})
 class Autor(db.Model):
     __tablename__ = 'autor'
     id = db.Column(db.Integer, primary_key=True)
@@ -10,18 +13,33 @@ class Autor(db.Model):
     contrasena = db.Column(db.String(255), nullable=False) # Almacenará el hash
     biografia = db.Column(db.Text)
     is_admin = db.Column(db.Boolean, default=False, nullable=False) # Nuevo campo para admin
+    # Se incrementa al cambiar permisos o contraseña: invalida los JWT emitidos antes (claim 'tv')
+    token_version = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    # Validador para GET condicional de /autores (ETag / Last-Modified). En bases existentes la añade
+    # `flask actualizar-esquema` (ver esquema.py)
+    fecha_actualizacion = db.Column(db.TIMESTAMP, default=datetime.utcnow, onupdate=datetime.utcnow,
+                                    server_default=db.text('CURRENT_TIMESTAMP'), nullable=False)
 
     entradas = db.relationship('Entrada', backref='autor', lazy=True)
 
     def set_password(self, password):
-        """Hashea y guarda la contraseña."""
-        from app.app import bcrypt  # Import aquí, no arriba
-        self.contrasena = bcrypt.generate_password_hash(password).decode('utf-8')
+        """Hashea y guarda la contraseña (en el pool de bcrypt, con el coste configurado)."""
+        from .contrasenas import generar_hash
+        self.contrasena = generar_hash(password)
+
+    def revocar_tokens(self):
+        """Invalida todos los tokens emitidos hasta ahora para este autor."""
+        self.token_version = (self.token_version or 0) + 1
 
     def check_password(self, password):
         """Verifica la contraseña contra el hash almacenado."""
-        from app.app import bcrypt  # Import aquí, no arriba
-        return bcrypt.check_password_hash(self.contrasena, password)
+        from .contrasenas import verificar_hash
+        return verificar_hash(self.contrasena, password)
+
+    def necesita_rehash(self):
+        """True si el hash se generó con un coste distinto de BCRYPT_LOG_ROUNDS."""
+        from .contrasenas import coste_de, coste_configurado
+        return coste_de(self.contrasena) != coste_configurado()
 
     def __repr__(self):
         return f"<Autor {self.nombre}>"
@@ -43,6 +61,9 @@ class Categoria(db.Model):
     nombre_en = db.Column(db.String(100), nullable=True)
     nombre_de = db.Column(db.String(100), nullable=True)
     slug = db.Column(db.String(100), unique=True, nullable=False)
+    # Validador para GET condicional de /categorias (ETag / Last-Modified); ver esquema.py
+    fecha_actualizacion = db.Column(db.TIMESTAMP, default=datetime.utcnow, onupdate=datetime.utcnow,
+                                    server_default=db.text('CURRENT_TIMESTAMP'), nullable=False)
 
     entradas = db.relationship('Entrada', backref='categoria', lazy=True)
 
@@ -72,6 +93,13 @@ class Comentario(db.Model):
 
     comentarios_hijos = db.relationship('Comentario', remote_side=[id], backref='comentario_padre', lazy=True)
 
+    # Árbol de comentarios aprobados de una entrada (comentarios.py): raíces en orden de id y
+    # descenso por comentario_padre_id sin salir del índice
+    __table_args__ = (
+        db.Index('ix_comentarios_entrada_estado_padre_id', 'entrada_id', 'estado', 'comentario_padre_id', 'id'),
+        db.Index('ix_comentarios_padre_estado', 'comentario_padre_id', 'estado'),
+    )
+
     def __repr__(self):
         return f"<Comentario {self.id}>"
 
@@ -83,7 +111,9 @@ class Entrada(db.Model):
     titulo_es = db.Column(db.String(255), nullable=False)
     slug = db.Column(db.String(255), unique=True, nullable=False)
     resumen_es = db.Column(db.Text, nullable=False)
-    contenido_es = db.Column(db.Text, nullable=False)
+    # Los cuerpos de la entrada se cargan de forma diferida (grupo 'contenido'): los listados
+    # nunca los leen de MySQL y el detalle los pide explícitamente con undefer_group('contenido').
+    contenido_es = db.deferred(db.Column(db.Text, nullable=False), group='contenido')
     imagen_destacada = db.Column(db.String(255))
     estado = db.Column(db.Enum('borrador', 'publicado'), default='borrador', nullable=False)
     fecha_publicacion = db.Column(db.TIMESTAMP)
@@ -93,46 +123,104 @@ class Entrada(db.Model):
     titulo_de = db.Column(db.String(255), nullable=True)
     resumen_en = db.Column(db.Text, nullable=True)
     resumen_de = db.Column(db.Text, nullable=True)
-    contenido_en = db.Column(db.Text, nullable=True)
-    contenido_de = db.Column(db.Text, nullable=True)
+    contenido_en = db.deferred(db.Column(db.Text, nullable=True), group='contenido')
+    contenido_de = db.deferred(db.Column(db.Text, nullable=True), group='contenido')
+    # Número de comentarios APROBADOS, cacheado para que los listados no lean la tabla comentarios.
+    # Lo mantiene comentarios.recalcular_num_comentarios() en cada moderación.
+    num_comentarios = db.Column(db.Integer, default=0, server_default='0', nullable=False)
 
     comentarios = db.relationship('Comentario', backref='entrada', lazy=True)
     etiquetas = db.relationship('Etiqueta', secondary='entradas_etiquetas', backref=db.backref('entradas', lazy=True))
 
+    # Índices compuestos para la paginación por cursor de GET /entradas (orden fecha_publicacion DESC, id DESC).
+    # Cada filtro soportado tiene su propio índice con la columna filtrada como prefijo.
+    __table_args__ = (
+        db.Index('ix_entradas_fecha_id', 'fecha_publicacion', 'id'),
+        db.Index('ix_entradas_estado_fecha_id', 'estado', 'fecha_publicacion', 'id'),
+        db.Index('ix_entradas_categoria_fecha_id', 'categoria_id', 'fecha_publicacion', 'id'),
+        db.Index('ix_entradas_autor_fecha_id', 'autor_id', 'fecha_publicacion', 'id'),
+        # Feed público por categoría (sólo publicadas) y top-N por categoría de la portada
+        db.Index('ix_entradas_categoria_estado_fecha_id', 'categoria_id', 'estado', 'fecha_publicacion', 'id'),
+        # Feed de cambios (GET /entradas/cambios) y sincronización del índice de búsqueda
+        db.Index('ix_entradas_actualizacion_id', 'fecha_actualizacion', 'id'),
+        # Búsqueda de texto completo (sólo MySQL; en otros motores se usa el índice en memoria de busqueda.py).
+        # Las columnas deben coincidir con busqueda.COLUMNAS_TEXTO
+        db.Index(
+            'ft_entradas_busqueda',
+            'titulo_es', 'titulo_en', 'titulo_de', 'resumen_es', 'resumen_en', 'resumen_de',
+            'contenido_es', 'contenido_en', 'contenido_de', 'slug',
+            mysql_prefix='FULLTEXT'
+        ).ddl_if(dialect='mysql'),
+    )
+
     def __repr__(self):
         # Corregido: usar self.titulo_es (o el campo que exista)
         return f"<Entrada {self.titulo_es}>"
 
-    def serialize(self):
-        # Corregido: usar los campos correctos (ej. titulo_es en lugar de self.titulo)
-        return {
-            'id': self.id,
-            'autor_id': self.autor_id,
-            'categoria_id': self.categoria_id,
-            'titulo_es': self.titulo_es, # Ejemplo, podrías querer serializar todos los idiomas
-            'slug': self.slug,
-            'resumen_es': self.resumen_es,
-            'contenido_es': self.contenido_es,
-            'imagen_destacada': self.imagen_destacada,
-            'estado': self.estado,
-            'fecha_publicacion': self.fecha_publicacion.isoformat() if self.fecha_publicacion else None,
-            'fecha_creacion': self.fecha_creacion.isoformat() if self.fecha_creacion else None,
-            'fecha_actualizacion': self.fecha_actualizacion.isoformat() if self.fecha_actualizacion else None,
-            'titulo_en': self.titulo_en,
-            'titulo_de': self.titulo_de,
-            'resumen_en': self.resumen_en,
-            'resumen_de': self.resumen_de,
-            'contenido_en': self.contenido_en,
-            'contenido_de': self.contenido_de,
-            'comentarios': [comentario.id for comentario in self.comentarios],  
-            'etiquetas': [etiqueta.nombre for etiqueta in self.etiquetas]
-        }
+    def serialize(self, campos=None):
+        """
+        Serializa la entrada. Con `campos` (iterable de nombres de CAMPOS_ENTRADA) sólo se
+        incluyen esos campos; sin él se devuelve la representación completa.
+        """
+        if campos is None:
+            campos = CAMPOS_ENTRADA
+        return {campo: self._valor_serializado(campo) for campo in campos}
+
+    def _valor_serializado(self, campo):
+        if campo in CAMPOS_FECHA_ENTRADA:
+            valor = getattr(self, campo)
+            return valor.isoformat() if valor else None
+        if campo == 'comentarios':
+            return [comentario.id for comentario in self.comentarios]
+        if campo == 'etiquetas':
+            return [etiqueta.nombre for etiqueta in self.etiquetas]
+        return getattr(self, campo)
+
+    def serialize_resumen(self):
+        """Representación para listados: todo salvo los cuerpos contenido_* y los ids de comentarios."""
+        return self.serialize(CAMPOS_RESUMEN_ENTRADA)
+
+    @staticmethod
+    def opciones_carga(campos):
+        """
+        Opciones de consulta que limitan el SELECT a las columnas necesarias para `campos`.
+        id y fecha_publicacion se cargan siempre porque la paginación por cursor los necesita.
+        Las relaciones pedidas se cargan por lotes (una consulta IN por página y relación)
+        en lugar de una consulta perezosa por entrada.
+        """
+        columnas = {'id', 'fecha_publicacion'}
+        columnas.update(c for c in campos if c not in CAMPOS_RELACION_ENTRADA)
+        opciones = [load_only(*[getattr(Entrada, c) for c in sorted(columnas)])]
+        if 'comentarios' in campos:
+            opciones.append(selectinload(Entrada.comentarios).load_only(Comentario.id))
+        if 'etiquetas' in campos:
+            opciones.append(selectinload(Entrada.etiquetas).load_only(Etiqueta.nombre))
+        return opciones
+
+# Orden de los campos en la respuesta de Entrada.serialize()
+CAMPOS_ENTRADA = (
+    'id', 'autor_id', 'categoria_id', 'titulo_es', 'slug', 'resumen_es', 'contenido_es',
+    'imagen_destacada', 'estado', 'fecha_publicacion', 'fecha_creacion', 'fecha_actualizacion',
+    'titulo_en', 'titulo_de', 'resumen_en', 'resumen_de', 'contenido_en', 'contenido_de',
+    'num_comentarios', 'comentarios', 'etiquetas'
+)
+CAMPOS_CONTENIDO_ENTRADA = ('contenido_es', 'contenido_en', 'contenido_de')
+# Listados: sin los cuerpos ni la lista de ids de comentarios (num_comentarios ya da el número);
+# ambos se pueden pedir con ?fields=
+CAMPOS_RESUMEN_ENTRADA = tuple(c for c in CAMPOS_ENTRADA if c not in CAMPOS_CONTENIDO_ENTRADA + ('comentarios',))
+CAMPOS_RELACION_ENTRADA = ('comentarios', 'etiquetas')
+CAMPOS_FECHA_ENTRADA = ('fecha_publicacion', 'fecha_creacion', 'fecha_actualizacion')
 
 class EntradaEtiqueta(db.Model):
     __tablename__ = 'entradas_etiquetas'
     entrada_id = db.Column(db.Integer, db.ForeignKey('entradas.id'), primary_key=True)
     etiqueta_id = db.Column(db.Integer, db.ForeignKey('etiquetas.id'), primary_key=True)
 
+    # La PK empieza por entrada_id; para filtrar entradas por etiqueta hace falta el índice inverso.
+    __table_args__ = (
+        db.Index('ix_entradas_etiquetas_etiqueta_entrada', 'etiqueta_id', 'entrada_id'),
+    )
+
     def __repr__(self):
         return f"<EntradaEtiqueta Entrada_id: {self.entrada_id}, Etiqueta_id: {self.etiqueta_id}>"
 
@@ -145,6 +233,21 @@ class Etiqueta(db.Model):
     def __repr__(self):
         return f"<Etiqueta {self.nombre}>"
 
+class EntradaEliminada(db.Model):
+    """Lápida de una entrada borrada, para el feed de cambios (ver cambios.py)."""
+    __tablename__ = 'entradas_eliminadas'
+    id = db.Column(db.Integer, primary_key=True)
+    entrada_id = db.Column(db.Integer, nullable=False)
+    slug = db.Column(db.String(255), nullable=False)
+    fecha_eliminacion = db.Column(db.TIMESTAMP, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_entradas_eliminadas_fecha_id', 'fecha_eliminacion', 'id'),
+    )
+
+    def __repr__(self):
+        return f"<EntradaEliminada {self.entrada_id}>"
+
 class MensajeContacto(db.Model):
     __tablename__ = 'mensajes_contacto'
     id = db.Column(db.Integer, primary_key=True)
@@ -0,0 +1,173 @@
+# Blog_API/app/paginacion.py
+# Paginación por cursor (keyset) sobre (fecha_publicacion, id) para los listados públicos,
+# y paginación por páginas con total cacheado/estimado para los de administración.
+#
+# Cursor:
+# A diferencia de OFFSET, el coste de la página N es el mismo que el de la página 1:
+# la consulta siempre arranca desde el último par (fecha, id) visto gracias al índice compuesto.
+import base64
+from datetime import datetime
+from sqlalchemy import or_, and_, text
+
+LIMITE_POR_DEFECTO = 20
+LIMITE_MAXIMO = 100
+
+
+class CursorInvalido(ValueError):
+    """El cursor recibido en ?after= no se pudo decodificar."""
+
+
+def codificar_cursor(fecha, entrada_id):
+    """Genera un cursor opaco a partir de la última fila de la página."""
+    fecha_str = fecha.isoformat() if fecha else ''
+    crudo = f"{fecha_str}|{entrada_id}".encode('utf-8')
+    return base64.urlsafe_b64encode(crudo).decode('ascii').rstrip('=')
+
+
+def decodificar_cursor(cursor):
+    """Devuelve la tupla (fecha | None, id) codificada en el cursor."""
+    try:
+        relleno = '=' * (-len(cursor) % 4)
+        crudo = base64.urlsafe_b64decode(cursor + relleno).decode('utf-8')
+        fecha_str, id_str = crudo.split('|', 1)
+        fecha = datetime.fromisoformat(fecha_str) if fecha_str else None
+        return fecha, int(id_str)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise CursorInvalido(str(e))
+
+
+def aplicar_cursor(query, columna_fecha, columna_id, cursor):
+    """
+    Filtra la consulta para devolver sólo las filas posteriores al cursor en el orden
+    (fecha DESC, id DESC). Los NULL de fecha van al final tanto en MySQL como en SQLite.
+    Se usa la forma expandida con OR en lugar de la comparación de tuplas para que
+    MySQL pueda usar el índice compuesto como rango.
+    """
+    fecha, ultimo_id = decodificar_cursor(cursor)
+    if fecha is None:
+        return query.filter(columna_fecha.is_(None), columna_id < ultimo_id)
+    return query.filter(or_(
+        columna_fecha < fecha,
+        and_(columna_fecha == fecha, columna_id < ultimo_id),
+        columna_fecha.is_(None)
+    ))
+
+
+def ordenar_para_cursor(query, columna_fecha, columna_id):
+    return query.order_by(columna_fecha.desc(), columna_id.desc())
+
+
+def leer_limite(args, por_defecto=LIMITE_POR_DEFECTO, maximo=LIMITE_MAXIMO):
+    """Lee ?limit= de los argumentos de la petición. Devuelve None si está fuera de rango."""
+    limite = args.get('limit', por_defecto, type=int)
+    if limite is None or not (1 <= limite <= maximo):
+        return None
+    return limite
+
+
+def paginar_por_cursor(query, columna_fecha, columna_id, limite, cursor=None, entidad=None):
+    """
+    Ejecuta la consulta pidiendo limite + 1 filas para saber si hay página siguiente
+    sin necesidad de un COUNT(*). Devuelve (filas, siguiente_cursor | None).
+    Si cada fila es una tupla (p. ej. (Entrada, Autor.nombre)), `entidad` extrae de ella
+    el objeto que tiene las columnas del cursor.
+    """
+    if cursor:
+        query = aplicar_cursor(query, columna_fecha, columna_id, cursor)
+    filas = ordenar_para_cursor(query, columna_fecha, columna_id).limit(limite + 1).all()
+    siguiente = None
+    if len(filas) > limite:
+        filas = filas[:limite]
+        ultima = entidad(filas[-1]) if entidad else filas[-1]
+        siguiente = codificar_cursor(getattr(ultima, columna_fecha.key), getattr(ultima, columna_id.key))
+    return filas, siguiente
+
+
+# --- Paginación por páginas con total cacheado/estimado (listados de administración) ---
+
+MODOS_TOTAL = ('cacheado', 'exacto', 'estimado', 'ninguno')
+
+
+def leer_modo_total(args):
+    """?total=cacheado (por defecto) | exacto | estimado | ninguno. Devuelve None si no es válido."""
+    modo = args.get('total', 'cacheado').strip().lower()
+    return modo if modo in MODOS_TOTAL else None
+
+
+def total_cacheado(query, clave, tablas):
+    """
+    COUNT(*) de la consulta guardado en la caché de respuestas con las tablas como etiquetas,
+    así que cualquier escritura confirmada en ellas lo invalida (en todos los workers si el
+    backend es compartido). Sin caché se cuenta siempre.
+    """
+    from .cache import obtener_cache
+    cache = obtener_cache()
+    clave = f"total:{clave}"
+    if cache is not None:
+        try:
+            guardado = cache.get(clave)
+            if guardado is not None:
+                return int(guardado)
+        except Exception:
+            cache = None
+    total = query.order_by(None).count()
+    if cache is not None:
+        try:
+            cache.set(clave, str(total).encode('ascii'), tablas)
+        except Exception:
+            pass
+    return total
+
+
+def filas_estimadas(tabla):
+    """Número aproximado de filas según las estadísticas de MySQL (None en otros motores)."""
+    from .models import db
+    if db.engine.dialect.name != 'mysql':
+        return None
+    return db.session.execute(
+        text("SELECT TABLE_ROWS FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :tabla"),
+        {'tabla': tabla}
+    ).scalar()
+
+
+def paginar_con_total(query, page, per_page, modo, clave_total, tablas, filtrada=True):
+    """
+    Pagina con LIMIT/OFFSET pidiendo per_page + 1 filas para saber si hay más, y obtiene el total
+    según `modo`. 'estimado' sólo usa las estadísticas de la tabla si la consulta no está
+    filtrada (`filtrada=False`); si no, recurre al total cacheado.
+    Devuelve (items, total | None, has_more, total_estimado).
+    """
+    offset = (page - 1) * per_page
+    items = query.limit(per_page + 1).offset(offset).all()
+    has_more = len(items) > per_page
+    items = items[:per_page]
+
+    total = None
+    total_estimado = False
+    if modo == 'exacto':
+        total = query.order_by(None).count()
+    elif modo in ('cacheado', 'estimado'):
+        if modo == 'estimado' and not filtrada:
+            total = filas_estimadas(tablas[0])
+            total_estimado = total is not None
+        if total is None:
+            total = total_cacheado(query, clave_total, tablas)
+    if total is not None:
+        # Un total cacheado o estimado nunca puede contradecir lo que se acaba de leer
+        total = max(total, offset + len(items) + (1 if has_more else 0))
+    return items, total, has_more, total_estimado
+
+
+def metadatos_pagina(page, per_page, total, has_more, total_estimado):
+    """Campos de paginación de la respuesta (compatibles con ManagePostsPage.tsx)."""
+    if total is not None:
+        total_pages = -(-total // per_page)
+    else:
+        total_pages = page + 1 if has_more else page
+    return {
+        'total_pages': total_pages,
+        'current_page': page,
+        'total_items': total,
+        'has_more': has_more,
+        'total_estimado': total_estimado,
+    }
@@ -0,0 +1,218 @@
+# Blog_API/app/perfilado.py
+# Diagnóstico de rendimiento:
+# - Registro de consultas lentas: toda sentencia que tarde SLOW_QUERY_THRESHOLD_MS o más se
+#   escribe en el log con la forma de sus parámetros (tipos, nunca valores), la ruta y la línea
+#   de la app que la lanzó. Las últimas SLOW_QUERY_LOG_SIZE se consultan en /admin/consultas-lentas.
+# - Perfilador por petición, sólo para administradores y bajo demanda: con la cabecera
+#   "X-Perfil: 1" o el parámetro "?_perfil=1" la petición se ejecuta bajo cProfile. El perfil
+#   se guarda en PROFILE_DIR (.prof, abrible con pstats/snakeviz) y su id vuelve en X-Perfil-Id;
+#   con "texto" en lugar de "1" la respuesta es directamente el resumen del perfil.
+import cProfile
+import io
+import os
+import pstats
+import threading
+import time
+import traceback
+import uuid
+from collections import deque
+from datetime import datetime
+from flask import g, request, current_app, has_app_context, has_request_context
+from flask_jwt_extended import verify_jwt_in_request, get_jwt, get_jwt_identity
+from .consultas import observar_consultas
+
+DIRECTORIO_APP = os.path.dirname(os.path.abspath(__file__))
+# Módulos propios que no cuentan como "quien lanzó la consulta"
+MODULOS_INSTRUMENTACION = ('consultas.py', 'perfilado.py')
+LONGITUD_MAXIMA_SQL = 2000
+LINEAS_RESUMEN_PERFIL = 40
+
+
+def forma_parametros(parametros, executemany=False):
+    """Describe los parámetros sin sus valores: {'id': 'int'}, ['str', 'int'] o 'N filas x ...'."""
+    if executemany and isinstance(parametros, (list, tuple)):
+        if not parametros:
+            return '0 filas'
+        return f'{len(parametros)} filas x {forma_parametros(parametros[0])}'
+    if isinstance(parametros, dict):
+        return '{' + ', '.join(f'{k}: {type(v).__name__}' for k, v in parametros.items()) + '}'
+    if isinstance(parametros, (list, tuple)):
+        tipos = [type(v).__name__ for v in parametros]
+        if len(tipos) > 3 and len(set(tipos)) == 1:
+            # Listas IN (...) largas: basta con saber cuántos valores y de qué tipo
+            return f'[{len(tipos)} x {tipos[0]}]'
+        return '[' + ', '.join(tipos) + ']'
+    return type(parametros).__name__
+
+
+def origen_llamada():
+    """'routes.py:123 en get_entradas': el marco más interno de la app fuera de la instrumentación."""
+    for marco in reversed(traceback.extract_stack()):
+        if marco.filename.startswith(DIRECTORIO_APP) and os.path.basename(marco.filename) not in MODULOS_INSTRUMENTACION:
+            return f'{os.path.relpath(marco.filename, DIRECTORIO_APP)}:{marco.lineno} en {marco.name}'
+    return None
+
+
+class RegistroConsultasLentas:
+    def __init__(self, umbral_ms=200, tamano=100):
+        self.umbral = umbral_ms / 1000
+        self.recientes = deque(maxlen=tamano)
+        self.total = 0
+        self._lock = threading.Lock()
+
+    def observar(self, sentencia, parametros, executemany, duracion):
+        if duracion < self.umbral:
+            return
+        registro = {
+            'fecha': datetime.utcnow().isoformat(),
+            'duracion_ms': round(duracion * 1000, 2),
+            'sql': sentencia[:LONGITUD_MAXIMA_SQL],
+            'parametros': forma_parametros(parametros, executemany),
+            'ruta': f'{request.method} {request.path} ({request.endpoint})' if has_request_context() else None,
+            'origen': origen_llamada(),
+        }
+        with self._lock:
+            self.recientes.append(registro)
+            self.total += 1
+        current_app.logger.warning(
+            f"Consulta lenta ({registro['duracion_ms']} ms) en {registro['ruta'] or 'fuera de petición'} "
+            f"desde {registro['origen']}: {registro['sql']} | parámetros: {registro['parametros']}"
+        )
+
+    def serialize(self):
+        with self._lock:
+            return {
+                'umbral_ms': round(self.umbral * 1000, 3),
+                'total': self.total,
+                'recientes': list(reversed(self.recientes)),
+            }
+
+
+def obtener_consultas_lentas():
+    return current_app.extensions.get('consultas_lentas')
+
+
+def _perfil_pedido():
+    valor = request.headers.get('X-Perfil') or request.args.get('_perfil')
+    return valor.strip().lower() if valor else None
+
+
+def _es_admin():
+    """Comprueba el JWT igual que admin_required, pero sin responder 401/403: sólo decide si se perfila."""
+    from .autorizacion import token_vigente  # Import aquí, no arriba (autorizacion importa los modelos)
+    try:
+        verify_jwt_in_request(optional=True)
+        identidad = get_jwt_identity()
+        if identidad is None:
+            return False
+        claims = get_jwt()
+        return bool(claims.get('is_admin')) and token_vigente(int(identidad), claims)
+    except Exception:
+        return False
+
+
+class Perfilador:
+    """Un perfil a la vez por proceso: cProfile es por hilo, pero dos perfiles simultáneos se falsean."""
+
+    def __init__(self, directorio, max_ficheros=50):
+        self.directorio = directorio
+        self.max_ficheros = max_ficheros
+        self._ocupado = threading.Lock()
+
+    def iniciar(self):
+        if not self._ocupado.acquire(blocking=False):
+            return None
+        perfil = cProfile.Profile()
+        perfil.enable()
+        return perfil
+
+    def terminar(self, perfil):
+        perfil.disable()
+        self._ocupado.release()
+
+    def resumen(self, perfil):
+        salida = io.StringIO()
+        pstats.Stats(perfil, stream=salida).strip_dirs().sort_stats('cumulative').print_stats(LINEAS_RESUMEN_PERFIL)
+        return salida.getvalue()
+
+    def guardar(self, perfil, descripcion):
+        os.makedirs(self.directorio, exist_ok=True)
+        perfil_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        perfil.dump_stats(os.path.join(self.directorio, f'{perfil_id}.prof'))
+        with open(os.path.join(self.directorio, f'{perfil_id}.txt'), 'w', encoding='utf-8') as f:
+            f.write(descripcion + '\n\n' + self.resumen(perfil))
+        self._rotar()
+        return perfil_id
+
+    def _rotar(self):
+        perfiles = sorted(f[:-5] for f in os.listdir(self.directorio) if f.endswith('.prof'))
+        for antiguo in perfiles[:-self.max_ficheros]:
+            for extension in ('.prof', '.txt'):
+                try:
+                    os.remove(os.path.join(self.directorio, antiguo + extension))
+                except FileNotFoundError:
+                    pass
+
+    def listar(self):
+        if not os.path.isdir(self.directorio):
+            return []
+        return sorted((f[:-5] for f in os.listdir(self.directorio) if f.endswith('.prof')), reverse=True)
+
+    def leer(self, perfil_id):
+        """Resumen de texto de un perfil guardado, o None si no existe (el id no admite rutas)."""
+        if os.path.basename(perfil_id) != perfil_id:
+            return None
+        ruta = os.path.join(self.directorio, f'{perfil_id}.txt')
+        if not os.path.isfile(ruta):
+            return None
+        with open(ruta, encoding='utf-8') as f:
+            return f.read()
+
+
+def obtener_perfilador():
+    return current_app.extensions.get('perfilador')
+
+
+def init_perfilado(app):
+    """Registra el observador de consultas lentas y los hooks del perfilador en la app."""
+    umbral = app.config.get('SLOW_QUERY_THRESHOLD_MS')
+    if umbral is not None and umbral >= 0:
+        registro = app.extensions['consultas_lentas'] = RegistroConsultasLentas(
+            umbral, app.config.get('SLOW_QUERY_LOG_SIZE', 100)
+        )
+
+        def _observar(sentencia, parametros, executemany, duracion):
+            # El observador es global al engine: sólo actúa en el contexto de esta app
+            if has_app_context() and obtener_consultas_lentas() is registro:
+                registro.observar(sentencia, parametros, executemany, duracion)
+        observar_consultas(_observar)
+
+    if not app.config.get('PROFILER_ENABLED', True):
+        return
+    perfilador = app.extensions['perfilador'] = Perfilador(
+        app.config['PROFILE_DIR'], app.config.get('PROFILE_MAX_FILES', 50)
+    )
+
+    @app.before_request
+    def _iniciar_perfil():
+        modo = _perfil_pedido()
+        if modo not in ('1', 'true', 'texto') or not _es_admin():
+            return
+        perfil = perfilador.iniciar()
+        if perfil is None:
+            current_app.logger.info("Perfil omitido: ya hay otra petición perfilándose en este proceso.")
+            return
+        g.perfil = (perfil, modo)
+
+    @app.after_request
+    def _terminar_perfil(response):
+        datos = g.pop('perfil', None)
+        if datos is None:
+            return response
+        perfil, modo = datos
+        perfilador.terminar(perfil)
+        descripcion = f'{request.method} {request.full_path} -> {response.status_code}'
+        if modo == 'texto':
+            return current_app.response_class(descripcion + '\n\n' + perfilador.resumen(perfil), mimetype='text/plain')
+        response.headers['X-Perfil-Id'] = perfilador.guardar(perfil, descripcion)
+        return response
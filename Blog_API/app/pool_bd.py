@@ -0,0 +1,168 @@
+# Blog_API/app/pool_bd.py
+# Pool de conexiones a la base de datos: configuración, seguridad ante fork y estado para /healthz.
+# - opciones_engine(): SQLALCHEMY_ENGINE_OPTIONS a partir de DB_POOL_* (tamaño, desbordamiento,
+#   timeout, reciclado y pre-ping). pool_recycle por debajo del wait_timeout de MySQL y el pre-ping
+#   evitan el "MySQL server has gone away" con conexiones que quedaron ociosas.
+# - Con gunicorn --preload el engine se crea en el maestro: tras el fork cada worker descarta el
+#   pool heredado con dispose(close=False), sin cerrar (ni compartir) los sockets del padre. Un único
+#   hook de fork recorre los engines vivos (un WeakSet: una app desechada no retiene su engine).
+# - La espera de checkout se mide envolviendo engine.raw_connection, que sobrevive a dispose()
+#   (que sustituye engine.pool por uno nuevo). Si el checkout abre una conexión nueva, el tiempo de
+#   conectar (eventos do_connect/connect) se descuenta: sólo cuenta la espera por el pool. Se publica
+#   en estado_pool() y a los observadores (el histograma de metricas.py).
+import os
+import threading
+import time
+import weakref
+from collections import deque
+from functools import wraps
+from flask import current_app
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as TimeoutPool
+
+# Esperas recientes con las que se calculan los percentiles de /healthz
+VENTANA_ESPERAS = 512
+
+# Engines que se descartan en el hijo tras un fork
+_engines = weakref.WeakSet()
+# Tiempo de conexión del checkout en curso en cada hilo
+_hilo = threading.local()
+
+
+def opciones_engine(config):
+    """Opciones del engine a partir de la configuración DB_POOL_* de la app."""
+    opciones = {'pool_pre_ping': config['DB_POOL_PRE_PING']}
+    url = make_url(config['SQLALCHEMY_DATABASE_URI'])
+    if url.drivername.startswith('sqlite') and url.database in (None, '', ':memory:'):
+        # SQLite en memoria usa StaticPool (una única conexión): no hay pool que dimensionar
+        return opciones
+    opciones.update(
+        pool_size=config['DB_POOL_SIZE'],
+        max_overflow=config['DB_MAX_OVERFLOW'],
+        pool_timeout=config['DB_POOL_TIMEOUT'],
+        pool_recycle=config['DB_POOL_RECYCLE'],
+    )
+    return opciones
+
+
+class EstadisticasPool:
+    """Esperas de checkout del proceso: totales, máximo y una ventana de las últimas."""
+
+    def __init__(self, ventana=VENTANA_ESPERAS):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.espera_total = 0.0
+        self.espera_maxima = 0.0
+        self._recientes = deque(maxlen=ventana)
+        self._lock = threading.Lock()
+        self.observadores = []
+
+    def registrar(self, espera, timeout=False):
+        with self._lock:
+            self.checkouts += 1
+            self.timeouts += timeout
+            self.espera_total += espera
+            self.espera_maxima = max(self.espera_maxima, espera)
+            self._recientes.append(espera)
+        for observador in self.observadores:
+            observador(espera)
+
+    def resumen(self):
+        with self._lock:
+            recientes = sorted(self._recientes)
+            checkouts, timeouts = self.checkouts, self.timeouts
+            total, maxima = self.espera_total, self.espera_maxima
+        percentil = lambda p: round(recientes[min(len(recientes) - 1, int(p * len(recientes)))] * 1000, 3) if recientes else None
+        return {
+            'checkouts': checkouts,
+            'timeouts': timeouts,
+            'media_ms': round(total / checkouts * 1000, 3) if checkouts else None,
+            'maxima_ms': round(maxima * 1000, 3),
+            'recientes_p50_ms': percentil(0.5),
+            'recientes_p95_ms': percentil(0.95),
+        }
+
+
+def _inicio_conexion(dialect, conn_rec, cargs, cparams):
+    _hilo.inicio_conexion = time.perf_counter()
+
+
+def _fin_conexion(dbapi_connection, connection_record):
+    inicio = getattr(_hilo, 'inicio_conexion', None)
+    if inicio is not None:
+        _hilo.conectando += time.perf_counter() - inicio
+        _hilo.inicio_conexion = None
+
+
+def _instrumentar_checkout(engine, estadisticas):
+    conectar = engine.raw_connection
+    event.listen(engine, 'do_connect', _inicio_conexion)
+    event.listen(engine, 'connect', _fin_conexion)
+
+    @wraps(conectar)
+    def raw_connection():
+        _hilo.conectando, _hilo.inicio_conexion = 0.0, None
+        inicio = time.perf_counter()
+        try:
+            conexion = conectar()
+        except TimeoutPool:
+            estadisticas.registrar(time.perf_counter() - inicio, timeout=True)
+            raise
+        estadisticas.registrar(max(time.perf_counter() - inicio - _hilo.conectando, 0.0))
+        return conexion
+
+    engine.raw_connection = raw_connection
+
+
+def _descartar_engines_tras_fork():
+    # close=False: las conexiones heredadas son del padre; sólo se olvidan en el hijo
+    for engine in list(_engines):
+        engine.dispose(close=False)
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_descartar_engines_tras_fork)
+
+
+def init_pool(app, db):
+    """Instrumenta el checkout de los engines de la app (primaria y réplicas) y los hace seguros ante fork."""
+    estadisticas = app.extensions['pool_bd'] = EstadisticasPool()
+    with app.app_context():
+        for engine in db.engines.values():
+            _instrumentar_checkout(engine, estadisticas)
+            _engines.add(engine)
+
+
+def obtener_estadisticas_pool():
+    return current_app.extensions.get('pool_bd')
+
+
+def estado_pool(engine):
+    """Ocupación actual del pool del proceso y esperas de checkout."""
+    pool = engine.pool
+    estado = {'clase': type(pool).__name__}
+    if hasattr(pool, 'checkedout'):
+        tamano, en_uso = pool.size(), pool.checkedout()
+        capacidad = tamano + max(getattr(pool, '_max_overflow', 0), 0)
+        estado.update(
+            tamano=tamano,
+            max_desbordamiento=getattr(pool, '_max_overflow', None),
+            en_uso=en_uso,
+            libres=pool.checkedin(),
+            desbordamiento=pool.overflow(),
+            utilizacion=round(en_uso / capacidad, 3) if capacidad else None,
+            timeout_s=getattr(pool, '_timeout', None),
+        )
+    estadisticas = obtener_estadisticas_pool()
+    if estadisticas is not None:
+        estado['espera_checkout'] = estadisticas.resumen()
+    return estado
+
+
+def comprobar_bd(engine):
+    """Ejecuta SELECT 1 con una conexión del pool. Devuelve la latencia en segundos."""
+    inicio = time.perf_counter()
+    with engine.connect() as conexion:
+        conexion.execute(text('SELECT 1'))
+    return time.perf_counter() - inicio
@@ -0,0 +1,197 @@
+# Blog_API/app/replicas.py
+# Réplicas de lectura opcionales (DATABASE_REPLICA_URIS, separadas por comas).
+# Cada réplica es un bind de Flask-SQLAlchemy ('replica_0', 'replica_1'...) con las mismas opciones
+# de pool que la primaria. SesionEnrutada.get_bind() decide a qué engine va cada sentencia:
+# - A la primaria: fuera de una petición (CLI, hilos de fondo), peticiones que no son GET/HEAD,
+#   sentencias DML y SELECT ... FOR UPDATE, y todo lo que la sesión lea después de escribir
+#   (lee sus propias escrituras dentro de la petición).
+# - Tras una petición que confirma escrituras, la respuesta lleva la cookie COOKIE_PRIMARIA y la
+#   cabecera CABECERA_PRIMARIA (instante límite, segundos epoch) durante REPLICA_STICKY_SECONDS:
+#   mientras la réplica se pone al día, las lecturas de ese cliente van a la primaria y no se sirven
+#   desde la caché de respuestas (read-your-writes entre peticiones). Un fetch desde otro origen no
+#   envía cookies (CORS "*" sin credenciales): ese cliente reenvía la cabecera en sus peticiones.
+# - El resto de lecturas de GET van a una réplica sana, elegida por turno una vez por petición,
+#   así que todas las consultas de una petición ven la misma réplica.
+# Conmutación por fallo: un error de conexión en una réplica la saca del turno durante
+# REPLICA_RETRY_SECONDS; pasado el plazo vuelve si responde a un SELECT 1. Sin réplicas sanas se
+# lee de la primaria. La petición que descubre el fallo responde con error; las siguientes ya no.
+# Para probarlo en local basta con dos ficheros SQLite: DATABASE_URI=sqlite:////tmp/primaria.db y
+# DATABASE_REPLICA_URIS=sqlite:////tmp/replica.db (una copia de la primaria).
+import itertools
+import threading
+import time
+from flask import current_app, g, request, has_app_context, has_request_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, text
+
+COOKIE_PRIMARIA = 'leer_primaria'
+CABECERA_PRIMARIA = 'X-Read-Primary-Until'
+METODOS_LECTURA = ('GET', 'HEAD')
+PREFIJO_BIND = 'replica_'
+
+
+def binds_replicas(uris):
+    """SQLALCHEMY_BINDS para una lista de URIs de réplica separadas por comas."""
+    uris = [uri.strip() for uri in (uris or '').split(',') if uri.strip()]
+    return {f'{PREFIJO_BIND}{i}': uri for i, uri in enumerate(uris)}
+
+
+class Replica:
+    def __init__(self, nombre, engine):
+        self.nombre = nombre
+        self.engine = engine
+        self.caida_hasta = None
+        self.fallos = 0
+        self.ultimo_error = None
+
+
+class EnrutadorReplicas:
+    def __init__(self, replicas, reintento=30):
+        self.replicas = replicas
+        self.reintento = reintento
+        self._turno = itertools.count()
+        self._lock = threading.Lock()
+
+    def marcar_caida(self, replica, error):
+        with self._lock:
+            replica.caida_hasta = time.monotonic() + self.reintento
+            replica.fallos += 1
+            replica.ultimo_error = f'{type(error).__name__}: {error}'
+        if has_app_context():
+            current_app.logger.warning(
+                f"Réplica {replica.nombre} fuera de servicio durante {self.reintento} s: {replica.ultimo_error}"
+            )
+
+    def _disponible(self, replica):
+        if replica.caida_hasta is None:
+            return True
+        if time.monotonic() < replica.caida_hasta:
+            return False
+        # Plazo cumplido: vuelve al turno si responde
+        try:
+            with replica.engine.connect() as conexion:
+                conexion.execute(text('SELECT 1'))
+        except Exception as e:
+            self.marcar_caida(replica, e)
+            return False
+        replica.caida_hasta = None
+        return True
+
+    def elegir(self):
+        """Siguiente réplica sana por turno, o None si no queda ninguna."""
+        inicio = next(self._turno)
+        for k in range(len(self.replicas)):
+            replica = self.replicas[(inicio + k) % len(self.replicas)]
+            if self._disponible(replica):
+                return replica
+        return None
+
+    def estado(self):
+        ahora = time.monotonic()
+        return [{
+            'nombre': replica.nombre,
+            'sana': replica.caida_hasta is None,
+            'reintento_en_s': round(max(replica.caida_hasta - ahora, 0), 1) if replica.caida_hasta is not None else None,
+            'fallos': replica.fallos,
+            'ultimo_error': replica.ultimo_error,
+        } for replica in self.replicas]
+
+
+def obtener_enrutador():
+    return current_app.extensions.get('replicas')
+
+
+def lee_de_primaria():
+    """
+    True si el cliente escribió hace poco y debe leer de la primaria: trae la cookie COOKIE_PRIMARIA
+    o reenvía CABECERA_PRIMARIA con un límite aún no vencido. Un límite más lejano que
+    REPLICA_STICKY_SECONDS se ignora, para que un cliente no pueda fijarse a la primaria.
+    """
+    if not has_request_context():
+        return False
+    if COOKIE_PRIMARIA in request.cookies:
+        return True
+    try:
+        hasta = float(request.headers.get(CABECERA_PRIMARIA, ''))
+    except ValueError:
+        return False
+    ahora = time.time()
+    return ahora < hasta <= ahora + current_app.config.get('REPLICA_STICKY_SECONDS', 5)
+
+
+def _es_escritura(clausula):
+    return clausula is not None and (
+        getattr(clausula, 'is_dml', False) or getattr(clausula, '_for_update_arg', None) is not None
+    )
+
+
+def motor_lectura(sesion=None):
+    """Engine de la réplica que atiende las lecturas de esta petición, o None para la primaria."""
+    if not has_request_context():
+        return None
+    enrutador = obtener_enrutador()
+    if enrutador is None or request.method not in METODOS_LECTURA or lee_de_primaria():
+        return None
+    if sesion is not None and (sesion.info.get('escritura') or sesion.info.get('primaria')):
+        return None
+    if 'replica_lectura' not in g:
+        g.replica_lectura = enrutador.elegir()
+    return g.replica_lectura.engine if g.replica_lectura is not None else None
+
+
+def usar_primaria(sesion):
+    """Las lecturas que siguen en `sesion` van a la primaria (consultas que no toleran el retraso de una réplica)."""
+    sesion.info['primaria'] = True
+
+
+class SesionEnrutada(Session):
+    """Sesión de db: envía las lecturas de las peticiones GET a una réplica (ver cabecera)."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None:
+            if _es_escritura(clause):
+                self.info['escritura'] = True
+            else:
+                replica = motor_lectura(self)
+                if replica is not None:
+                    return replica
+        return super().get_bind(mapper, clause=clause, bind=bind, **kwargs)
+
+
+def _antes_de_flush(session, flush_context, instancias):
+    # El flush (y lo que se lea después) va a la primaria
+    session.info['escritura'] = True
+
+
+def _tras_commit(session):
+    if session.info.get('escritura') and has_request_context():
+        g.escritura_confirmada = True
+
+
+def init_replicas(app, db):
+    """Crea el enrutador si hay réplicas configuradas y registra la cookie/cabecera de read-your-writes."""
+    sesion = db.session.session_factory.class_
+    for nombre, listener in (('before_flush', _antes_de_flush), ('after_commit', _tras_commit)):
+        if not event.contains(sesion, nombre, listener):
+            event.listen(sesion, nombre, listener)
+
+    with app.app_context():
+        replicas = [Replica(clave, engine) for clave, engine in sorted(db.engines.items(), key=lambda e: str(e[0]))
+                    if isinstance(clave, str) and clave.startswith(PREFIJO_BIND)]
+    if not replicas:
+        return
+    enrutador = app.extensions['replicas'] = EnrutadorReplicas(replicas, app.config.get('REPLICA_RETRY_SECONDS', 30))
+    for replica in replicas:
+        @event.listens_for(replica.engine, 'handle_error')
+        def _error_replica(contexto, replica=replica):
+            # Sin conexión (fallo al conectar) o conexión perdida: fuera del turno
+            if contexto.connection is None or contexto.is_disconnect:
+                enrutador.marcar_caida(replica, contexto.original_exception)
+
+    @app.after_request
+    def _marca_primaria(response):
+        if g.pop('escritura_confirmada', False):
+            segundos = app.config.get('REPLICA_STICKY_SECONDS', 5)
+            response.set_cookie(COOKIE_PRIMARIA, '1', max_age=segundos, httponly=True, samesite='Lax')
+            response.headers[CABECERA_PRIMARIA] = str(int(time.time() + segundos))
+        return response
@@ -1,8 +1,30 @@
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify, current_app, url_for
+import io
 import re
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy import or_ # <--- IMPORTACIÓN AÑADIDA
-from .models import db, Autor, Entrada, Comentario, Categoria, MensajeContacto
+from sqlalchemy import func
+from sqlalchemy.orm import undefer_group
+from .models import db, Autor, Entrada, Comentario, Categoria, MensajeContacto, Etiqueta, EntradaEtiqueta
+from .models import CAMPOS_ENTRADA, CAMPOS_RESUMEN_ENTRADA
+from .paginacion import leer_limite, paginar_por_cursor, aplicar_cursor, ordenar_para_cursor, CursorInvalido, LIMITE_MAXIMO
+from .paginacion import leer_modo_total, paginar_con_total, metadatos_pagina
+from .cache import cacheado, obtener_cache
+from .busqueda import buscar_entradas, buscar_registros
+from .autorizacion import claims_para, token_vigente, obtener_cache_versiones
+from .contrasenas import SaturacionHash, verificar_ficticio
+from .validadores import (validadores_de, validadores_de_pagina, huella_relaciones, no_modificado, con_validadores,
+                          respuesta_no_modificado, COLUMNAS_VALIDADOR_PAGINA)
+from .streaming import leer_formato_stream, respuesta_stream, respuesta_registros, FormatoStreamInvalido
+from .serializacion import esquema_de, leer_idioma, campos_en_idioma, IdiomaInvalido, IDIOMAS
+from .metricas import obtener_metricas, CONTENT_TYPE_PROMETHEUS
+from .perfilado import obtener_consultas_lentas, obtener_perfilador
+from .cola_contacto import obtener_cola_contacto, ColaLlena, LimiteExcedido
+from .pool_bd import estado_pool, comprobar_bd
+from .replicas import obtener_enrutador, usar_primaria
+from .cambios import leer_cambios, TokenInvalido
+from .lotes import leer_peticiones, ejecutar_lote, LoteInvalido
+from .comentarios import arbol_comentarios, moderar, ESTADOS_COMENTARIO, MAX_IDS_MODERACION
+from .importacion import importar, exportar, leer_tipos, MODOS_CONFLICTO, TAMANO_LOTE_IMPORTACION, TAMANO_BUFER_IMPORTACION
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity, get_jwt 
 from functools import wraps
 from datetime import datetime # <--- IMPORTACIÓN AÑADIDA
@@ -11,49 +33,110 @@ main_bp = Blueprint('main', __name__)
 
 # --- Decorador para rutas de Administrador ---
 def admin_required(fn):
+    """
+    Autoriza con los claims del JWT (is_admin, tv) sin consultar la tabla autor en cada petición;
+    la versión del token se comprueba contra CacheVersionesToken (ver autorizacion.py).
+    """
     @wraps(fn)
     @jwt_required() # Esta línea ya maneja la validez básica del token (formato, expiración, firma)
                     # Si falla aquí, usualmente devuelve 401 o 422 dependiendo de la configuración de error de JWTManager.
     def wrapper(*args, **kwargs):
-        current_app.logger.info("--- admin_required decorator invoked ---")
+        current_user_id = get_jwt_identity()
         try:
-            current_user_id = get_jwt_identity()
-            current_app.logger.info(f"ADMIN_REQUIRED: JWT Identity (user_id from token): '{current_user_id}' (Type: {type(current_user_id)})")
+            user_id_int = int(current_user_id)
+        except (TypeError, ValueError):
+            current_app.logger.debug("ADMIN_REQUIRED: identidad JWT inválida: %r", current_user_id)
+            return jsonify(msg="Acceso denegado: Formato de identidad de usuario inválido."), 403
+
+        claims = get_jwt()
+        if not claims.get('is_admin'):
+            current_app.logger.debug("ADMIN_REQUIRED: acceso DENEGADO, el usuario %s no es admin.", user_id_int)
+            return jsonify(msg="Acceso denegado: Se requieren permisos de administrador."), 403
+
+        if not token_vigente(user_id_int, claims):
+            current_app.logger.debug("ADMIN_REQUIRED: acceso DENEGADO, token revocado para el usuario %s.", user_id_int)
+            return jsonify(msg="Acceso denegado: El token ya no es válido. Inicia sesión de nuevo."), 401
+
+        current_app.logger.debug("ADMIN_REQUIRED: acceso CONCEDIDO para el usuario %s.", user_id_int)
+        return fn(*args, **kwargs)
+    return wrapper
 
-            if not current_user_id:
-                # Esto no debería ocurrir si @jwt_required() tuvo éxito,
-                # pero es una comprobación adicional.
-                current_app.logger.warning("ADMIN_REQUIRED: No identity found in JWT after @jwt_required().")
-                return jsonify(msg="Acceso denegado: Identidad de usuario no encontrada en el token."), 403
+def filtrar_entradas(query, args):
+    """
+    Aplica los filtros públicos del listado de entradas (categoria, autor, etiqueta, estado).
+    'categoria' y 'etiqueta' aceptan id numérico o slug. Devuelve (query, mensaje_error | None).
+    """
+    categoria = args.get('categoria', '').strip()
+    if categoria:
+        if categoria.isdigit():
+            query = query.filter(Entrada.categoria_id == int(categoria))
+        else:
+            categoria_id = db.session.query(Categoria.id).filter(Categoria.slug == categoria).scalar_subquery()
+            query = query.filter(Entrada.categoria_id == categoria_id)
+
+    autor = args.get('autor', '').strip()
+    if autor:
+        if not autor.isdigit():
+            return query, 'El parámetro "autor" debe ser un id numérico.'
+        query = query.filter(Entrada.autor_id == int(autor))
+
+    etiqueta = args.get('etiqueta', '').strip()
+    if etiqueta:
+        if etiqueta.isdigit():
+            etiqueta_id = int(etiqueta)
+        else:
+            etiqueta_id = db.session.query(Etiqueta.id).filter(Etiqueta.slug == etiqueta).scalar_subquery()
+        query = query.join(EntradaEtiqueta, EntradaEtiqueta.entrada_id == Entrada.id).filter(
+            EntradaEtiqueta.etiqueta_id == etiqueta_id
+        )
 
-            # Intenta convertir el ID a entero si es necesario, aunque Flask-JWT-Extended suele devolver el tipo original.
-            # Si tu ID de Autor es un entero, la identidad en el token también debería serlo.
-            try:
-                user_id_int = int(current_user_id)
-            except ValueError:
-                current_app.logger.error(f"ADMIN_REQUIRED: JWT Identity '{current_user_id}' is not a valid integer.")
-                return jsonify(msg="Acceso denegado: Formato de identidad de usuario inválido."), 403
-
-            user = Autor.query.get(user_id_int)
-
-            if user:
-                current_app.logger.info(f"ADMIN_REQUIRED: User found in DB: email='{user.email}', is_admin={user.is_admin} (Type: {type(user.is_admin)})")
-                if user.is_admin: # Asegúrate que `is_admin` sea un booleano o se evalúe correctamente.
-                    current_app.logger.info(f"ADMIN_REQUIRED: Access GRANTED for user '{user.email}'.")
-                    return fn(*args, **kwargs)
-                else:
-                    current_app.logger.warning(f"ADMIN_REQUIRED: Access DENIED. User '{user.email}' (ID: {user.id}) is NOT an admin.")
-                    return jsonify(msg="Acceso denegado: Se requieren permisos de administrador."), 403
-            else:
-                current_app.logger.warning(f"ADMIN_REQUIRED: Access DENIED. No user found in DB for ID: {user_id_int}")
-                return jsonify(msg="Acceso denegado: Usuario no encontrado en la base de datos."), 403
+    estado = args.get('estado', '').strip()
+    if estado:
+        if estado not in ('borrador', 'publicado'):
+            return query, 'El parámetro "estado" debe ser "borrador" o "publicado".'
+        query = query.filter(Entrada.estado == estado)
+
+    return query, None
+
+def leer_campos_entrada(args, por_defecto=CAMPOS_RESUMEN_ENTRADA, idioma=None):
+    """
+    Lee el parámetro ?fields=a,b,c (sparse fieldset) de los listados de entradas.
+    Sin él se usa la proyección de resumen. Devuelve (campos, mensaje_error | None).
+    Con `idioma` (?lang=) los campos traducidos se llaman 'titulo', 'resumen' y 'contenido';
+    también se aceptan sus variantes con sufijo ('titulo_en' equivale a 'titulo').
+    """
+    validos = campos_en_idioma(Entrada, CAMPOS_ENTRADA) if idioma else CAMPOS_ENTRADA
+    fields = args.get('fields', '').strip()
+    if not fields:
+        return (campos_en_idioma(Entrada, por_defecto) if idioma else por_defecto), None
+    campos = [c.strip() for c in fields.split(',') if c.strip()]
+    if idioma:
+        campos = campos_en_idioma(Entrada, campos)
+    desconocidos = [c for c in campos if c not in validos]
+    if desconocidos:
+        return None, f'Campos desconocidos en "fields": {", ".join(desconocidos)}.'
+    # Se respeta el orden canónico y se descartan duplicados
+    return tuple(c for c in validos if c in campos), None
+
+def formato_stream_o_error(args):
+    """Lee ?stream= para las rutas de listado. Devuelve (formato | None, respuesta_error | None)."""
+    try:
+        return leer_formato_stream(args), None
+    except FormatoStreamInvalido:
+        return None, (jsonify({'message': 'El parámetro "stream" debe ser json o ndjson.'}), 400)
 
-        except Exception as e:
-            current_app.logger.error(f"ADMIN_REQUIRED: Exception during decorator execution: {str(e)}")
-            import traceback
-            current_app.logger.error(traceback.format_exc())
-            return jsonify(msg="Error interno durante la verificación de permisos."), 500
-    return wrapper
+def idioma_o_error(args):
+    """Lee ?lang= para las rutas de contenido. Devuelve (idioma | None, respuesta_error | None)."""
+    try:
+        return leer_idioma(args), None
+    except IdiomaInvalido:
+        return None, (jsonify({'message': f'El parámetro "lang" debe ser uno de: {", ".join(IDIOMAS)}.'}), 400)
+
+def con_idioma(response, idioma):
+    """Marca la respuesta con Content-Language si se pidió un único idioma."""
+    if idioma:
+        response.headers['Content-Language'] = idioma
+    return response
 
 def generar_slug(nombre):
     slug = nombre.lower()
@@ -63,6 +146,55 @@ def generar_slug(nombre):
     slug = slug.strip('-')
     return slug
 
+# --- Métricas (formato de texto de Prometheus) ---
+@main_bp.route('/metrics', methods=['GET'])
+def metrics():
+    registro = obtener_metricas()
+    if registro is None:
+        return jsonify({'message': 'Las métricas están desactivadas.'}), 404
+    # Con METRICS_TOKEN configurado el scraper debe enviar "Authorization: Bearer <token>"
+    token = current_app.config.get('METRICS_TOKEN')
+    if token and request.headers.get('Authorization') != f'Bearer {token}':
+        return jsonify({'message': 'No autorizado.'}), 401
+    return current_app.response_class(registro.exponer(), mimetype=None, content_type=CONTENT_TYPE_PROMETHEUS)
+
+# --- Comprobación de disponibilidad (readiness) ---
+@main_bp.route('/healthz', methods=['GET'])
+def healthz():
+    """200 si la BD responde con una conexión del pool; 503 si no. Incluye la ocupación del pool."""
+    engine = db.engine
+    try:
+        latencia = comprobar_bd(engine)
+        cuerpo, status = {'estado': 'ok', 'bd': {'latencia_ms': round(latencia * 1000, 3)}}, 200
+    except Exception as e:
+        current_app.logger.error(f"Healthz: la base de datos no responde: {str(e)}")
+        cuerpo, status = {'estado': 'error', 'bd': {'error': type(e).__name__}}, 503
+    cuerpo['pool'] = estado_pool(engine)
+    enrutador = obtener_enrutador()
+    if enrutador is not None:
+        cuerpo['replicas'] = enrutador.estado()
+    response = jsonify(cuerpo)
+    response.headers['Cache-Control'] = 'no-store'
+    return response, status
+
+# --- Peticiones en lote ---
+@main_bp.route('/batch', methods=['POST'])
+def procesar_lote():
+    """
+    Varias lecturas en un viaje: {"peticiones": [{"id": "c", "ruta": "/categorias"}, ...]}.
+    Responde 200 con {"respuestas": [{"id", "status", "cabeceras", "cuerpo"}]} en el mismo orden;
+    cada subpetición lleva su propio status (ver lotes.py).
+    """
+    try:
+        peticiones = leer_peticiones(request.get_json(silent=True), current_app.config.get('BATCH_MAX_REQUESTS', 20))
+    except LoteInvalido as e:
+        return jsonify({'message': str(e)}), 400
+    try:
+        return current_app.response_class(ejecutar_lote(peticiones, main_bp.name), mimetype='application/json'), 200
+    except Exception as e:
+        current_app.logger.error(f"Error al procesar el lote: {str(e)}")
+        return jsonify({'error': 'Error interno del servidor al procesar el lote.'}), 500
+
 # --- Rutas de Autenticación ---
 @main_bp.route('/login', methods=['POST'])
 def login():
@@ -74,18 +206,47 @@ def login():
     contrasena = data.get('contrasena')
 
     autor = Autor.query.filter_by(email=email).first()
-    if autor and autor.check_password(contrasena):
-        access_token = create_access_token(identity=autor.id)
+    try:
+        if autor is None:
+            valido = verificar_ficticio(contrasena)
+        else:
+            valido = autor.check_password(contrasena)
+    except SaturacionHash:
+        return jsonify({"msg": "Servidor ocupado, inténtalo de nuevo en unos segundos."}), 503, {'Retry-After': '1'}
+
+    if valido and autor.necesita_rehash():
+        # El coste de bcrypt cambió desde que se guardó el hash: se regenera con la contraseña en claro
+        try:
+            autor.set_password(contrasena)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.warning(f"No se pudo regenerar el hash del autor {autor.id}: {str(e)}")
+
+    if valido:
+        # La identidad (sub) debe ser una cadena; permisos y versión viajan como claims
+        access_token = create_access_token(identity=str(autor.id), additional_claims=claims_para(autor))
         return jsonify(access_token=access_token, user_id=autor.id, is_admin=autor.is_admin), 200
     else:
         return jsonify({"msg": "Email o contraseña incorrectos"}), 401
 
 # --- Rutas de Autores ---
 @main_bp.route('/autores', methods=['GET'])
+@cacheado('autor')
 def get_autores():
     try:
-        autores = Autor.query.all()
-        return jsonify([autor.serialize() for autor in autores]), 200
+        formato, error = formato_stream_o_error(request.args)
+        if error:
+            return error
+        etag, last_modified = validadores_de(Autor.query, Autor.fecha_actualizacion, Autor.id, formato)
+        if no_modificado(etag, last_modified):
+            return respuesta_no_modificado(etag, last_modified)
+        # Listado de sólo lectura: tuplas Row en lugar de instancias ORM (ver serializacion.py)
+        esquema = esquema_de(Autor)
+        if formato:
+            return con_validadores(respuesta_stream(Autor.query.order_by(Autor.id), esquema, formato), etag, last_modified)
+        autores = esquema.consulta(Autor.query).all()
+        return con_validadores(jsonify(esquema.serializar(autores)), etag, last_modified), 200
     except Exception as e:
         current_app.logger.error(f"Error al obtener autores: {str(e)}")
         return jsonify({'error': 'Error interno del servidor al obtener autores.'}), 500
@@ -127,6 +288,9 @@ def create_autor():
         db.session.commit()
 
         return jsonify(new_autor.serialize()), 201
+    except SaturacionHash:
+        db.session.rollback()
+        return jsonify({'message': 'Servidor ocupado, inténtalo de nuevo en unos segundos.'}), 503, {'Retry-After': '1'}
     except IntegrityError as e:
         db.session.rollback()
         current_app.logger.error(f"Error de integridad al crear autor: {str(e.orig)}")
@@ -139,7 +303,7 @@ def create_autor():
 @main_bp.route('/autores/<int:autor_id>', methods=['PUT'])
 @jwt_required()
 def update_autor(autor_id):
-    current_user_id = get_jwt_identity()
+    current_user_id = int(get_jwt_identity())
     autor_to_update = Autor.query.get_or_404(autor_id)
     current_user = Autor.query.get(current_user_id)
 
@@ -165,6 +329,8 @@ def update_autor(autor_id):
             autor_to_update.biografia = data['biografia']
 
         if 'is_admin' in data and current_user.is_admin:
+             if bool(data['is_admin']) != autor_to_update.is_admin:
+                 autor_to_update.revocar_tokens()
              autor_to_update.is_admin = bool(data['is_admin'])
         elif 'is_admin' in data and not current_user.is_admin:
             return jsonify({"msg": "No tienes permiso para cambiar el estado de administrador."}), 403
@@ -173,9 +339,14 @@ def update_autor(autor_id):
             if not current_user.is_admin and current_user_id != autor_to_update.id:
                  return jsonify({"msg": "No tienes permiso para cambiar la contraseña de este autor."}), 403
             autor_to_update.set_password(data['contrasena'])
+            autor_to_update.revocar_tokens()
 
         db.session.commit()
+        obtener_cache_versiones().invalidar()
         return jsonify(autor_to_update.serialize()), 200
+    except SaturacionHash:
+        db.session.rollback()
+        return jsonify({'message': 'Servidor ocupado, inténtalo de nuevo en unos segundos.'}), 503, {'Retry-After': '1'}
     except IntegrityError as e:
         db.session.rollback()
         current_app.logger.error(f"Error de integridad al actualizar autor {autor_id}: {str(e.orig)}")
@@ -195,7 +366,7 @@ def delete_autor(autor_id):
         if not autor:
             return jsonify({'message': 'Autor no encontrado.'}), 404
 
-        current_user_id = get_jwt_identity()
+        current_user_id = int(get_jwt_identity())
         if autor.id == current_user_id:
             return jsonify({'message': 'No puedes eliminar tu propia cuenta de administrador por esta vía.'}), 403
 
@@ -204,6 +375,7 @@ def delete_autor(autor_id):
 
         db.session.delete(autor)
         db.session.commit()
+        obtener_cache_versiones().invalidar()
         return jsonify({'message': 'Autor eliminado exitosamente.'}), 200
     except IntegrityError as e:
         db.session.rollback()
@@ -226,7 +398,6 @@ def create_categoria():
     nombre_en = data.get('nombre_en')
     nombre_de = data.get('nombre_de')
     slug_propuesto = data.get('slug')
-    descripcion = data.get('descripcion') 
 
     if not nombre_es:
         return jsonify({'message': 'El campo "nombre_es" (nombre en español) es obligatorio.'}), 400
@@ -245,8 +416,7 @@ def create_categoria():
         nombre_es=nombre_es,
         nombre_en=nombre_en,
         nombre_de=nombre_de,
-        slug=slug_final,
-        descripcion=descripcion
+        slug=slug_final
     )
     try:
         db.session.add(nueva_categoria)
@@ -267,17 +437,42 @@ def create_categoria():
         return jsonify({'error': 'Error interno del servidor al crear la categoría.'}), 500
 
 @main_bp.route('/categorias', methods=['GET'])
+@cacheado('categorias')
 def get_categorias():
     try:
-        categorias = Categoria.query.all()
-        return jsonify([categoria.serialize() for categoria in categorias]), 200
+        formato, error = formato_stream_o_error(request.args)
+        if error:
+            return error
+        idioma, error = idioma_o_error(request.args)
+        if error:
+            return error
+        etag, last_modified = validadores_de(Categoria.query, Categoria.fecha_actualizacion, Categoria.id, formato, idioma)
+        if no_modificado(etag, last_modified):
+            return respuesta_no_modificado(etag, last_modified)
+        # Con ?lang= sólo 'nombre', resuelto en SQL con respaldo en nombre_es
+        esquema = esquema_de(Categoria, idioma=idioma)
+        if formato:
+            response = respuesta_stream(Categoria.query.order_by(Categoria.id), esquema, formato)
+            return con_idioma(con_validadores(response, etag, last_modified), idioma)
+        categorias = esquema.consulta(Categoria.query).all()
+        return con_idioma(con_validadores(jsonify(esquema.serializar(categorias)), etag, last_modified), idioma), 200
     except Exception as e:
         current_app.logger.error(f"Error al obtener categorías: {str(e)}")
         return jsonify({'error': 'Error interno del servidor al obtener categorías.'}), 500
 
 @main_bp.route('/categorias/<int:categoria_id>', methods=['GET'])
+@cacheado('categorias')
 def get_categoria_by_id(categoria_id):
     try:
+        idioma, error = idioma_o_error(request.args)
+        if error:
+            return error
+        if idioma:
+            esquema = esquema_de(Categoria, idioma=idioma)
+            fila = esquema.consulta(Categoria.query.filter(Categoria.id == categoria_id)).first()
+            if not fila:
+                return jsonify({'message': 'Categoría no encontrada.'}), 404
+            return con_idioma(jsonify(esquema.serializar([fila])[0]), idioma), 200
         categoria = Categoria.query.get(categoria_id)
         if not categoria:
             return jsonify({'message': 'Categoría no encontrada.'}), 404
@@ -286,6 +481,100 @@ def get_categoria_by_id(categoria_id):
         current_app.logger.error(f"Error al obtener categoría {categoria_id}: {str(e)}")
         return jsonify({'error': f'Error interno del servidor al obtener categoría {categoria_id}.'}), 500
 
+@main_bp.route('/categorias/<string:slug>/entradas', methods=['GET'])
+@cacheado('categorias', 'autor', 'entradas', 'comentarios', 'etiquetas')
+def get_entradas_por_categoria(slug):
+    """Entradas publicadas de una categoría, paginadas por cursor, con el nombre del autor incluido."""
+    try:
+        idioma, error = idioma_o_error(request.args)
+        if error:
+            return error
+        esquema_categoria = esquema_de(Categoria, idioma=idioma)
+        categoria = esquema_categoria.consulta(Categoria.query.filter_by(slug=slug)).first()
+        if not categoria:
+            return jsonify({'message': 'Categoría no encontrada.'}), 404
+
+        limite = leer_limite(request.args)
+        if limite is None:
+            return jsonify({'message': f'El parámetro "limit" debe estar entre 1 y {LIMITE_MAXIMO}.'}), 400
+        campos, error = leer_campos_entrada(request.args, idioma=idioma)
+        if error:
+            return jsonify({'message': error}), 400
+
+        # Usa el índice (categoria_id, estado, fecha_publicacion, id)
+        esquema = esquema_de(Entrada, campos, idioma, extras=(('autor_nombre', Autor.nombre),))
+        entradas_query = esquema.consulta(Entrada.query.join(Autor, Autor.id == Entrada.autor_id).filter(
+            Entrada.categoria_id == categoria.id,
+            Entrada.estado == 'publicado'
+        ))
+
+        try:
+            filas, siguiente_cursor = paginar_por_cursor(
+                entradas_query, Entrada.fecha_publicacion, Entrada.id,
+                limite, request.args.get('after')
+            )
+        except CursorInvalido:
+            return jsonify({'message': 'El parámetro "after" no es un cursor válido.'}), 400
+
+        return con_idioma(jsonify({
+            'categoria': esquema_categoria.serializar([categoria])[0],
+            'entradas': esquema.serializar(filas),
+            'next_cursor': siguiente_cursor
+        }), idioma), 200
+    except Exception as e:
+        current_app.logger.error(f"Error al obtener entradas de la categoría {slug}: {str(e)}")
+        return jsonify({'error': f'Error interno del servidor al obtener entradas de la categoría {slug}.'}), 500
+
+@main_bp.route('/categorias/ultimas-entradas', methods=['GET'])
+@cacheado('categorias', 'autor', 'entradas', 'comentarios', 'etiquetas')
+def get_ultimas_entradas_por_categoria():
+    """
+    Portada: las últimas K entradas publicadas de cada categoría (?k=, por defecto 3, máx. 20).
+    Una sola consulta con ROW_NUMBER() OVER (PARTITION BY categoria_id ...) sustituye a descargar
+    /categorias, /entradas y /autores completos y filtrar en el cliente.
+    """
+    try:
+        k = request.args.get('k', 3, type=int)
+        if k is None or not (1 <= k <= 20):
+            return jsonify({'message': 'El parámetro "k" debe estar entre 1 y 20.'}), 400
+        idioma, error = idioma_o_error(request.args)
+        if error:
+            return error
+        campos, error = leer_campos_entrada(request.args, idioma=idioma)
+        if error:
+            return jsonify({'message': error}), 400
+
+        posicion = func.row_number().over(
+            partition_by=Entrada.categoria_id,
+            order_by=(Entrada.fecha_publicacion.desc(), Entrada.id.desc())
+        ).label('posicion')
+        ranking = db.session.query(Entrada.id.label('entrada_id'), posicion).filter(
+            Entrada.estado == 'publicado'
+        ).subquery()
+
+        esquema = esquema_de(Entrada, campos, idioma, extras=(('autor_nombre', Autor.nombre),))
+        filas = esquema.consulta(Entrada.query.join(
+            ranking, ranking.c.entrada_id == Entrada.id
+        ).join(Autor, Autor.id == Entrada.autor_id).filter(
+            ranking.c.posicion <= k
+        ).order_by(
+            Entrada.categoria_id, ranking.c.posicion
+        )).all()
+
+        entradas_por_categoria = {}
+        for fila, registro in zip(filas, esquema.serializar(filas)):
+            entradas_por_categoria.setdefault(fila.categoria_id, []).append(registro)
+
+        esquema_categoria = esquema_de(Categoria, idioma=idioma)
+        categorias = esquema_categoria.serializar(esquema_categoria.consulta(Categoria.query.order_by(Categoria.id)).all())
+        return con_idioma(jsonify([
+            dict(categoria, entradas=entradas_por_categoria.get(categoria['id'], []))
+            for categoria in categorias
+        ]), idioma), 200
+    except Exception as e:
+        current_app.logger.error(f"Error al obtener las últimas entradas por categoría: {str(e)}")
+        return jsonify({'error': 'Error interno del servidor al obtener las últimas entradas por categoría.'}), 500
+
 @main_bp.route('/categorias/<int:categoria_id>', methods=['PUT'])
 @admin_required
 def update_categoria(categoria_id):
@@ -369,6 +658,23 @@ def create_contacto():
         if not mensaje: # Asumiendo que el mensaje también es requerido
             return jsonify({'message': 'El mensaje es requerido'}), 400
 
+        cola = obtener_cola_contacto()
+        if cola is not None:
+            # Write-behind: se encola en disco y el volcador lo inserta en lote (ver cola_contacto.py)
+            try:
+                cola.encolar({
+                    'nombre_remitente': nombre,
+                    'email_remitente': email,
+                    'asunto': asunto,
+                    'mensaje': mensaje
+                }, request.remote_addr or 'desconocida')
+            except LimiteExcedido as e:
+                return jsonify({'message': 'Has enviado demasiados mensajes. Inténtalo más tarde.'}), 429, {'Retry-After': str(e.reintentar)}
+            except ColaLlena:
+                return jsonify({'message': 'Servidor ocupado, inténtalo de nuevo en unos minutos.'}), 503, {'Retry-After': '30'}
+            # Un duplicado reciente recibe la misma respuesta para no dar pistas a quien reintenta
+            return jsonify({'message': 'Mensaje recibido. Se procesará en breve.'}), 202
+
         new_contacto = MensajeContacto(
             nombre_remitente=nombre,
             email_remitente=email,
@@ -393,22 +699,224 @@ def create_contacto():
         return jsonify({'error': 'Error interno del servidor al procesar el mensaje de contacto.'}), 500
 
 @main_bp.route('/entradas', methods=['GET'])
+@cacheado('categorias', 'entradas', 'comentarios', 'etiquetas')
 def get_entradas():
     slug = request.args.get('slug')
     try:
+        idioma, error = idioma_o_error(request.args)
+        if error:
+            return error
         if slug:
-            entrada = Entrada.query.filter_by(slug=slug).first()
+            por_slug = Entrada.query.filter_by(slug=slug)
+            etag, last_modified = validadores_de(
+                por_slug, Entrada.fecha_actualizacion, Entrada.id, idioma, *huella_relaciones(por_slug, CAMPOS_ENTRADA)
+            )
+            if no_modificado(etag, last_modified):
+                return respuesta_no_modificado(etag, last_modified)
+            if idioma:
+                # Representación completa en un idioma: sólo las columnas de ese idioma y las de respaldo
+                esquema = esquema_de(Entrada, CAMPOS_ENTRADA, idioma)
+                fila = esquema.consulta(Entrada.query.filter_by(slug=slug)).first()
+                entrada = esquema.serializar([fila])[0] if fila else None
+            else:
+                # Único camino público que necesita los cuerpos completos
+                entrada = Entrada.query.options(undefer_group('contenido')).filter_by(slug=slug).first()
+                entrada = entrada.serialize() if entrada else None
             if entrada:
-                return jsonify(entrada.serialize())
+                return con_idioma(con_validadores(jsonify(entrada), etag, last_modified), idioma)
             else:
                 return jsonify({'message': 'Entrada no encontrada con ese slug'}), 404
-        else:
-            entradas = Entrada.query.order_by(Entrada.fecha_publicacion.desc()).all()
-            return jsonify([entrada.serialize() for entrada in entradas]), 200
+
+        # Listado paginado por cursor: ?limit=&after=&categoria=&autor=&etiqueta=&estado=
+        # Con ?stream=json|ndjson se devuelve todo el conjunto filtrado (desde ?after= si se da), sin límite
+        formato, error = formato_stream_o_error(request.args)
+        if error:
+            return error
+        limite = leer_limite(request.args)
+        if limite is None and not formato:
+            return jsonify({'message': f'El parámetro "limit" debe estar entre 1 y {LIMITE_MAXIMO}.'}), 400
+
+        campos, error = leer_campos_entrada(request.args, idioma=idioma)
+        if error:
+            return jsonify({'message': error}), 400
+
+        entradas_query, error = filtrar_entradas(Entrada.query, request.args)
+        if error:
+            return jsonify({'message': error}), 400
+
+        # Sólo las columnas de `campos`, leídas como tuplas Row; las relaciones van en una consulta IN por página
+        esquema = esquema_de(Entrada, campos, idioma)
+
+        if formato:
+            # El stream es todo el conjunto filtrado: su validador también
+            etag, last_modified = validadores_de(
+                entradas_query, Entrada.fecha_actualizacion, Entrada.id, sorted(request.args.items(multi=True)),
+                *huella_relaciones(entradas_query, campos)
+            )
+            if no_modificado(etag, last_modified):
+                return respuesta_no_modificado(etag, last_modified)
+            entradas_query = esquema.consulta(entradas_query)
+            despues = request.args.get('after')
+            try:
+                if despues:
+                    entradas_query = aplicar_cursor(entradas_query, Entrada.fecha_publicacion, Entrada.id, despues)
+            except CursorInvalido:
+                return jsonify({'message': 'El parámetro "after" no es un cursor válido.'}), 400
+            entradas_query = ordenar_para_cursor(entradas_query, Entrada.fecha_publicacion, Entrada.id)
+            return con_idioma(con_validadores(
+                respuesta_stream(entradas_query, esquema, formato),
+                etag, last_modified
+            ), idioma)
+
+        try:
+            entradas, siguiente_cursor = paginar_por_cursor(
+                esquema.consulta(entradas_query).add_columns(*COLUMNAS_VALIDADOR_PAGINA), Entrada.fecha_publicacion, Entrada.id,
+                limite, request.args.get('after')
+            )
+        except CursorInvalido:
+            return jsonify({'message': 'El parámetro "after" no es un cursor válido.'}), 400
+
+        # El validador sale de las filas de la página (coste por página constante); la query string
+        # distingue proyecciones. Un 304 ahorra la codificación JSON y la transferencia del cuerpo.
+        registros = esquema.serializar(entradas)
+        etag, last_modified = validadores_de_pagina(entradas, registros, sorted(request.args.items(multi=True)))
+        if no_modificado(etag, last_modified):
+            return respuesta_no_modificado(etag, last_modified)
+        # El cuerpo sigue siendo una lista para no romper a los clientes actuales;
+        # el cursor de la siguiente página viaja en las cabeceras.
+        response = con_idioma(con_validadores(jsonify(registros), etag, last_modified), idioma)
+        if siguiente_cursor:
+            response.headers['X-Next-Cursor'] = siguiente_cursor
+            args_siguiente = request.args.to_dict()
+            args_siguiente['after'] = siguiente_cursor
+            response.headers['Link'] = f'<{url_for("main.get_entradas", _external=True, **args_siguiente)}>; rel="next"'
+        return response, 200
     except Exception as e:
         current_app.logger.error(f"Error al obtener entradas: {str(e)}")
         return jsonify({'error': 'Error interno del servidor al obtener entradas.'}), 500
 
+@main_bp.route('/buscar', methods=['GET'])
+def buscar():
+    """Búsqueda pública sobre entradas publicadas: ?q=&page=&per_page=, ordenada por relevancia."""
+    try:
+        query_search = request.args.get('q', '', type=str).strip()
+        if not query_search:
+            return jsonify({'message': 'El parámetro "q" es obligatorio.'}), 400
+        page = request.args.get('page', 1, type=int)
+        per_page = request.args.get('per_page', 10, type=int)
+        if page is None or page < 1:
+            return jsonify({'message': 'El parámetro "page" debe ser mayor o igual que 1.'}), 400
+        if per_page is None or not (1 <= per_page <= 50):
+            return jsonify({'message': 'El parámetro "per_page" debe estar entre 1 y 50.'}), 400
+        idioma, error = idioma_o_error(request.args)
+        if error:
+            return error
+        campos, error = leer_campos_entrada(request.args, idioma=idioma)
+        if error:
+            return jsonify({'message': error}), 400
+
+        resultados, total = buscar_registros(
+            query_search, esquema_de(Entrada, campos, idioma),
+            solo_publicadas=True, limite=per_page, offset=(page - 1) * per_page
+        )
+        return con_idioma(jsonify({
+            'resultados': [dict(registro, puntuacion=puntuacion) for registro, puntuacion in resultados],
+            'total_pages': -(-total // per_page),
+            'current_page': page,
+            'total_items': total
+        }), idioma), 200
+    except Exception as e:
+        current_app.logger.error(f"Error al buscar entradas: {str(e)}")
+        return jsonify({'error': 'Error interno del servidor al buscar entradas.'}), 500
+
+# --- Comentarios ---
+@main_bp.route('/entradas/<int:entrada_id>/comentarios', methods=['GET'])
+@cacheado('entradas', 'comentarios')
+def get_comentarios_entrada(entrada_id):
+    """Comentarios aprobados en árbol, paginados por hilo: ?limit=&after=<id del último hilo>."""
+    try:
+        total = db.session.query(Entrada.num_comentarios).filter(Entrada.id == entrada_id).scalar()
+        if total is None:
+            return jsonify({'message': 'Entrada no encontrada.'}), 404
+        limite = leer_limite(request.args)
+        if limite is None:
+            return jsonify({'message': f'El parámetro "limit" debe estar entre 1 y {LIMITE_MAXIMO}.'}), 400
+        despues = request.args.get('after', type=int)
+        if 'after' in request.args and despues is None:
+            return jsonify({'message': 'El parámetro "after" debe ser el id de un comentario.'}), 400
+
+        hilos, siguiente_cursor = arbol_comentarios(entrada_id, limite, despues)
+        return jsonify({
+            'entrada_id': entrada_id,
+            'num_comentarios': total,
+            'comentarios': hilos,
+            'next_cursor': siguiente_cursor
+        }), 200
+    except Exception as e:
+        current_app.logger.error(f"Error al obtener comentarios de la entrada {entrada_id}: {str(e)}")
+        return jsonify({'error': 'Error interno del servidor al obtener comentarios.'}), 500
+
+# --- Feed de cambios ---
+@main_bp.route('/entradas/cambios', methods=['GET'])
+def get_cambios_entradas():
+    """
+    Entradas creadas o modificadas y lápidas de las borradas desde ?since=<token>, en orden:
+    ?since=&limit=&fields=&lang=. Sin since se recorre todo (sincronización inicial).
+    La respuesta lleva el token para la siguiente llamada en 'next_since'.
+    """
+    try:
+        limite = leer_limite(request.args)
+        if limite is None:
+            return jsonify({'message': f'El parámetro "limit" debe estar entre 1 y {LIMITE_MAXIMO}.'}), 400
+        idioma, error = idioma_o_error(request.args)
+        if error:
+            return error
+        campos, error = leer_campos_entrada(request.args, idioma=idioma)
+        if error:
+            return jsonify({'message': error}), 400
+        # El token se construye con id y fecha_actualizacion: van siempre en la entrada
+        campos = campos + tuple(c for c in ('id', 'fecha_actualizacion') if c not in campos)
+
+        usar_primaria(db.session)
+        try:
+            cambios, siguiente, hay_mas = leer_cambios(
+                esquema_de(Entrada, campos, idioma), limite, request.args.get('since'),
+                current_app.config.get('CHANGES_FEED_LAG_SECONDS', 2)
+            )
+        except TokenInvalido:
+            return jsonify({'message': 'El parámetro "since" no es un token válido.'}), 400
+
+        # El resultado depende de la hora (retraso del feed): ni la caché de respuestas ni las intermedias
+        response = con_idioma(jsonify({'cambios': cambios, 'next_since': siguiente, 'has_more': hay_mas}), idioma)
+        response.headers['Cache-Control'] = 'no-store'
+        return response, 200
+    except Exception as e:
+        current_app.logger.error(f"Error al obtener el feed de cambios: {str(e)}")
+        return jsonify({'error': 'Error interno del servidor al obtener el feed de cambios.'}), 500
+
+@main_bp.route('/admin/comentarios/estado', methods=['PUT'])
+@admin_required
+def moderar_comentarios():
+    """Cambia el estado de varios comentarios a la vez: {"ids": [...], "estado": "APROBADO"}."""
+    data = request.get_json(silent=True)
+    if not data:
+        return jsonify({'message': 'No se proporcionaron datos JSON.'}), 400
+    estado = data.get('estado')
+    if estado not in ESTADOS_COMENTARIO:
+        return jsonify({'message': f'El campo "estado" debe ser uno de: {", ".join(ESTADOS_COMENTARIO)}.'}), 400
+    ids = data.get('ids')
+    if not isinstance(ids, list) or not ids or not all(isinstance(i, int) and not isinstance(i, bool) for i in ids):
+        return jsonify({'message': 'El campo "ids" debe ser una lista no vacía de ids de comentario.'}), 400
+    if len(ids) > MAX_IDS_MODERACION:
+        return jsonify({'message': f'Como máximo {MAX_IDS_MODERACION} comentarios por petición.'}), 400
+    try:
+        actualizados = moderar(ids, estado)
+        return jsonify({'message': 'Comentarios moderados.', 'estado': estado, 'actualizados': actualizados}), 200
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Error al moderar comentarios: {str(e)}")
+        return jsonify({'error': 'Error interno del servidor al moderar comentarios.'}), 500
+
 # --- Endpoints CRUD para Entradas (Protegidos por Admin) ---
 @main_bp.route('/admin/entradas', methods=['POST'])
 @admin_required
@@ -491,40 +999,46 @@ def get_admin_entradas():
         if not (1 <= per_page <= 100):
             return jsonify({'message': 'El parámetro "per_page" debe estar entre 1 y 100.'}), 400
 
+        if page is None or page < 1:
+            return jsonify({'message': 'El parámetro "page" debe ser mayor o igual que 1.'}), 400
+
         query_search = request.args.get('q', '', type=str).strip()
 
-        # Inicializar el query base
-        entradas_query = Entrada.query
+        campos, error = leer_campos_entrada(request.args)
+        if error:
+            return jsonify({'message': error}), 400
+        modo_total = leer_modo_total(request.args)
+        if modo_total is None:
+            return jsonify({'message': 'El parámetro "total" debe ser cacheado, exacto, estimado o ninguno.'}), 400
 
-        # Aplicar filtro de búsqueda si existe
         if query_search:
-            search_term = f"%{query_search}%"
-            entradas_query = entradas_query.filter(
-                or_(
-                    Entrada.titulo_es.ilike(search_term),
-                    Entrada.titulo_en.ilike(search_term),
-                    Entrada.titulo_de.ilike(search_term),
-                    Entrada.slug.ilike(search_term)
-                    # Considera añadir más campos a la búsqueda si es necesario, ej. resumen_es
-                )
+            # Búsqueda de texto completo (títulos, resúmenes y contenido), ordenada por relevancia
+            resultados, total = buscar_entradas(
+                query_search, limite=per_page, offset=(page - 1) * per_page,
+                opciones=Entrada.opciones_carga(campos)
             )
-
-        # Aplicar ordenamiento y paginación
-        entradas_paginadas = db.paginate(
+            return jsonify({
+                'entradas': [entrada.serialize(campos) for entrada, _ in resultados],
+                'total_pages': -(-total // per_page),
+                'current_page': page,
+                'total_items': total
+            }), 200
+
+        # Query base sin los cuerpos contenido_* salvo que se pidan en ?fields=
+        entradas_query = Entrada.query.options(*Entrada.opciones_carga(campos))
+
+        # Página de per_page+1 filas; el COUNT(*) sale de la caché (se invalida al escribir en entradas)
+        # o, según ?total=, se calcula, se estima o se omite
+        entradas_items, total, has_more, total_estimado = paginar_con_total(
             entradas_query.order_by(Entrada.fecha_creacion.desc()),
-            page=page,
-            per_page=per_page,
-            error_out=False # Evita un error 404 si la página está fuera de rango, devuelve lista vacía.
+            page, per_page, modo_total,
+            clave_total='entradas', tablas=('entradas',), filtrada=False
         )
 
-        entradas_items = entradas_paginadas.items
-
-        return jsonify({
-            'entradas': [entrada.serialize() for entrada in entradas_items],
-            'total_pages': entradas_paginadas.pages,
-            'current_page': entradas_paginadas.page,
-            'total_items': entradas_paginadas.total
-        }), 200
+        return jsonify(dict(
+            {'entradas': [entrada.serialize(campos) for entrada in entradas_items]},
+            **metadatos_pagina(page, per_page, total, has_more, total_estimado)
+        )), 200
     except Exception as e:
         current_app.logger.error(f"Error al obtener entradas para admin: {str(e)}")
         # Es útil loggear el traceback completo para depurar errores 500
@@ -537,7 +1051,7 @@ def get_admin_entradas():
 @admin_required
 def get_admin_entrada_by_id(entrada_id):
     try:
-        entrada = Entrada.query.get(entrada_id)
+        entrada = db.session.get(Entrada, entrada_id, options=[undefer_group('contenido')])
         if not entrada:
             return jsonify({'message': 'Entrada no encontrada.'}), 404
         return jsonify(entrada.serialize()), 200
@@ -640,6 +1154,86 @@ def delete_entrada(entrada_id):
         current_app.logger.error(f"Error al eliminar entrada {entrada_id}: {str(e)}")
         return jsonify({'error': f'Error interno del servidor al eliminar la entrada {entrada_id}.'}), 500
 
+# --- Importación / exportación masiva de contenido (NDJSON) ---
+@main_bp.route('/admin/importar', methods=['POST'])
+@admin_required
+def importar_contenido():
+    """
+    Cuerpo: NDJSON (una categoría, etiqueta o entrada por línea), leído en streaming.
+    ?lote= registros por commit, ?en_conflicto=renombrar|omitir para slugs de entrada repetidos.
+    """
+    lote = request.args.get('lote', TAMANO_LOTE_IMPORTACION, type=int)
+    if lote is None or not (1 <= lote <= 10000):
+        return jsonify({'message': 'El parámetro "lote" debe estar entre 1 y 10000.'}), 400
+    en_conflicto = request.args.get('en_conflicto', 'renombrar')
+    if en_conflicto not in MODOS_CONFLICTO:
+        return jsonify({'message': 'El parámetro "en_conflicto" debe ser renombrar u omitir.'}), 400
+    try:
+        # request.stream no tiene búfer: sin BufferedReader cada línea se lee byte a byte
+        informe = importar(io.BufferedReader(request.stream, TAMANO_BUFER_IMPORTACION), tamano_lote=lote, en_conflicto=en_conflicto)
+        return jsonify(informe.serialize()), 200
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Error al importar contenido: {str(e)}")
+        return jsonify({'error': 'Error interno del servidor al importar contenido.'}), 500
+
+@main_bp.route('/admin/exportar', methods=['GET'])
+@admin_required
+def exportar_contenido():
+    """NDJSON en streaming con ?tipos=categorias,etiquetas,entradas (por defecto todos)."""
+    tipos = leer_tipos(request.args.get('tipos', ''))
+    if tipos is None:
+        return jsonify({'message': 'El parámetro "tipos" admite: categorias, etiquetas, entradas.'}), 400
+    response = respuesta_registros(exportar(tipos), 'ndjson')
+    response.headers['Content-Disposition'] = 'attachment; filename="contenido.ndjson"'
+    return response
+
+# --- Estadísticas de la caché de respuestas (Admin) ---
+@main_bp.route('/admin/cache', methods=['GET'])
+@admin_required
+def get_admin_cache():
+    cache = obtener_cache()
+    if cache is None:
+        return jsonify({'message': 'La caché de respuestas está desactivada.'}), 404
+    return jsonify(cache.estadisticas()), 200
+
+@main_bp.route('/admin/cache', methods=['DELETE'])
+@admin_required
+def delete_admin_cache():
+    cache = obtener_cache()
+    if cache is None:
+        return jsonify({'message': 'La caché de respuestas está desactivada.'}), 404
+    cache.limpiar()
+    return jsonify({'message': 'Caché de respuestas vaciada.'}), 200
+
+# --- Diagnóstico: consultas lentas y perfiles de peticiones ---
+@main_bp.route('/admin/consultas-lentas', methods=['GET'])
+@admin_required
+def get_admin_consultas_lentas():
+    registro = obtener_consultas_lentas()
+    if registro is None:
+        return jsonify({'message': 'El registro de consultas lentas está desactivado.'}), 404
+    return jsonify(registro.serialize()), 200
+
+@main_bp.route('/admin/perfiles', methods=['GET'])
+@admin_required
+def get_admin_perfiles():
+    perfilador = obtener_perfilador()
+    if perfilador is None:
+        return jsonify({'message': 'El perfilador está desactivado.'}), 404
+    return jsonify({'perfiles': perfilador.listar()}), 200
+
+@main_bp.route('/admin/perfiles/<string:perfil_id>', methods=['GET'])
+@admin_required
+def get_admin_perfil(perfil_id):
+    perfilador = obtener_perfilador()
+    if perfilador is None:
+        return jsonify({'message': 'El perfilador está desactivado.'}), 404
+    resumen = perfilador.leer(perfil_id)
+    if resumen is None:
+        return jsonify({'message': 'Perfil no encontrado.'}), 404
+    return current_app.response_class(resumen, mimetype='text/plain')
+
 # --- Endpoints para Mensajes de Contacto (Admin) ---
 @main_bp.route('/admin/mensajes_contacto', methods=['GET'])
 @admin_required
@@ -649,35 +1243,50 @@ def get_admin_mensajes_contacto():
         per_page = request.args.get('per_page', 10, type=int)
         leido_filter = request.args.get('leido', type=str, default=None)
 
-        query = MensajeContacto.query
+        if page is None or page < 1:
+            return jsonify({'message': 'El parámetro "page" debe ser mayor o igual que 1.'}), 400
+        if per_page is None or not (1 <= per_page <= 100):
+            return jsonify({'message': 'El parámetro "per_page" debe estar entre 1 y 100.'}), 400
+        modo_total = leer_modo_total(request.args)
+        if modo_total is None:
+            return jsonify({'message': 'El parámetro "total" debe ser cacheado, exacto, estimado o ninguno.'}), 400
+
+        esquema = esquema_de(MensajeContacto)
+        query = esquema.consulta(MensajeContacto.query)
+        filtro = 'todos'
 
         if leido_filter is not None:
             if leido_filter.lower() == 'true':
                 query = query.filter_by(leido=True)
+                filtro = 'leido=true'
             elif leido_filter.lower() == 'false':
                 query = query.filter_by(leido=False)
+                filtro = 'leido=false'
+
+        # Total cacheado por filtro; cualquier escritura en mensajes_contacto lo invalida
+        mensajes_items, total, has_more, total_estimado = paginar_con_total(
+            query.order_by(MensajeContacto.fecha_envio.desc()),
+            page, per_page, modo_total,
+            clave_total=f'mensajes_contacto:{filtro}', tablas=('mensajes_contacto',),
+            filtrada=filtro != 'todos'
+        )
 
-        mensajes_paginados = query.order_by(MensajeContacto.fecha_envio.desc()).paginate(page=page, per_page=per_page, error_out=False)
-        mensajes_items = mensajes_paginados.items
-
-        return jsonify({
-            'mensajes': [{
-                'id': msg.id,
-                'nombre_remitente': msg.nombre_remitente,
-                'email_remitente': msg.email_remitente,
-                'asunto': msg.asunto,
-                'mensaje': msg.mensaje,
-                'fecha_envio': msg.fecha_envio.isoformat() if msg.fecha_envio else None,
-                'leido': msg.leido
-            } for msg in mensajes_items],
-            'total_pages': mensajes_paginados.pages,
-            'current_page': mensajes_paginados.page,
-            'total_items': mensajes_paginados.total
-        }), 200
+        return jsonify(dict({
+            'mensajes': esquema.serializar(mensajes_items)},
+            **metadatos_pagina(page, per_page, total, has_more, total_estimado)
+        )), 200
     except Exception as e:
         current_app.logger.error(f"Error al obtener mensajes de contacto para admin: {str(e)}")
         return jsonify({'error': 'Error interno del servidor al obtener mensajes de contacto.'}), 500
 
+@main_bp.route('/admin/mensajes_contacto/cola', methods=['GET'])
+@admin_required
+def get_admin_cola_contacto():
+    cola = obtener_cola_contacto()
+    if cola is None:
+        return jsonify({'message': 'La cola de mensajes de contacto está desactivada.'}), 404
+    return jsonify(cola.estadisticas()), 200
+
 @main_bp.route('/admin/mensajes_contacto/<int:mensaje_id>', methods=['GET'])
 @admin_required
 def get_admin_mensaje_by_id(mensaje_id):
@@ -0,0 +1,263 @@
+# Blog_API/app/serializacion.py
+# Serialización rápida para los listados de sólo lectura.
+# - EsquemaFilas: para un modelo y una tupla de campos se calcula una vez qué columnas
+#   seleccionar y cómo convertir cada fila. La consulta se hace con with_entities(), así que
+#   SQLAlchemy devuelve tuplas Row sin crear instancias ORM (sin identity map, sin estado ni
+#   atributos instrumentados) y cada fila se convierte en dict con un zip.
+#   Las relaciones de Entrada (comentarios, etiquetas) se cargan con una consulta IN por lote.
+#   Con ?lang= cada campo traducido se lee como COALESCE(NULLIF(<campo>_<idioma>, ''), <campo>_es),
+#   así que la respuesta sólo lleva ese idioma y el respaldo se resuelve en SQL, no en Python.
+# - ProveedorJSON: proveedor JSON de Flask que usa orjson si está instalado (dependencia opcional)
+#   y codifica las fechas de forma nativa en ISO 8601. Por eso los esquemas dejan los datetime tal
+#   cual en lugar de llamar a isoformat() fila a fila; la salida es la misma que la de serialize().
+import dataclasses
+import decimal
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import date
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import func
+from .models import db, Autor, Categoria, Entrada, Comentario, Etiqueta, EntradaEtiqueta, MensajeContacto
+from .models import CAMPOS_RELACION_ENTRADA
+
+try:
+    import orjson
+except ImportError:  # Sin orjson se usa el módulo json de la biblioteca estándar
+    orjson = None
+
+# Campos de la representación de cada modelo, en el orden de su serialize()
+CAMPOS_AUTOR = ('id', 'nombre', 'email', 'biografia', 'is_admin')
+CAMPOS_CATEGORIA = ('id', 'nombre_es', 'nombre_en', 'nombre_de', 'slug')
+CAMPOS_MENSAJE_CONTACTO = ('id', 'nombre_remitente', 'email_remitente', 'asunto', 'mensaje', 'fecha_envio', 'leido')
+CAMPOS_POR_MODELO = {
+    Autor: CAMPOS_AUTOR,
+    Categoria: CAMPOS_CATEGORIA,
+    MensajeContacto: CAMPOS_MENSAJE_CONTACTO,
+}
+# Columnas que se seleccionan aunque no se pidan: la paginación por cursor de entradas usa
+# (fecha_publicacion, id) y la portada agrupa por categoria_id
+COLUMNAS_SIEMPRE = {
+    Entrada: ('id', 'fecha_publicacion', 'categoria_id'),
+}
+
+# Idiomas del contenido; IDIOMA_BASE es obligatorio y sirve de respaldo a los demás
+IDIOMAS = ('es', 'en', 'de')
+IDIOMA_BASE = 'es'
+# Campos con una columna por idioma (<campo>_es, <campo>_en, <campo>_de)
+CAMPOS_TRADUCIDOS = {
+    Entrada: ('titulo', 'resumen', 'contenido'),
+    Categoria: ('nombre',),
+}
+
+
+def _comentarios_por_entrada(ids, conexion):
+    resultado = {}
+    for entrada_id, comentario_id in conexion.execute(
+        db.select(Comentario.entrada_id, Comentario.id).where(Comentario.entrada_id.in_(ids)).order_by(Comentario.id)
+    ):
+        resultado.setdefault(entrada_id, []).append(comentario_id)
+    return resultado
+
+
+def _etiquetas_por_entrada(ids, conexion):
+    resultado = {}
+    for entrada_id, nombre in conexion.execute(
+        db.select(EntradaEtiqueta.entrada_id, Etiqueta.nombre)
+        .join(Etiqueta, Etiqueta.id == EntradaEtiqueta.etiqueta_id)
+        .where(EntradaEtiqueta.entrada_id.in_(ids)).order_by(Etiqueta.id)
+    ):
+        resultado.setdefault(entrada_id, []).append(nombre)
+    return resultado
+
+
+CARGADORES_RELACION = {
+    (Entrada, 'comentarios'): _comentarios_por_entrada,
+    (Entrada, 'etiquetas'): _etiquetas_por_entrada,
+}
+
+
+class IdiomaInvalido(ValueError):
+    """El valor de ?lang= no es uno de IDIOMAS."""
+
+
+def leer_idioma(args):
+    """Devuelve 'es', 'en', 'de' o None (representación con todos los idiomas)."""
+    idioma = args.get('lang', '').strip().lower()
+    if not idioma:
+        return None
+    if idioma not in IDIOMAS:
+        raise IdiomaInvalido(idioma)
+    return idioma
+
+
+def campos_en_idioma(modelo, campos):
+    """
+    Proyección de una respuesta con ?lang=: cada grupo titulo_es/titulo_en/titulo_de se
+    sustituye por un único 'titulo' en la posición del primero que aparezca.
+    """
+    traducidos = CAMPOS_TRADUCIDOS.get(modelo, ())
+    resultado = []
+    for campo in campos:
+        base, _, sufijo = campo.rpartition('_')
+        if base in traducidos and sufijo in IDIOMAS:
+            campo = base
+        if campo not in resultado:
+            resultado.append(campo)
+    return tuple(resultado)
+
+
+class EsquemaFilas:
+    """
+    Serializador de un modelo para una proyección fija. Usar esquema_de() para reutilizar
+    la instancia compilada en lugar de crear una por petición.
+    Con `idioma`, los campos de CAMPOS_TRADUCIDOS ('titulo', 'nombre'...) se leen como
+    COALESCE(NULLIF(<campo>_<idioma>, ''), <campo>_es): sólo se seleccionan esas dos columnas.
+    `extras` son pares (clave, expresión) de columnas de otras tablas ya unidas a la consulta.
+    """
+
+    def __init__(self, modelo, campos, idioma=None, extras=()):
+        self.modelo = modelo
+        self.campos = tuple(campos)
+        self.idioma = idioma
+        relaciones = CAMPOS_RELACION_ENTRADA if modelo is Entrada else ()
+        self.relaciones = tuple(c for c in self.campos if c in relaciones)
+
+        # La fila empieza por los campos emitidos, en orden; detrás van las columnas auxiliares
+        emitidos = [c for c in self.campos if c not in self.relaciones]
+        columnas = [self._columna(c) for c in emitidos]
+        for clave, expresion in extras:
+            emitidos.append(clave)
+            columnas.append(expresion.label(clave))
+        self._claves = tuple(emitidos)
+        nombres = list(emitidos)
+        for c in COLUMNAS_SIEMPRE.get(modelo, ()) + (('id',) if self.relaciones else ()):
+            if c not in nombres:
+                nombres.append(c)
+                columnas.append(getattr(modelo, c))
+        self.nombres_columnas = tuple(nombres)
+        self.columnas = tuple(columnas)
+
+        n = len(emitidos)
+        self._extraer = (lambda fila: fila) if n == len(nombres) else (lambda fila: fila[:n])
+        self._indice_id = nombres.index('id') if 'id' in nombres else None
+        self._orden = self.campos + tuple(clave for clave, _ in extras)
+
+    def _columna(self, campo):
+        if self.idioma is None or campo not in CAMPOS_TRADUCIDOS.get(self.modelo, ()):
+            return getattr(self.modelo, campo)
+        base = getattr(self.modelo, f'{campo}_{IDIOMA_BASE}')
+        if self.idioma == IDIOMA_BASE:
+            return base.label(campo)
+        # Una traducción vacía cuenta como ausente
+        return func.coalesce(func.nullif(getattr(self.modelo, f'{campo}_{self.idioma}'), ''), base).label(campo)
+
+    def consulta(self, query):
+        """La misma consulta (filtros, joins y orden) seleccionando sólo las columnas del esquema."""
+        return query.with_entities(*self.columnas)
+
+    def serializar(self, filas, conexion=None):
+        """Lista de dicts a partir de filas obtenidas con consulta()."""
+        claves, extraer = self._claves, self._extraer
+        registros = [dict(zip(claves, extraer(fila))) for fila in filas]
+        if self.relaciones and registros:
+            ids = [fila[self._indice_id] for fila in filas]
+            conexion = conexion if conexion is not None else db.session
+            for campo in self.relaciones:
+                valores = CARGADORES_RELACION[(self.modelo, campo)](ids, conexion)
+                for entrada_id, registro in zip(ids, registros):
+                    registro[campo] = valores.get(entrada_id, [])
+            if self._orden != self._claves + self.relaciones:
+                # Las relaciones se añadieron al final: se restituye el orden de `campos`
+                registros = [{c: registro[c] for c in self._orden} for registro in registros]
+        return registros
+
+
+# ?fields= admite cualquier subconjunto de campos (leer_campos_entrada ya los da en orden canónico):
+# se conservan los MAX_ESQUEMAS esquemas usados más recientemente
+MAX_ESQUEMAS = 256
+_esquemas = OrderedDict()
+_lock_esquemas = threading.Lock()
+
+
+def esquema_de(modelo, campos=None, idioma=None, extras=()):
+    """
+    EsquemaFilas compilado para (modelo, campos, idioma, extras), creado la primera vez y
+    reutilizado después. Con `idioma` y sin `campos` se usa la proyección de ese idioma.
+    """
+    campos = tuple(campos) if campos is not None else CAMPOS_POR_MODELO[modelo]
+    if idioma is not None:
+        campos = campos_en_idioma(modelo, campos)
+    clave = (modelo, campos, idioma, tuple(extras))
+    with _lock_esquemas:
+        esquema = _esquemas.get(clave)
+        if esquema is not None:
+            _esquemas.move_to_end(clave)
+            return esquema
+    esquema = EsquemaFilas(modelo, campos, idioma, extras)
+    with _lock_esquemas:
+        _esquemas[clave] = esquema
+        while len(_esquemas) > MAX_ESQUEMAS:
+            _esquemas.popitem(last=False)
+    return esquema
+
+
+# --- Proveedor JSON ---
+
+def _por_defecto(o):
+    """Tipos que ni orjson ni json saben codificar, como en el proveedor por defecto de Flask."""
+    if isinstance(o, date):
+        # El proveedor de Flask usa formato HTTP (RFC 822); aquí ISO 8601, igual que serialize()
+        return o.isoformat()
+    if isinstance(o, (decimal.Decimal, uuid.UUID)):
+        return str(o)
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return dataclasses.asdict(o)
+    if hasattr(o, '__html__'):
+        return str(o.__html__())
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+class ProveedorJSON(DefaultJSONProvider):
+    """
+    Proveedor JSON de la app. Respeta sort_keys y compact como el de Flask; con orjson
+    los datetime, UUID y dataclasses se codifican en C sin pasar por _por_defecto.
+    """
+    default = staticmethod(_por_defecto)
+    usar_orjson = orjson is not None
+
+    def _opciones(self):
+        opciones = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            opciones |= orjson.OPT_SORT_KEYS
+        if self.compact is False or (self.compact is None and self._app.debug):
+            opciones |= orjson.OPT_INDENT_2
+        return opciones
+
+    def dumps(self, obj, **kwargs):
+        if not self.usar_orjson or kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=_por_defecto, option=self._opciones()).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if not self.usar_orjson or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if not self.usar_orjson:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        # Los bytes de orjson van directos al cuerpo, sin pasar por str
+        cuerpo = orjson.dumps(obj, default=_por_defecto, option=self._opciones()) + b'\n'
+        return self._app.response_class(cuerpo, mimetype=self.mimetype)
+
+
+def init_json(app):
+    """
+    Instala ProveedorJSON en la app. Siempre hace falta (los esquemas dejan las fechas sin convertir);
+    FAST_JSON_ENABLED=False sólo desactiva orjson.
+    """
+    proveedor = ProveedorJSON(app)
+    proveedor.usar_orjson = orjson is not None and app.config.get('FAST_JSON_ENABLED', True)
+    app.json = proveedor
@@ -0,0 +1,421 @@
+# Blog_API/app/snapshot.py
+# Instantánea estática del contenido publicado para servirla desde nginx o una CDN sin pasar por
+# Flask ni MySQL. Los JSON son los mismos que devuelve la API (mismo proveedor JSON y esquemas):
+#
+#   entradas/<slug>.json        = GET /entradas?slug=<slug>          (y <idioma>/entradas/<slug>.json = &lang=)
+#   categorias.json             = GET /categorias                    (y <idioma>/categorias.json)
+#   categorias/<slug>.json      = GET /categorias/<slug>/entradas sin paginar (y <idioma>/categorias/<slug>.json)
+#   ultimas.json                = las SNAPSHOT_LATEST_COUNT últimas entradas (y <idioma>/ultimas.json)
+#   autores.json                = nombre y biografía de los autores (sin email)
+#   rss.xml, <idioma>/rss.xml   = RSS 2.0 de las últimas entradas (rss.xml en el idioma base)
+#   sitemap.xml                 = índice de sitemaps/categorias.xml y sitemaps/entradas-<k>.xml
+#                                 (un fichero por cada TAMANO_SITEMAP ids de entrada)
+#
+# Regeneración incremental: los cambios confirmados en entradas (flush del ORM, p. ej. create_entrada,
+# update_entrada, delete_entrada, o marcar_entradas() para los UPDATE masivos) se anotan en un diario
+# NDJSON (SNAPSHOT_JOURNAL_PATH). `flask generar-snapshot --incremental` sólo reescribe las entradas
+# anotadas (con su slug y categoría anteriores), sus categorías, su fichero de sitemap y los índices
+# de tamaño fijo (últimas, RSS, índice del sitemap): el coste depende de los cambios, no del archivo.
+# Los cambios en categorías o autores (poco frecuentes, y presentes en muchos ficheros) se anotan
+# como tales y hacen que la siguiente ejecución sea completa; también la importación masiva, cuyos
+# INSERT en bloque no pasan por el flush (se anotan con marcar_tablas()).
+# Cada fichero se escribe en un temporal y se renombra, y sólo si su contenido cambió.
+import json
+import os
+import tempfile
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from xml.sax.saxutils import escape
+import click
+from flask import current_app, has_app_context
+from sqlalchemy import event, inspect
+from .models import db, Autor, Categoria, Entrada, CAMPOS_ENTRADA, CAMPOS_RESUMEN_ENTRADA
+from .serializacion import esquema_de, IDIOMAS, IDIOMA_BASE
+
+# None = representación con todos los idiomas (la de la API sin ?lang=)
+VARIANTES = (None,) + IDIOMAS
+CAMPOS_AUTOR_PUBLICO = ('id', 'nombre', 'biografia')
+CAMPOS_RSS = ('slug', 'titulo_es', 'resumen_es', 'fecha_publicacion')
+TAMANO_SITEMAP = 1000
+TAMANO_LOTE_SNAPSHOT = 500
+
+
+# --- Diario de cambios ---
+
+def _diario_activo():
+    return has_app_context() and bool(current_app.config.get('SNAPSHOT_DIR'))
+
+
+def _cambios_pendientes(session):
+    return session.info.setdefault('snapshot_cambios', [])
+
+
+def marcar_entradas(session, entrada_ids):
+    """Para escrituras que no pasan por el flush del ORM (UPDATE masivos que cambian entradas)."""
+    if _diario_activo():
+        _cambios_pendientes(session).extend({'entrada_id': i} for i in entrada_ids)
+
+
+def marcar_tablas(session, *tablas):
+    """Escrituras masivas que no se pueden reducir a entradas concretas: la siguiente ejecución es completa."""
+    if _diario_activo():
+        _cambios_pendientes(session).extend({'tabla': tabla} for tabla in tablas)
+
+
+def _valores(estado, atributo):
+    """Valor actual y anteriores (si cambió en este flush) de un atributo."""
+    historia = estado.attrs[atributo].history
+    return sorted({v for v in list(historia.unchanged) + list(historia.added) + list(historia.deleted) if v is not None},
+                  key=str)
+
+
+def _registrar_entradas(session, flush_context):
+    if not _diario_activo():
+        return
+    cambios = _cambios_pendientes(session)
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Entrada):
+            estado = inspect(obj)
+            cambios.append({'entrada_id': obj.id, 'slugs': _valores(estado, 'slug'),
+                            'categorias': _valores(estado, 'categoria_id')})
+        elif isinstance(obj, (Categoria, Autor)):
+            cambios.append({'tabla': obj.__table__.name})
+
+
+def _anotar_cambios(session):
+    cambios = session.info.pop('snapshot_cambios', None)
+    if not cambios or not _diario_activo():
+        return
+    ruta = current_app.config['SNAPSHOT_JOURNAL_PATH']
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(ruta)), exist_ok=True)
+        # Una sola escritura en modo append: las líneas de varios workers no se mezclan
+        with open(ruta, 'a', encoding='utf-8') as diario:
+            diario.write(''.join(json.dumps(c) + '\n' for c in cambios))
+    except OSError as e:
+        current_app.logger.error(f"No se pudo anotar el cambio para la instantánea estática: {str(e)}")
+
+
+def _descartar_cambios(session):
+    session.info.pop('snapshot_cambios', None)
+
+
+def _tomar_diario(ruta):
+    """
+    Aparta el diario (os.replace) y devuelve sus cambios; lo que se anote a partir de aquí va a un
+    diario nuevo. Si una ejecución anterior falló, sus cambios apartados se procesan también.
+    """
+    procesando = ruta + '.procesando'
+    cambios = []
+    if os.path.exists(ruta):
+        if os.path.exists(procesando):
+            with open(ruta, encoding='utf-8') as nuevo, open(procesando, 'a', encoding='utf-8') as previo:
+                previo.write(nuevo.read())
+            os.remove(ruta)
+        else:
+            os.replace(ruta, procesando)
+    if os.path.exists(procesando):
+        with open(procesando, encoding='utf-8') as diario:
+            cambios = [json.loads(linea) for linea in diario if linea.strip()]
+    return cambios, procesando
+
+
+# --- Generación ---
+
+def _slug_valido(slug):
+    return bool(slug) and '/' not in slug and '\\' not in slug and not slug.startswith('.')
+
+
+def _fecha_rfc822(fecha):
+    return format_datetime(fecha.replace(tzinfo=timezone.utc)) if fecha else ''
+
+
+class Snapshot:
+    def __init__(self, directorio, url_base='', titulo='Blog', num_ultimas=20, tamano_lote=TAMANO_LOTE_SNAPSHOT):
+        self.directorio = directorio
+        self.url_base = url_base.rstrip('/')
+        self.titulo = titulo
+        self.num_ultimas = num_ultimas
+        self.tamano_lote = tamano_lote
+        self.escritos = 0
+        self.sin_cambios = 0
+        self.borrados = 0
+
+    # Ficheros
+
+    def _ruta(self, relativa):
+        return os.path.join(self.directorio, *relativa.split('/'))
+
+    def _escribir(self, relativa, contenido):
+        ruta = self._ruta(relativa)
+        datos = contenido.encode('utf-8')
+        try:
+            with open(ruta, 'rb') as actual:
+                if actual.read() == datos:
+                    # Mismo contenido: se conserva el mtime (y el ETag que calcule nginx)
+                    self.sin_cambios += 1
+                    return
+        except FileNotFoundError:
+            os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        descriptor, temporal = tempfile.mkstemp(dir=os.path.dirname(ruta), prefix='.tmp-')
+        try:
+            with os.fdopen(descriptor, 'wb') as f:
+                f.write(datos)
+            os.chmod(temporal, 0o644)
+            os.replace(temporal, ruta)
+        except BaseException:
+            os.unlink(temporal)
+            raise
+        self.escritos += 1
+
+    def _escribir_json(self, relativa, obj):
+        self._escribir(relativa, current_app.json.dumps(obj))
+
+    def _borrar(self, relativa):
+        try:
+            os.remove(self._ruta(relativa))
+            self.borrados += 1
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def _prefijo(idioma):
+        return f'{idioma}/' if idioma else ''
+
+    # Consultas
+
+    @staticmethod
+    def _publicadas():
+        return Entrada.query.filter(Entrada.estado == 'publicado')
+
+    def _lotes_ids(self, consulta):
+        """Ids de `consulta` en lotes de tamano_lote, paginando por id."""
+        ultimo = 0
+        while True:
+            ids = [i for (i,) in consulta.filter(Entrada.id > ultimo).with_entities(Entrada.id)
+                   .order_by(Entrada.id).limit(self.tamano_lote)]
+            if not ids:
+                return
+            yield ids
+            ultimo = ids[-1]
+
+    # Piezas
+
+    def _entradas(self, ids):
+        """Escribe entradas/<slug>.json en todas las variantes. Devuelve los slugs escritos."""
+        slugs = set()
+        for idioma in VARIANTES:
+            esquema = esquema_de(Entrada, CAMPOS_ENTRADA, idioma)
+            filas = esquema.consulta(self._publicadas().filter(Entrada.id.in_(ids))).all()
+            for registro in esquema.serializar(filas):
+                if _slug_valido(registro['slug']):
+                    self._escribir_json(f"{self._prefijo(idioma)}entradas/{registro['slug']}.json", registro)
+                    slugs.add(registro['slug'])
+        return slugs
+
+    def _borrar_entrada(self, slug):
+        if _slug_valido(slug):
+            for idioma in VARIANTES:
+                self._borrar(f'{self._prefijo(idioma)}entradas/{slug}.json')
+
+    def _categoria(self, categoria_id):
+        for idioma in VARIANTES:
+            esquema_categoria = esquema_de(Categoria, idioma=idioma)
+            categoria = esquema_categoria.consulta(Categoria.query.filter(Categoria.id == categoria_id)).first()
+            if categoria is None or not _slug_valido(categoria.slug):
+                continue
+            esquema = esquema_de(Entrada, CAMPOS_RESUMEN_ENTRADA, idioma, extras=(('autor_nombre', Autor.nombre),))
+            filas = esquema.consulta(self._publicadas().join(Autor, Autor.id == Entrada.autor_id).filter(
+                Entrada.categoria_id == categoria_id
+            ).order_by(Entrada.fecha_publicacion.desc(), Entrada.id.desc())).all()
+            self._escribir_json(f'{self._prefijo(idioma)}categorias/{categoria.slug}.json', {
+                'categoria': esquema_categoria.serializar([categoria])[0],
+                'entradas': esquema.serializar(filas),
+            })
+
+    def _categorias_y_autores(self):
+        for idioma in VARIANTES:
+            esquema = esquema_de(Categoria, idioma=idioma)
+            self._escribir_json(f'{self._prefijo(idioma)}categorias.json',
+                                esquema.serializar(esquema.consulta(Categoria.query.order_by(Categoria.id)).all()))
+        esquema = esquema_de(Autor, CAMPOS_AUTOR_PUBLICO)
+        self._escribir_json('autores.json', esquema.serializar(esquema.consulta(Autor.query.order_by(Autor.id)).all()))
+        self._sitemap_categorias()
+
+    def _ultimas(self):
+        orden = (Entrada.fecha_publicacion.desc(), Entrada.id.desc())
+        recientes = self._publicadas().order_by(*orden).limit(self.num_ultimas)
+        for idioma in VARIANTES:
+            esquema = esquema_de(Entrada, CAMPOS_RESUMEN_ENTRADA, idioma, extras=(('autor_nombre', Autor.nombre),))
+            filas = esquema.consulta(self._publicadas().join(Autor, Autor.id == Entrada.autor_id)
+                                     .order_by(*orden).limit(self.num_ultimas)).all()
+            self._escribir_json(f'{self._prefijo(idioma)}ultimas.json', esquema.serializar(filas))
+        for idioma in IDIOMAS:
+            esquema = esquema_de(Entrada, CAMPOS_RSS, idioma)
+            entradas = esquema.serializar(esquema.consulta(recientes).all())
+            ruta = 'rss.xml' if idioma == IDIOMA_BASE else f'{idioma}/rss.xml'
+            self._escribir(ruta, self._rss(entradas, idioma))
+
+    def _rss(self, entradas, idioma):
+        items = ''.join(
+            '<item>'
+            f"<title>{escape(e['titulo'] or '')}</title>"
+            f"<link>{escape(self.url_base)}/blog/{escape(e['slug'])}</link>"
+            f"<guid isPermaLink=\"true\">{escape(self.url_base)}/blog/{escape(e['slug'])}</guid>"
+            f"<pubDate>{_fecha_rfc822(e['fecha_publicacion'])}</pubDate>"
+            f"<description>{escape(e['resumen'] or '')}</description>"
+            '</item>\n'
+            for e in entradas if _slug_valido(e['slug'])
+        )
+        return ('<?xml version="1.0" encoding="UTF-8"?>\n<rss version="2.0"><channel>'
+                f'<title>{escape(self.titulo)}</title><link>{escape(self.url_base)}/</link>'
+                f'<description>{escape(self.titulo)}</description><language>{idioma}</language>\n'
+                f'{items}</channel></rss>\n')
+
+    @staticmethod
+    def _urlset(urls):
+        cuerpo = ''.join(
+            f'<url><loc>{escape(loc)}</loc>' + (f'<lastmod>{fecha.date().isoformat()}</lastmod>' if fecha else '') + '</url>\n'
+            for loc, fecha in urls
+        )
+        return ('<?xml version="1.0" encoding="UTF-8"?>\n'
+                f'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n{cuerpo}</urlset>\n')
+
+    def _sitemap_categorias(self):
+        categorias = Categoria.query.with_entities(Categoria.slug, Categoria.fecha_actualizacion).order_by(Categoria.id)
+        self._escribir('sitemaps/categorias.xml', self._urlset(
+            (f'{self.url_base}/category/{slug}', fecha) for slug, fecha in categorias if _slug_valido(slug)
+        ))
+
+    def _sitemap_entradas(self, bloque):
+        """sitemaps/entradas-<bloque>.xml: entradas publicadas con id en [bloque * TAMANO_SITEMAP, ...)."""
+        filas = self._publicadas().with_entities(Entrada.slug, Entrada.fecha_actualizacion).filter(
+            Entrada.id >= bloque * TAMANO_SITEMAP, Entrada.id < (bloque + 1) * TAMANO_SITEMAP
+        ).order_by(Entrada.id).all()
+        ruta = f'sitemaps/entradas-{bloque}.xml'
+        if not filas:
+            self._borrar(ruta)
+            return
+        self._escribir(ruta, self._urlset((f'{self.url_base}/blog/{slug}', fecha) for slug, fecha in filas if _slug_valido(slug)))
+
+    def _indice_sitemap(self):
+        directorio = self._ruta('sitemaps')
+        ficheros = sorted(f for f in os.listdir(directorio) if f.endswith('.xml')) if os.path.isdir(directorio) else []
+        cuerpo = ''.join(f'<sitemap><loc>{escape(self.url_base)}/sitemaps/{f}</loc></sitemap>\n' for f in ficheros)
+        self._escribir('sitemap.xml', '<?xml version="1.0" encoding="UTF-8"?>\n'
+                                      f'<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n{cuerpo}</sitemapindex>\n')
+
+    def _manifiesto(self, modo):
+        self._escribir_json('manifest.json', {
+            'generado': datetime.now(timezone.utc).replace(microsecond=0).isoformat(),
+            'modo': modo,
+        })
+
+    # Modos
+
+    def completo(self):
+        """Regenera todo y borra los ficheros de entradas que ya no están publicadas."""
+        self._categorias_y_autores()
+        slugs, bloques = set(), set()
+        for ids in self._lotes_ids(self._publicadas()):
+            slugs |= self._entradas(ids)
+            bloques.update(i // TAMANO_SITEMAP for i in ids)
+        for idioma in VARIANTES:
+            directorio = self._ruta(f'{self._prefijo(idioma)}entradas')
+            if os.path.isdir(directorio):
+                for fichero in os.listdir(directorio):
+                    if fichero.endswith('.json') and fichero[:-5] not in slugs:
+                        self._borrar(f'{self._prefijo(idioma)}entradas/{fichero}')
+        for (categoria_id,) in Categoria.query.with_entities(Categoria.id):
+            self._categoria(categoria_id)
+        directorio = self._ruta('sitemaps')
+        if os.path.isdir(directorio):
+            for fichero in os.listdir(directorio):
+                # Sólo los que escribe _sitemap_entradas (entradas-<k>.xml); el resto no es nuestro
+                if fichero.startswith('entradas-') and fichero.endswith('.xml') and fichero[9:-4].isdigit() \
+                        and int(fichero[9:-4]) not in bloques:
+                    self._borrar(f'sitemaps/{fichero}')
+        for bloque in sorted(bloques):
+            self._sitemap_entradas(bloque)
+        self._ultimas()
+        self._indice_sitemap()
+        self._manifiesto('completo')
+
+    def incremental(self, cambios):
+        """Regenera sólo lo que depende de las entradas de `cambios` (líneas del diario)."""
+        ids, slugs, categorias = set(), set(), set()
+        for cambio in cambios:
+            ids.add(cambio['entrada_id'])
+            slugs.update(cambio.get('slugs', ()))
+            categorias.update(cambio.get('categorias', ()))
+        if not ids:
+            return
+        lista_ids = sorted(ids)
+        actuales = []
+        for inicio in range(0, len(lista_ids), self.tamano_lote):
+            lote = lista_ids[inicio:inicio + self.tamano_lote]
+            actuales += Entrada.query.with_entities(Entrada.id, Entrada.slug, Entrada.categoria_id, Entrada.estado) \
+                .filter(Entrada.id.in_(lote)).all()
+        categorias.update(fila.categoria_id for fila in actuales)
+        publicadas = [fila.id for fila in actuales if fila.estado == 'publicado']
+        escritos = set()
+        for inicio in range(0, len(publicadas), self.tamano_lote):
+            escritos |= self._entradas(publicadas[inicio:inicio + self.tamano_lote])
+        # Slugs anteriores, entradas borradas o que pasaron a borrador
+        for slug in (slugs | {fila.slug for fila in actuales}) - escritos:
+            self._borrar_entrada(slug)
+        for categoria_id in sorted(categorias):
+            self._categoria(categoria_id)
+        for bloque in sorted({i // TAMANO_SITEMAP for i in ids}):
+            self._sitemap_entradas(bloque)
+        self._ultimas()
+        self._indice_sitemap()
+        self._manifiesto('incremental')
+
+    def resumen(self):
+        return {'escritos': self.escritos, 'sin_cambios': self.sin_cambios, 'borrados': self.borrados}
+
+
+def generar_snapshot(directorio, incremental=False):
+    """
+    Genera la instantánea en `directorio`. En modo incremental procesa el diario; si aún no hay
+    instantánea (sin manifest.json) o se anotaron cambios en categorías o autores hace una completa.
+    Devuelve (modo, resumen).
+    """
+    config = current_app.config
+    snapshot = Snapshot(directorio, url_base=config.get('SNAPSHOT_BASE_URL', ''), titulo=config.get('SNAPSHOT_TITLE', 'Blog'),
+                        num_ultimas=config.get('SNAPSHOT_LATEST_COUNT', 20))
+    # El diario se aparta antes de leer la BD: lo que se confirme mientras tanto queda para la siguiente
+    cambios, procesando = _tomar_diario(config['SNAPSHOT_JOURNAL_PATH'])
+    if incremental and os.path.exists(os.path.join(directorio, 'manifest.json')) \
+            and all('entrada_id' in cambio for cambio in cambios):
+        modo = 'incremental'
+        snapshot.incremental(cambios)
+    else:
+        modo = 'completo'
+        os.makedirs(directorio, exist_ok=True)
+        snapshot.completo()
+    if os.path.exists(procesando):
+        os.remove(procesando)
+    return modo, dict(snapshot.resumen(), cambios=len(cambios))
+
+
+def init_snapshot(app, db):
+    """Engancha el diario de cambios a la sesión y registra `flask generar-snapshot`."""
+    sesion = db.session.session_factory.class_
+    for nombre, listener in (('after_flush', _registrar_entradas),
+                             ('after_commit', _anotar_cambios),
+                             ('after_rollback', _descartar_cambios)):
+        if not event.contains(sesion, nombre, listener):
+            event.listen(sesion, nombre, listener)
+
+    @app.cli.command('generar-snapshot')
+    @click.option('--directorio', default=None, help='Destino (por defecto SNAPSHOT_DIR).')
+    @click.option('--incremental', is_flag=True, help='Sólo lo afectado por los cambios anotados desde la última ejecución.')
+    def generar_snapshot_comando(directorio, incremental):
+        """Materializa el contenido publicado (JSON, RSS y sitemap) para servirlo como estático."""
+        directorio = directorio or app.config.get('SNAPSHOT_DIR')
+        if not directorio:
+            raise click.BadParameter('Indica --directorio o configura SNAPSHOT_DIR.', param_hint='--directorio')
+        modo, resumen = generar_snapshot(directorio, incremental=incremental)
+        click.echo(json.dumps(dict(resumen, modo=modo, directorio=directorio), ensure_ascii=False))
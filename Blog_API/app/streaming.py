@@ -0,0 +1,123 @@
+# Blog_API/app/streaming.py
+# Respuestas JSON en streaming para listados grandes y exportaciones.
+# La consulta se recorre con yield_per (cursor del lado del servidor en MySQL) y cada lote se
+# serializa y se envía según llega, así que la memoria del worker no depende del número de filas
+# y el primer byte sale en cuanto se lee el primer lote.
+# Formatos: ?stream=json (un array JSON) o ?stream=ndjson (un objeto JSON por línea).
+# Se elige por query string y no por Accept para que la clave de la caché de respuestas
+# distinga ambas representaciones.
+from flask import current_app, request, stream_with_context
+from .models import db
+from .replicas import motor_lectura
+
+FORMATOS_STREAM = ('json', 'ndjson')
+TIPOS_STREAM = {'json': 'application/json', 'ndjson': 'application/x-ndjson'}
+
+# Filas por viaje a la BD y bytes acumulados antes de enviar un trozo al cliente
+TAMANO_LOTE = 500
+TAMANO_TROZO = 64 * 1024
+
+
+class FormatoStreamInvalido(ValueError):
+    """El valor de ?stream= no es uno de FORMATOS_STREAM."""
+
+
+def leer_formato_stream(args):
+    """Devuelve 'json', 'ndjson' o None (respuesta normal). ?stream=1 equivale a 'json'."""
+    formato = args.get('stream', '').strip().lower()
+    if not formato:
+        return None
+    if formato in ('1', 'true'):
+        return 'json'
+    if formato not in FORMATOS_STREAM:
+        raise FormatoStreamInvalido(formato)
+    return formato
+
+
+def respuesta_stream(query, esquema, formato, tamano_lote=TAMANO_LOTE):
+    """
+    Respuesta 200 que emite cada fila de `query` serializada con `esquema` (un EsquemaFilas, ver
+    serializacion.py) sin materializar la lista: se leen tuplas Row por lotes y cada lote se
+    serializa de una vez (una consulta IN por relación y lote).
+    La consulta se ejecuta aquí mismo (antes de enviar cabeceras), de modo que un error de BD
+    sigue convirtiéndose en un 500 normal en la vista que llama.
+    """
+    # Conexión propia y no db.session: Flask desmonta el contexto de app (y con él la sesión)
+    # al volver de la vista, antes de que el servidor recorra el generador. En un GET, de una réplica.
+    engine = motor_lectura() or db.engine
+    conexion = engine.connect()
+    try:
+        resultado = conexion.execution_options(yield_per=tamano_lote).execute(esquema.consulta(query).statement)
+    except Exception:
+        conexion.close()
+        raise
+    return respuesta_registros(_registros_por_lotes(engine, conexion, resultado, esquema, tamano_lote), formato)
+
+
+def _registros_por_lotes(engine, conexion, resultado, esquema, tamano_lote):
+    conexion_relaciones = None
+    try:
+        if esquema.relaciones:
+            # El cursor principal sigue abierto (en MySQL, sin búfer) mientras se recorre:
+            # las relaciones se leen por otra conexión
+            conexion_relaciones = engine.connect()
+        for lote in resultado.partitions(tamano_lote):
+            yield from esquema.serializar(lote, conexion_relaciones)
+    finally:
+        resultado.close()
+        conexion.close()
+        if conexion_relaciones is not None:
+            conexion_relaciones.close()
+
+
+def respuesta_registros(registros, formato):
+    """Respuesta en streaming a partir de un iterable cualquiera de dicts (p. ej. una exportación)."""
+    generador = _generar_ndjson(registros) if formato == 'ndjson' else _generar_array(registros)
+    response = current_app.response_class(stream_with_context(generador), mimetype=TIPOS_STREAM[formato])
+    # Evita que un proxy (nginx) acumule la respuesta entera antes de reenviarla
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def _generar_array(registros):
+    dumps = current_app.json.dumps
+    yield '['
+    trozo = []
+    tamano = 0
+    separador = ''
+    try:
+        for registro in registros:
+            texto = separador + dumps(registro)
+            separador = ','
+            trozo.append(texto)
+            tamano += len(texto)
+            if tamano >= TAMANO_TROZO:
+                yield ''.join(trozo)
+                trozo, tamano = [], 0
+    except Exception as e:
+        # Las cabeceras ya se enviaron: sólo se puede registrar y cortar. El array queda sin
+        # cerrar a propósito para que el cliente no tome la respuesta truncada por completa.
+        current_app.logger.error(f"Error durante el streaming de {request.path}: {str(e)}")
+        return
+    trozo.append(']')
+    yield ''.join(trozo)
+
+
+def _generar_ndjson(registros):
+    dumps = current_app.json.dumps
+    trozo = []
+    tamano = 0
+    try:
+        for registro in registros:
+            texto = dumps(registro) + '\n'
+            trozo.append(texto)
+            tamano += len(texto)
+            if tamano >= TAMANO_TROZO:
+                yield ''.join(trozo)
+                trozo, tamano = [], 0
+    except Exception as e:
+        current_app.logger.error(f"Error durante el streaming de {request.path}: {str(e)}")
+        yield ''.join(trozo) + dumps({'error': 'Respuesta interrumpida por un error interno.'}) + '\n'
+        return
+    if trozo:
+        yield ''.join(trozo)
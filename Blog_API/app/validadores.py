@@ -0,0 +1,104 @@
+# Blog_API/app/validadores.py
+# GET condicional (ETag / Last-Modified / 304) para los listados públicos.
+# Los validadores de un conjunto completo (autores, categorías, una entrada por slug, los streams) se
+# calculan con una consulta agregada barata (MAX(fecha_actualizacion), COUNT(*)) sobre el mismo
+# conjunto filtrado, así que un 304 se responde sin ejecutar la consulta pesada ni serializar el cuerpo.
+# Las páginas de /entradas usan en cambio las filas de la propia página (validadores_de_pagina):
+# agregar sobre todo el conjunto filtrado costaría O(tabla) por página.
+# Moderar un comentario recalcula Entrada.num_comentarios (y el UPDATE renueva fecha_actualizacion);
+# cambiar las etiquetas de una entrada no toca la fila: las representaciones que las incluyen añaden
+# sus agregados (huella_relaciones) o las etiquetas ya cargadas de la página.
+import hashlib
+from datetime import datetime, timezone
+from flask import request, current_app
+from sqlalchemy import func, select
+from .models import db, Entrada, EntradaEtiqueta
+
+# Columnas que se añaden detrás de las del esquema en la consulta de una página de /entradas
+# (serializar() las ignora: sólo lee las columnas de sus propias claves)
+COLUMNAS_VALIDADOR_PAGINA = (
+    Entrada.id.label('_validador_id'),
+    Entrada.fecha_actualizacion.label('_validador_fecha'),
+    Entrada.num_comentarios.label('_validador_comentarios'),
+)
+
+
+def validadores_de(query, columna_fecha, columna_id, *variantes):
+    """
+    Calcula (etag, last_modified) para el conjunto de filas de `query`.
+    `variantes` distingue representaciones distintas del mismo conjunto (query string, idioma...).
+    """
+    ultima_fecha, total = query.with_entities(func.max(columna_fecha), func.count(columna_id)).one()
+    if isinstance(ultima_fecha, str):
+        # SQLite devuelve MAX() de un TIMESTAMP como texto
+        ultima_fecha = datetime.fromisoformat(ultima_fecha)
+    return _validadores(ultima_fecha, [str(total)] + [str(v) for v in variantes])
+
+
+def validadores_de_pagina(filas, registros, *variantes):
+    """
+    (etag, last_modified) de una página ya cargada. `filas` salen de una consulta con
+    COLUMNAS_VALIDADOR_PAGINA al final y `registros` de serializarlas; de los registros sólo
+    se usan las etiquetas, que no cambian la fila de la entrada.
+    """
+    n = len(COLUMNAS_VALIDADOR_PAGINA)
+    partes, ultima_fecha = [], None
+    for fila, registro in zip(filas, registros):
+        entrada_id, fecha, num_comentarios = tuple(fila)[-n:]
+        if isinstance(fecha, str):
+            fecha = datetime.fromisoformat(fecha)
+        if fecha and (ultima_fecha is None or fecha > ultima_fecha):
+            ultima_fecha = fecha
+        partes.append(f"{entrada_id}:{fecha.isoformat() if fecha else ''}:{num_comentarios}:{registro.get('etiquetas', '')}")
+    return _validadores(ultima_fecha, [str(len(partes))] + partes + [str(v) for v in variantes])
+
+
+def _validadores(ultima_fecha, partes):
+    base = '|'.join([ultima_fecha.isoformat() if ultima_fecha else ''] + partes)
+    etag = hashlib.sha1(base.encode('utf-8')).hexdigest()
+    last_modified = ultima_fecha.replace(tzinfo=timezone.utc, microsecond=0) if ultima_fecha else None
+    return etag, last_modified
+
+
+def huella_relaciones(query, campos):
+    """
+    Agregados de num_comentarios y de las etiquetas de las entradas de `query` que aparecen en
+    `campos`, en una sola consulta, para pasarlos como variantes a validadores_de(). La suma de
+    productos de ids detecta altas y bajas de etiquetas aunque su número no cambie.
+    """
+    entrada_ids = query.with_entities(Entrada.id).order_by(None).statement
+    agregados = []
+    if 'comentarios' in campos or 'num_comentarios' in campos:
+        agregados.append(select(func.sum(Entrada.num_comentarios)).where(Entrada.id.in_(entrada_ids)).scalar_subquery())
+    if 'etiquetas' in campos:
+        de_etiquetas = EntradaEtiqueta.entrada_id.in_(entrada_ids)
+        agregados += [select(agregado).where(de_etiquetas).scalar_subquery() for agregado in (
+            func.count(EntradaEtiqueta.etiqueta_id),
+            func.sum(EntradaEtiqueta.entrada_id * EntradaEtiqueta.etiqueta_id),
+        )]
+    if not agregados:
+        return []
+    return list(db.session.execute(select(*agregados)).one())
+
+
+def no_modificado(etag, last_modified):
+    """True si las cabeceras condicionales de la petición coinciden con los validadores actuales."""
+    if request.if_none_match:
+        # If-None-Match tiene prioridad sobre If-Modified-Since (RFC 9110 13.2.2)
+        return request.if_none_match.contains_weak(etag)
+    if request.if_modified_since and last_modified:
+        return last_modified <= request.if_modified_since
+    return False
+
+
+def con_validadores(response, etag, last_modified):
+    response.set_etag(etag, weak=True)
+    if last_modified:
+        response.last_modified = last_modified
+    # Los clientes pueden guardar la respuesta pero deben revalidarla en cada uso
+    response.cache_control.no_cache = True
+    return response
+
+
+def respuesta_no_modificado(etag, last_modified):
+    return con_validadores(current_app.response_class(status=304), etag, last_modified)
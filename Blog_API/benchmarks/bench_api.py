@@ -0,0 +1,537 @@
+# Blog_API/benchmarks/bench_api.py
+# Benchmark de todas las rutas de main_bp sobre datos sintéticos (ver datos.py).
+# Fase 1, en proceso con el cliente de pruebas de Flask: latencia p50/p95/p99, consultas SQL
+# por petición (X-Query-Count) y pico de memoria asignada (tracemalloc) por escenario.
+# Fase 2, HTTP real contra gunicorn (o el servidor con hilos de werkzeug si no está instalado):
+# clientes concurrentes durante un tiempo fijo por ruta de lectura -> throughput y percentiles.
+# El resultado se guarda en JSON; con --comparar se contrasta con otro resultado y el proceso
+# termina con código 1 si hay regresiones.
+#
+#   cd Blog_API && python -m benchmarks.bench_api --volumen pequeno
+#   cd Blog_API && python -m benchmarks.bench_api --comparar benchmarks/resultados/base.json --tolerancia 20
+#   cd Blog_API && python -m benchmarks.bench_api --database-uri mysql+pymysql://... --workers 4
+import argparse
+import importlib.util
+import itertools
+import json
+import logging
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+from .comun import resumen, peticion, preparar_entorno, commit_actual
+from .datos import generar, leer_volumen, anadir_argumentos_volumen, EMAIL_ADMIN, CONTRASENA_BENCHMARK
+
+DIRECTORIO_BLOG_API = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DIRECTORIO_RESULTADOS = os.path.join(DIRECTORIO_BLOG_API, 'benchmarks', 'resultados')
+# Diferencias de latencia por debajo de esto se consideran ruido al comparar
+UMBRAL_RUIDO_MS = 1.0
+
+
+class Escenario:
+    """
+    Una petición representativa de un endpoint. `ruta` y `cuerpo` pueden ser funciones del número
+    de iteración, para que las escrituras no choquen (emails, slugs) y los borrados tengan objetivo.
+    """
+
+    def __init__(self, nombre, endpoint, metodo, ruta, cuerpo=None, admin=False, esperado=(200,),
+                 tipo_contenido='application/json', http=None):
+        self.nombre = nombre
+        self.endpoint = endpoint
+        self.metodo = metodo
+        self.ruta = ruta
+        self.cuerpo = cuerpo
+        self.admin = admin
+        self.esperado = set(esperado)
+        self.tipo_contenido = tipo_contenido
+        # Por defecto sólo las lecturas van a la fase HTTP: repetir escrituras durante N segundos
+        # agotaría los objetivos de los borrados y mediría sobre todo el crecimiento de las tablas
+        self.http = metodo == 'GET' if http is None else http
+
+    def ruta_para(self, i):
+        return self.ruta(i) if callable(self.ruta) else self.ruta
+
+    def cuerpo_para(self, i):
+        cuerpo = self.cuerpo(i) if callable(self.cuerpo) else self.cuerpo
+        if cuerpo is None or isinstance(cuerpo, bytes):
+            return cuerpo
+        return json.dumps(cuerpo).encode('utf-8')
+
+
+class Contexto:
+    """Ids de las filas sobre las que actúan los escenarios, leídos tras sembrar."""
+
+    def __init__(self, token, ids_autor, ids_categoria, slugs_categoria, ids_entrada, ids_mensaje, objetivos, perfil_id):
+        self.token = token
+        self.ids_autor = ids_autor
+        self.ids_categoria = ids_categoria
+        self.slugs_categoria = slugs_categoria
+        self.ids_entrada = ids_entrada
+        self.ids_mensaje = ids_mensaje
+        self.objetivos = objetivos
+        self.perfil_id = perfil_id
+
+
+def _ciclo(valores):
+    return lambda i: valores[i % len(valores)]
+
+
+def _ndjson_importacion(n, etiqueta):
+    lineas = [json.dumps({
+        'tipo': 'entrada', 'autor_email': EMAIL_ADMIN, 'categoria': 'categoria-0',
+        'titulo_es': f'Importada {etiqueta} {k}', 'resumen_es': 'Resumen importado.',
+        'contenido_es': '<p>Contenido importado.</p>', 'estado': 'publicado', 'etiquetas': ['etiqueta-0'],
+    }) for k in range(n)]
+    return ('\n'.join(lineas) + '\n').encode('utf-8')
+
+
+def construir_escenarios(ctx):
+    unico = itertools.count()
+    autor = _ciclo(ctx.ids_autor)
+    categoria = _ciclo(ctx.ids_categoria)
+    slug = _ciclo(ctx.slugs_categoria)
+    entrada = _ciclo(ctx.ids_entrada)
+    mensaje = _ciclo(ctx.ids_mensaje)
+    objetivo = lambda tabla: (lambda i: ctx.objetivos[tabla][i])
+
+    return [
+        Escenario('metrics', 'main.metrics', 'GET', '/metrics'),
+        Escenario('healthz', 'main.healthz', 'GET', '/healthz'),
+        # Las tres lecturas de PostsPorCategoria.tsx en una petición
+        Escenario('batch', 'main.procesar_lote', 'POST', '/batch',
+                  cuerpo=lambda i: {'peticiones': [{'id': 'categorias', 'ruta': '/categorias'},
+                                                   {'id': 'entradas', 'ruta': f'/categorias/{slug(i)}/entradas'},
+                                                   {'id': 'autores', 'ruta': '/autores'}]}),
+        Escenario('login', 'main.login', 'POST', '/login',
+                  cuerpo={'email': EMAIL_ADMIN, 'contrasena': CONTRASENA_BENCHMARK}),
+        Escenario('autores_listado', 'main.get_autores', 'GET', '/autores'),
+        Escenario('autores_stream', 'main.get_autores', 'GET', '/autores?stream=ndjson'),
+        Escenario('autor_detalle', 'main.get_autor_by_id', 'GET', lambda i: f'/autores/{autor(i)}'),
+        Escenario('autor_crear', 'main.create_autor', 'POST', '/autores', admin=True, esperado=(201,),
+                  cuerpo=lambda i: {'nombre': 'Nuevo', 'email': f'nuevo{next(unico)}@bench.example.com',
+                                    'contrasena': CONTRASENA_BENCHMARK}),
+        Escenario('autor_actualizar', 'main.update_autor', 'PUT', lambda i: f'/autores/{autor(i)}', admin=True,
+                  cuerpo=lambda i: {'biografia': f'Biografía revisada {i}'}),
+        Escenario('autor_borrar', 'main.delete_autor', 'DELETE',
+                  lambda i: f"/autores/{objetivo('autores')(i)}", admin=True),
+        Escenario('categoria_crear', 'main.create_categoria', 'POST', '/categorias/POST', admin=True, esperado=(201,),
+                  cuerpo=lambda i: {'nombre_es': f'Nueva categoría {next(unico)}'}),
+        Escenario('categorias_listado', 'main.get_categorias', 'GET', '/categorias'),
+        Escenario('categoria_detalle', 'main.get_categoria_by_id', 'GET', lambda i: f'/categorias/{categoria(i)}'),
+        Escenario('categoria_entradas', 'main.get_entradas_por_categoria', 'GET',
+                  lambda i: f'/categorias/{slug(i)}/entradas'),
+        Escenario('categorias_ultimas_entradas', 'main.get_ultimas_entradas_por_categoria', 'GET',
+                  '/categorias/ultimas-entradas'),
+        Escenario('categoria_actualizar', 'main.update_categoria', 'PUT', lambda i: f'/categorias/{categoria(i)}',
+                  admin=True, cuerpo=lambda i: {'nombre_en': f'Category revised {i}'}),
+        Escenario('categoria_borrar', 'main.delete_categoria', 'DELETE',
+                  lambda i: f"/categorias/{objetivo('categorias')(i)}", admin=True),
+        Escenario('contacto_crear', 'main.create_contacto', 'POST', '/mensajecontacto', esperado=(201, 202),
+                  cuerpo=lambda i: {'nombre_remitente': 'Visitante', 'email_remitente': 'visitante@example.com',
+                                    'asunto': 'Consulta', 'mensaje': f'Mensaje de prueba {next(unico)}'}),
+        Escenario('entradas_listado', 'main.get_entradas', 'GET', '/entradas?limit=20'),
+        Escenario('entradas_resumen', 'main.get_entradas', 'GET', '/entradas?limit=20&fields=id,slug,titulo_es'),
+        Escenario('entradas_stream', 'main.get_entradas', 'GET', '/entradas?stream=ndjson'),
+        Escenario('buscar', 'main.buscar', 'GET', '/buscar?q=rendimiento'),
+        Escenario('entradas_cambios', 'main.get_cambios_entradas', 'GET', '/entradas/cambios?limit=100'),
+        Escenario('entrada_comentarios', 'main.get_comentarios_entrada', 'GET',
+                  lambda i: f'/entradas/{entrada(i)}/comentarios'),
+        Escenario('admin_comentarios_moderar', 'main.moderar_comentarios', 'PUT', '/admin/comentarios/estado',
+                  admin=True, cuerpo=lambda i: {'ids': list(range(1 + 50 * (i % 20), 51 + 50 * (i % 20))),
+                                                'estado': ('APROBADO', 'PENDIENTE')[i % 2]}),
+        Escenario('admin_entrada_crear', 'main.create_entrada', 'POST', '/admin/entradas', admin=True, esperado=(201,),
+                  cuerpo=lambda i: {'autor_id': ctx.ids_autor[0], 'categoria_id': ctx.ids_categoria[0],
+                                    'titulo_es': f'Entrada nueva {next(unico)}', 'resumen_es': 'Resumen.',
+                                    'contenido_es': '<p>Contenido.</p>', 'estado': 'publicado'}),
+        Escenario('admin_entradas_listado', 'main.get_admin_entradas', 'GET', '/admin/entradas?page=1', admin=True),
+        Escenario('admin_entrada_detalle', 'main.get_admin_entrada_by_id', 'GET',
+                  lambda i: f'/admin/entradas/{entrada(i)}', admin=True),
+        Escenario('admin_entrada_actualizar', 'main.update_entrada', 'PUT', lambda i: f'/admin/entradas/{entrada(i)}',
+                  admin=True, cuerpo=lambda i: {'resumen_es': f'Resumen revisado {i}'}),
+        Escenario('admin_entrada_borrar', 'main.delete_entrada', 'DELETE',
+                  lambda i: f"/admin/entradas/{objetivo('entradas')(i)}", admin=True),
+        Escenario('admin_importar', 'main.importar_contenido', 'POST', '/admin/importar?en_conflicto=renombrar',
+                  admin=True, cuerpo=lambda i: _ndjson_importacion(20, next(unico)),
+                  tipo_contenido='application/x-ndjson'),
+        Escenario('admin_exportar', 'main.exportar_contenido', 'GET', '/admin/exportar?tipos=categorias,etiquetas',
+                  admin=True),
+        Escenario('admin_cache', 'main.get_admin_cache', 'GET', '/admin/cache', admin=True, esperado=(200, 404)),
+        Escenario('admin_cache_vaciar', 'main.delete_admin_cache', 'DELETE', '/admin/cache', admin=True,
+                  esperado=(200, 404)),
+        Escenario('admin_consultas_lentas', 'main.get_admin_consultas_lentas', 'GET', '/admin/consultas-lentas',
+                  admin=True, esperado=(200, 404)),
+        Escenario('admin_perfiles', 'main.get_admin_perfiles', 'GET', '/admin/perfiles', admin=True,
+                  esperado=(200, 404)),
+        Escenario('admin_perfil_detalle', 'main.get_admin_perfil', 'GET', f'/admin/perfiles/{ctx.perfil_id}',
+                  admin=True, esperado=(200, 404)),
+        Escenario('admin_mensajes_listado', 'main.get_admin_mensajes_contacto', 'GET',
+                  '/admin/mensajes_contacto?page=1', admin=True),
+        Escenario('admin_mensajes_cola', 'main.get_admin_cola_contacto', 'GET', '/admin/mensajes_contacto/cola',
+                  admin=True, esperado=(200, 404)),
+        Escenario('admin_mensaje_detalle', 'main.get_admin_mensaje_by_id', 'GET',
+                  lambda i: f'/admin/mensajes_contacto/{mensaje(i)}', admin=True),
+        Escenario('admin_mensaje_toggle_leido', 'main.toggle_leido_mensaje_contacto', 'PUT',
+                  lambda i: f'/admin/mensajes_contacto/{mensaje(i)}/toggle_leido', admin=True),
+        Escenario('admin_mensaje_borrar', 'main.delete_mensaje_contacto', 'DELETE',
+                  lambda i: f"/admin/mensajes_contacto/{objetivo('mensajes')(i)}", admin=True),
+    ]
+
+
+def endpoints_sin_cubrir(app, escenarios):
+    """(endpoint, método) de main_bp sin ningún escenario: una ruta nueva debe añadirse aquí."""
+    cubiertos = {(e.endpoint, e.metodo) for e in escenarios}
+    faltan = []
+    for regla in app.url_map.iter_rules():
+        if not regla.endpoint.startswith('main.'):
+            continue
+        for metodo in sorted(regla.methods - {'HEAD', 'OPTIONS'}):
+            if (regla.endpoint, metodo) not in cubiertos:
+                faltan.append(f'{metodo} {regla.rule} ({regla.endpoint})')
+    return faltan
+
+
+def _crear_objetivos(db, n):
+    """Filas sin dependencias que los escenarios de borrado eliminan, una por iteración."""
+    from sqlalchemy import insert
+    from app.models import Autor, Categoria, Entrada, MensajeContacto
+    from app.contrasenas import generar_hash
+
+    hash_contrasena = generar_hash(CONTRASENA_BENCHMARK)
+    categoria_id = db.session.query(Categoria.id).order_by(Categoria.id).first()[0]
+    autor_id = db.session.query(Autor.id).order_by(Autor.id).first()[0]
+    filas = {
+        'autores': (Autor, [{'nombre': f'Objetivo {i}', 'email': f'objetivo{i}@bench.example.com',
+                             'contrasena': hash_contrasena, 'is_admin': False} for i in range(n)]),
+        'categorias': (Categoria, [{'nombre_es': f'Objetivo {i}', 'slug': f'objetivo-{i}'} for i in range(n)]),
+        'entradas': (Entrada, [{'autor_id': autor_id, 'categoria_id': categoria_id, 'slug': f'objetivo-{i}',
+                                'titulo_es': f'Objetivo {i}', 'resumen_es': 'Objetivo de borrado.',
+                                'contenido_es': '<p>Objetivo.</p>', 'estado': 'borrador'} for i in range(n)]),
+        'mensajes': (MensajeContacto, [{'nombre_remitente': 'Objetivo', 'email_remitente': 'objetivo@example.com',
+                                        'mensaje': f'Objetivo {i}'} for i in range(n)]),
+    }
+    objetivos = {}
+    for tabla, (modelo, valores) in filas.items():
+        desde = db.session.query(db.func.coalesce(db.func.max(modelo.id), 0)).scalar()
+        db.session.execute(insert(modelo), valores)
+        db.session.commit()
+        objetivos[tabla] = [i for (i,) in db.session.query(modelo.id).filter(modelo.id > desde).order_by(modelo.id)]
+    return objetivos
+
+
+def preparar_contexto(app, cliente, n_objetivos):
+    from app.models import db, Autor, Categoria, Entrada, MensajeContacto
+
+    with app.app_context():
+        objetivos = _crear_objetivos(db, n_objetivos)
+        excluidos = set(objetivos['autores'])
+        ids_autor = [i for (i,) in db.session.query(Autor.id).order_by(Autor.id).limit(200) if i not in excluidos]
+        categorias = db.session.query(Categoria.id, Categoria.slug).filter(~Categoria.slug.like('objetivo-%')) \
+            .order_by(Categoria.id).limit(200).all()
+        ids_entrada = [i for (i,) in db.session.query(Entrada.id).filter(~Entrada.slug.like('objetivo-%'))
+                       .order_by(Entrada.id).limit(500)]
+        ids_mensaje = [i for (i,) in db.session.query(MensajeContacto.id)
+                       .filter(MensajeContacto.id.notin_(objetivos['mensajes'])).order_by(MensajeContacto.id).limit(500)]
+
+    respuesta = cliente.post('/login', json={'email': EMAIL_ADMIN, 'contrasena': CONTRASENA_BENCHMARK})
+    if respuesta.status_code != 200:
+        raise RuntimeError(f'No se pudo iniciar sesión como {EMAIL_ADMIN}: {respuesta.status_code} {respuesta.get_data(as_text=True)}')
+    token = respuesta.get_json()['access_token']
+    # Un perfil guardado para el escenario de /admin/perfiles/<id>
+    perfil = cliente.get('/categorias', headers={'Authorization': f'Bearer {token}', 'X-Perfil': '1'})
+    perfil.get_data()
+    return Contexto(token, ids_autor, [c.id for c in categorias], [c.slug for c in categorias], ids_entrada,
+                    ids_mensaje, objetivos, perfil.headers.get('X-Perfil-Id', 'inexistente'))
+
+
+def _cabeceras(escenario, ctx):
+    cabeceras = {'Content-Type': escenario.tipo_contenido}
+    if escenario.admin:
+        cabeceras['Authorization'] = f'Bearer {ctx.token}'
+    return cabeceras
+
+
+def _peticion_cliente(cliente, escenario, ctx, i):
+    inicio = time.perf_counter()
+    respuesta = cliente.open(escenario.ruta_para(i), method=escenario.metodo, data=escenario.cuerpo_para(i),
+                             headers=_cabeceras(escenario, ctx))
+    # Las respuestas en streaming se generan al leerlas: se consumen dentro de la medida
+    respuesta.get_data()
+    latencia = time.perf_counter() - inicio
+    consultas = respuesta.headers.get('X-Query-Count')
+    return latencia, respuesta.status_code, int(consultas) if consultas is not None else None
+
+
+def medir_en_proceso(cliente, escenario, ctx, calentamiento, iteraciones, iteraciones_memoria):
+    # Cada escenario numera sus iteraciones desde 0: los borrados consumen sus objetivos en orden
+    contador = itertools.count()
+    for _ in range(calentamiento):
+        _peticion_cliente(cliente, escenario, ctx, next(contador))
+
+    latencias, consultas, estados = [], [], {}
+    inicio = time.perf_counter()
+    for _ in range(iteraciones):
+        latencia, status, n = _peticion_cliente(cliente, escenario, ctx, next(contador))
+        latencias.append(latencia)
+        estados[status] = estados.get(status, 0) + 1
+        if n is not None:
+            consultas.append(n)
+    duracion = time.perf_counter() - inicio
+
+    # Pasada aparte: tracemalloc ralentiza la ejecución y falsearía las latencias
+    pico = 0
+    tracemalloc.start()
+    try:
+        for _ in range(iteraciones_memoria):
+            tracemalloc.reset_peak()
+            base, _ = tracemalloc.get_traced_memory()
+            _peticion_cliente(cliente, escenario, ctx, next(contador))
+            pico = max(pico, tracemalloc.get_traced_memory()[1] - base)
+    finally:
+        tracemalloc.stop()
+
+    return dict(
+        resumen(latencias),
+        throughput_por_s=round(iteraciones / duracion, 2) if duracion else None,
+        consultas_media=round(sum(consultas) / len(consultas), 2) if consultas else None,
+        consultas_max=max(consultas) if consultas else None,
+        memoria_pico_kib=round(pico / 1024, 1) if iteraciones_memoria else None,
+        estados={str(k): v for k, v in sorted(estados.items())},
+        inesperados=sum(v for k, v in estados.items() if k not in escenario.esperado),
+    )
+
+
+def medir_http(base, escenario, ctx, concurrencia, duracion):
+    latencias, consultas, estados = [], [], {}
+    lock = threading.Lock()
+    contador = itertools.count()
+    fin = time.monotonic() + duracion
+
+    def cliente():
+        while time.monotonic() < fin:
+            i = next(contador)
+            latencia, status, cabeceras = peticion(f'{base}{escenario.ruta_para(i)}', metodo=escenario.metodo,
+                                                   cabeceras=_cabeceras(escenario, ctx))
+            with lock:
+                latencias.append(latencia)
+                estados[status] = estados.get(status, 0) + 1
+                if cabeceras.get('X-Query-Count') is not None:
+                    consultas.append(int(cabeceras['X-Query-Count']))
+
+    inicio = time.perf_counter()
+    hilos = [threading.Thread(target=cliente) for _ in range(concurrencia)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    transcurrido = time.perf_counter() - inicio
+    return dict(
+        resumen(latencias),
+        throughput_por_s=round(len(latencias) / transcurrido, 2),
+        consultas_media=round(sum(consultas) / len(consultas), 2) if consultas else None,
+        estados={str(k): v for k, v in sorted(estados.items())},
+        inesperados=sum(v for k, v in estados.items() if k not in escenario.esperado),
+    )
+
+
+def _puerto_libre():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _esperar_servidor(base, proceso=None, timeout=30):
+    limite = time.monotonic() + timeout
+    while time.monotonic() < limite:
+        if proceso is not None and proceso.poll() is not None:
+            raise RuntimeError(f'gunicorn terminó con código {proceso.returncode}')
+        try:
+            if peticion(f'{base}/categorias')[1] == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f'El servidor no respondió en {timeout} s')
+
+
+def arrancar_servidor(app, workers, hilos):
+    """Devuelve (url_base, nombre_servidor, parar). Usa gunicorn si está instalado."""
+    puerto = _puerto_libre()
+    base = f'http://127.0.0.1:{puerto}'
+    if importlib.util.find_spec('gunicorn') is not None:
+        # Los workers heredan el entorno preparado (misma BD, caché y cola que la fase en proceso)
+        proceso = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '--workers', str(workers), '--threads', str(hilos),
+             '--bind', f'127.0.0.1:{puerto}', '--log-level', 'warning', 'app.app:app'],
+            cwd=DIRECTORIO_BLOG_API, env=os.environ.copy(),
+        )
+        try:
+            _esperar_servidor(base, proceso)
+        except Exception:
+            proceso.kill()
+            raise
+
+        def parar():
+            proceso.terminate()
+            try:
+                proceso.wait(10)
+            except subprocess.TimeoutExpired:
+                proceso.kill()
+        return base, f'gunicorn ({workers} workers x {hilos} hilos)', parar
+
+    from werkzeug.serving import make_server
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    servidor = make_server('127.0.0.1', puerto, app, threaded=True)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    _esperar_servidor(base)
+    return base, 'werkzeug (hilos, gunicorn no instalado)', servidor.shutdown
+
+
+def comparar(actual, base, tolerancia, umbral_ms=UMBRAL_RUIDO_MS):
+    """Lista de regresiones de `actual` frente a `base` (p95, consultas y memoria por escenario)."""
+    regresiones = []
+    factor = 1 + tolerancia / 100
+    for nombre, escenario in actual['escenarios'].items():
+        anterior = base.get('escenarios', {}).get(nombre)
+        if anterior is None:
+            continue
+        for fase in ('proceso', 'http'):
+            a, b = escenario.get(fase), anterior.get(fase)
+            if not a or not b:
+                continue
+            if a['p95_ms'] is not None and b['p95_ms'] is not None and \
+                    a['p95_ms'] > b['p95_ms'] * factor and a['p95_ms'] - b['p95_ms'] > umbral_ms:
+                regresiones.append(f"{nombre} [{fase}]: p95 {b['p95_ms']} -> {a['p95_ms']} ms")
+            if fase == 'http' and b.get('throughput_por_s') and a['throughput_por_s'] * factor < b['throughput_por_s']:
+                regresiones.append(f"{nombre} [http]: throughput {b['throughput_por_s']} -> {a['throughput_por_s']}/s")
+            # El número de consultas es determinista: cualquier aumento es una regresión (p. ej. un N+1)
+            if a.get('consultas_max') is not None and b.get('consultas_max') is not None and \
+                    a['consultas_max'] > b['consultas_max']:
+                regresiones.append(f"{nombre} [{fase}]: consultas {b['consultas_max']} -> {a['consultas_max']}")
+            if a.get('memoria_pico_kib') and b.get('memoria_pico_kib') and \
+                    a['memoria_pico_kib'] > b['memoria_pico_kib'] * factor and a['memoria_pico_kib'] - b['memoria_pico_kib'] > 64:
+                regresiones.append(f"{nombre} [{fase}]: memoria {b['memoria_pico_kib']} -> {a['memoria_pico_kib']} KiB")
+    return regresiones
+
+
+def _tabla(resultado):
+    lineas = [f"{'escenario':<32} {'p50':>8} {'p95':>8} {'p99':>8} {'cons':>6} {'KiB':>8} {'http/s':>9}"]
+    for nombre, e in resultado['escenarios'].items():
+        p, h = e['proceso'], e.get('http') or {}
+        lineas.append(f"{nombre:<32} {p['p50_ms'] or '-':>8} {p['p95_ms'] or '-':>8} {p['p99_ms'] or '-':>8} "
+                      f"{p['consultas_max'] if p['consultas_max'] is not None else '-':>6} "
+                      f"{p['memoria_pico_kib'] if p['memoria_pico_kib'] is not None else '-':>8} "
+                      f"{h.get('throughput_por_s', '-'):>9}"
+                      + ('  !' if p['inesperados'] or h.get('inesperados') else ''))
+    return '\n'.join(lineas)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de todas las rutas de la API.')
+    parser.add_argument('--database-uri', help='por defecto, una SQLite temporal (con MySQL se insertan filas de prueba)')
+    parser.add_argument('--no-sembrar', action='store_true', help='usar los datos ya presentes en --database-uri')
+    anadir_argumentos_volumen(parser)
+    parser.add_argument('--iteraciones', type=int, default=50, help='peticiones medidas por escenario (en proceso)')
+    parser.add_argument('--calentamiento', type=int, default=3)
+    parser.add_argument('--iteraciones-memoria', type=int, default=3, help='peticiones bajo tracemalloc por escenario')
+    parser.add_argument('--sin-http', action='store_true', help='omitir la fase HTTP')
+    parser.add_argument('--duracion', type=float, default=3.0, help='segundos por escenario en la fase HTTP')
+    parser.add_argument('--concurrencia', type=int, default=8, help='clientes HTTP concurrentes')
+    parser.add_argument('--workers', type=int, default=2, help='workers de gunicorn')
+    parser.add_argument('--hilos-worker', type=int, default=4, help='hilos por worker de gunicorn')
+    parser.add_argument('--sin-cache', action='store_true', help='desactivar la caché de respuestas')
+    parser.add_argument('--rounds', type=int, default=4, help='BCRYPT_LOG_ROUNDS (bajo para no medir sólo bcrypt)')
+    parser.add_argument('--solo', help='sólo escenarios cuyo nombre contenga este texto')
+    parser.add_argument('--salida', help=f'fichero JSON de resultados (por defecto en {DIRECTORIO_RESULTADOS})')
+    parser.add_argument('--comparar', help='resultado JSON de referencia')
+    parser.add_argument('--tolerancia', type=float, default=20.0, help='porcentaje de empeoramiento admitido')
+    args = parser.parse_args()
+
+    directorio = tempfile.mkdtemp(prefix='bench_api_')
+    preparar_entorno(directorio, args.database_uri, BCRYPT_LOG_ROUNDS=args.rounds,
+                     RESPONSE_CACHE_ENABLED=not args.sin_cache)
+
+    from app.app import app
+    from app.models import db
+
+    volumen = leer_volumen(args)
+    with app.app_context():
+        db.create_all()
+        backend = db.engine.url.get_backend_name()
+        filas = None
+        if not args.no_sembrar:
+            inicio = time.perf_counter()
+            filas = generar(volumen, semilla=args.semilla)
+            print(f'Datos sembrados en {time.perf_counter() - inicio:.1f} s: {filas}', file=sys.stderr)
+
+    cliente = app.test_client()
+    n_objetivos = args.calentamiento + args.iteraciones + args.iteraciones_memoria
+    ctx = preparar_contexto(app, cliente, n_objetivos)
+    escenarios = construir_escenarios(ctx)
+    sin_cubrir = endpoints_sin_cubrir(app, escenarios)
+    for ruta in sin_cubrir:
+        print(f'AVISO: ruta sin escenario de benchmark: {ruta}', file=sys.stderr)
+    if args.solo:
+        escenarios = [e for e in escenarios if args.solo in e.nombre]
+
+    resultado = {
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit_actual(),
+        'parametros': {k: v for k, v in vars(args).items() if k not in ('comparar', 'salida')},
+        'base_datos': backend,
+        'filas': filas,
+        'rutas_sin_escenario': sin_cubrir,
+        'servidor_http': None,
+        'escenarios': {},
+    }
+
+    for escenario in escenarios:
+        print(f'[proceso] {escenario.nombre}', file=sys.stderr)
+        resultado['escenarios'][escenario.nombre] = {
+            'endpoint': escenario.endpoint,
+            'metodo': escenario.metodo,
+            'ruta': escenario.ruta_para(0),
+            'proceso': medir_en_proceso(cliente, escenario, ctx, args.calentamiento, args.iteraciones,
+                                        args.iteraciones_memoria),
+        }
+
+    if not args.sin_http:
+        base, servidor, parar = arrancar_servidor(app, args.workers, args.hilos_worker)
+        resultado['servidor_http'] = servidor
+        try:
+            for escenario in escenarios:
+                if not escenario.http:
+                    continue
+                print(f'[http] {escenario.nombre}', file=sys.stderr)
+                resultado['escenarios'][escenario.nombre]['http'] = medir_http(
+                    base, escenario, ctx, args.concurrencia, args.duracion)
+        finally:
+            parar()
+
+    salida = args.salida
+    if not salida:
+        os.makedirs(DIRECTORIO_RESULTADOS, exist_ok=True)
+        salida = os.path.join(DIRECTORIO_RESULTADOS,
+                              f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{resultado['commit'] or 'sin-commit'}.json")
+    with open(salida, 'w', encoding='utf-8') as f:
+        json.dump(resultado, f, indent=2, ensure_ascii=False)
+    print(_tabla(resultado))
+    print(f'Resultados en {salida}')
+
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as f:
+            regresiones = comparar(resultado, json.load(f), args.tolerancia)
+        if regresiones:
+            print(f'{len(regresiones)} regresiones (tolerancia {args.tolerancia}%):')
+            for regresion in regresiones:
+                print(f'  {regresion}')
+            sys.exit(1)
+        print('Sin regresiones respecto a la referencia.')
+
+
+if __name__ == '__main__':
+    main()
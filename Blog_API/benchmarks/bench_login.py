@@ -0,0 +1,115 @@
+# Blog_API/benchmarks/bench_login.py
+# Mide el throughput de /login y cuánto empeora la latencia de las lecturas públicas
+# mientras hay una ráfaga de logins en curso.
+#
+#   cd Blog_API && python -m benchmarks.bench_login --logins 40 --hilos 8 --rounds 12
+#
+# Levanta la app contra una SQLite temporal en un servidor WSGI con hilos y lanza peticiones HTTP reales.
+import argparse
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from .comun import resumen, peticion as peticion_http
+
+
+def peticion(url, datos=None):
+    latencia, status, _ = peticion_http(url, datos)
+    return latencia, status
+
+
+def medir_lecturas(base, duracion, hilos):
+    latencias = []
+    fin = time.monotonic() + duracion
+
+    def bucle():
+        while time.monotonic() < fin:
+            latencia, _ = peticion(f'{base}/categorias')
+            latencias.append(latencia)
+
+    with ThreadPoolExecutor(hilos) as pool:
+        for _ in range(hilos):
+            pool.submit(bucle)
+    return latencias
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de /login y de lecturas concurrentes.')
+    parser.add_argument('--logins', type=int, default=40, help='logins totales en la ráfaga')
+    parser.add_argument('--hilos', type=int, default=8, help='clientes concurrentes de login')
+    parser.add_argument('--lectores', type=int, default=2, help='clientes concurrentes de lectura')
+    parser.add_argument('--rounds', type=int, default=12, help='BCRYPT_LOG_ROUNDS')
+    parser.add_argument('--concurrencia', type=int, default=2, help='BCRYPT_MAX_CONCURRENCY')
+    args = parser.parse_args()
+
+    directorio = tempfile.mkdtemp(prefix='bench_login_')
+    os.environ['DATABASE_URI'] = f"sqlite:///{os.path.join(directorio, 'bench.db')}"
+    os.environ.setdefault('JWT_SECRET_KEY', 'benchmark-secret-key-benchmark-secret-key')
+    os.environ['BCRYPT_LOG_ROUNDS'] = str(args.rounds)
+    os.environ['BCRYPT_MAX_CONCURRENCY'] = str(args.concurrencia)
+    os.environ['BCRYPT_MAX_PENDING'] = str(args.logins)
+    os.environ['RESPONSE_CACHE_ENABLED'] = 'False'
+
+    from werkzeug.serving import make_server
+    from app.app import app
+    from app.models import db, Autor, Categoria
+
+    with app.app_context():
+        db.create_all()
+        autor = Autor(nombre='Bench', email='bench@example.com', is_admin=True)
+        autor.set_password('benchmark')
+        db.session.add(autor)
+        db.session.add_all([Categoria(nombre_es=f'Categoria {i}', slug=f'categoria-{i}') for i in range(20)])
+        db.session.commit()
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    servidor = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    base = f'http://127.0.0.1:{servidor.server_port}'
+
+    lecturas_en_reposo = medir_lecturas(base, 2.0, args.lectores)
+
+    lecturas_bajo_carga = []
+    parar = threading.Event()
+
+    def leer_en_bucle():
+        while not parar.is_set():
+            latencia, _ = peticion(f'{base}/categorias')
+            lecturas_bajo_carga.append(latencia)
+
+    lectores = [threading.Thread(target=leer_en_bucle) for _ in range(args.lectores)]
+    for hilo in lectores:
+        hilo.start()
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(args.hilos) as pool:
+        credenciales = [
+            {'email': 'bench@example.com', 'contrasena': 'benchmark'} if i % 4 else
+            {'email': f'desconocido{i}@example.com', 'contrasena': 'x'}
+            for i in range(args.logins)
+        ]
+        resultados_login = list(pool.map(lambda datos: peticion(f'{base}/login', datos), credenciales))
+    duracion = time.perf_counter() - inicio
+    parar.set()
+    for hilo in lectores:
+        hilo.join()
+    servidor.shutdown()
+
+    estados = {}
+    for _, status in resultados_login:
+        estados[status] = estados.get(status, 0) + 1
+    informe = {
+        'parametros': vars(args),
+        'login': dict(resumen([l for l, _ in resultados_login]),
+                      throughput_por_s=round(len(resultados_login) / duracion, 2), estados=estados),
+        'lecturas_en_reposo': resumen(lecturas_en_reposo),
+        'lecturas_durante_logins': resumen(lecturas_bajo_carga),
+    }
+    print(json.dumps(informe, indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+# Blog_API/benchmarks/bench_serializacion.py
+# Coste de serializar un listado de entradas, por cada 1000 entradas, con el camino antiguo
+# (instancias ORM + Entrada.serialize() + proveedor JSON de Flask) frente al nuevo
+# (tuplas Row + EsquemaFilas + ProveedorJSON con orjson), separando lectura, conversión a dict
+# y codificación JSON.
+#
+#   cd Blog_API && python -m benchmarks.bench_serializacion --entradas 5000 --repeticiones 5
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+
+
+def medir(fn, repeticiones):
+    tiempos = []
+    resultado = None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = fn()
+        tiempos.append(time.perf_counter() - inicio)
+    return statistics.median(tiempos), resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de serialización de entradas.')
+    parser.add_argument('--entradas', type=int, default=5000)
+    parser.add_argument('--repeticiones', type=int, default=5)
+    parser.add_argument('--fields', default='', help='proyección (?fields=); por defecto la de resumen')
+    args = parser.parse_args()
+
+    from .comun import preparar_entorno
+    preparar_entorno(tempfile.mkdtemp(prefix='bench_serializacion_'), BCRYPT_LOG_ROUNDS=4)
+
+    from flask.json.provider import DefaultJSONProvider
+    from app.app import app
+    from app.models import db, Entrada, CAMPOS_ENTRADA, CAMPOS_RESUMEN_ENTRADA
+    from app.serializacion import ProveedorJSON, esquema_de, orjson
+    from .datos import generar, VOLUMENES
+
+    campos = tuple(c for c in CAMPOS_ENTRADA if c in args.fields.split(',')) if args.fields else CAMPOS_RESUMEN_ENTRADA
+    volumen = dict(VOLUMENES['pequeno'], entradas=args.entradas)
+    proveedores = {'flask': DefaultJSONProvider(app), 'stdlib': ProveedorJSON(app)}
+    proveedores['stdlib'].usar_orjson = False
+    if orjson is not None:
+        proveedores['orjson'] = ProveedorJSON(app)
+
+    with app.app_context():
+        db.create_all()
+        generar(volumen)
+        n = db.session.query(Entrada).count()
+        esquema = esquema_de(Entrada, campos)
+
+        def leer_orm():
+            db.session.expunge_all()
+            return Entrada.query.options(*Entrada.opciones_carga(campos)).order_by(Entrada.id).all()
+
+        def leer_filas():
+            return esquema.consulta(Entrada.query.order_by(Entrada.id)).all()
+
+        t_orm, entradas = medir(leer_orm, args.repeticiones)
+        t_dict_orm, dicts_orm = medir(lambda: [e.serialize(campos) for e in entradas], args.repeticiones)
+        t_filas, filas = medir(leer_filas, args.repeticiones)
+        # La conversión incluye las consultas IN de las relaciones, que leer_orm hace con selectinload
+        t_dict_filas, dicts_filas = medir(lambda: esquema.serializar(filas), args.repeticiones)
+
+        codificacion = {}
+        for nombre, proveedor in proveedores.items():
+            datos = dicts_orm if nombre == 'flask' else dicts_filas
+            codificacion[nombre], _ = medir(lambda: proveedor.dumps(datos), args.repeticiones)
+
+        assert json.loads(proveedores['flask'].dumps(dicts_orm)) == json.loads(
+            proveedores['stdlib'].dumps(dicts_filas)), 'Las dos representaciones no coinciden'
+
+    por_mil = lambda t: round(t * 1000 * 1000 / n, 2)
+    rapido = 'orjson' if 'orjson' in codificacion else 'stdlib'
+    antes = t_orm + t_dict_orm + codificacion['flask']
+    despues = t_filas + t_dict_filas + codificacion[rapido]
+    print(json.dumps({
+        'entradas': n,
+        'campos': list(campos),
+        'ms_por_1000_entradas': {
+            'antes': {'lectura_orm': por_mil(t_orm), 'serialize': por_mil(t_dict_orm),
+                      'json_flask': por_mil(codificacion['flask']), 'total': por_mil(antes)},
+            'despues': {'lectura_filas': por_mil(t_filas), 'esquema': por_mil(t_dict_filas),
+                        f'json_{rapido}': por_mil(codificacion[rapido]), 'total': por_mil(despues)},
+            'json_stdlib_sin_orjson': por_mil(codificacion['stdlib']),
+        },
+        'aceleracion': round(antes / despues, 2),
+    }, indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+# Blog_API/benchmarks/comun.py
+# Utilidades compartidas por los benchmarks: estadísticas de latencia, peticiones HTTP y
+# preparación del entorno (variables de configuración) antes de importar la app.
+import json
+import os
+import statistics
+import subprocess
+import time
+import urllib.error
+import urllib.request
+
+# Configuración común: sin límite por IP en el formulario de contacto y con X-Query-Count
+ENTORNO_BENCHMARK = {
+    'JWT_SECRET_KEY': 'benchmark-secret-key-benchmark-secret-key',
+    'QUERY_COUNT_HEADER': 'True',
+    'CONTACT_RATE_BURST': '1000000',
+    'CONTACT_DEDUP_WINDOW': '0',
+    'SLOW_QUERY_THRESHOLD_MS': '',
+}
+
+
+def percentil(valores, p):
+    if not valores:
+        return None
+    ordenados = sorted(valores)
+    indice = min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))
+    return ordenados[indice]
+
+
+def resumen(latencias):
+    return {
+        'n': len(latencias),
+        'p50_ms': round(percentil(latencias, 50) * 1000, 2) if latencias else None,
+        'p95_ms': round(percentil(latencias, 95) * 1000, 2) if latencias else None,
+        'p99_ms': round(percentil(latencias, 99) * 1000, 2) if latencias else None,
+        'media_ms': round(statistics.mean(latencias) * 1000, 2) if latencias else None,
+    }
+
+
+def peticion(url, datos=None, metodo=None, cabeceras=None):
+    """Devuelve (latencia_s, status, cabeceras_respuesta)."""
+    cuerpo = json.dumps(datos).encode('utf-8') if datos is not None else None
+    req = urllib.request.Request(url, data=cuerpo, method=metodo,
+                                 headers=dict({'Content-Type': 'application/json'}, **(cabeceras or {})))
+    inicio = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req) as resp:
+            resp.read()
+            status, respuesta = resp.status, resp.headers
+    except urllib.error.HTTPError as e:
+        e.read()
+        status, respuesta = e.code, e.headers
+    return time.perf_counter() - inicio, status, respuesta
+
+
+def preparar_entorno(directorio, database_uri=None, **extra):
+    """Variables de entorno para una app de benchmark con todo su estado dentro de `directorio`."""
+    os.environ['DATABASE_URI'] = database_uri or f"sqlite:///{os.path.join(directorio, 'bench.db')}"
+    for clave, valor in ENTORNO_BENCHMARK.items():
+        os.environ.setdefault(clave, valor)
+    os.environ['CACHE_SQLITE_PATH'] = os.path.join(directorio, 'cache.sqlite3')
+    os.environ['CONTACT_QUEUE_PATH'] = os.path.join(directorio, 'cola_contacto.sqlite3')
+    os.environ['PROFILE_DIR'] = os.path.join(directorio, 'perfiles')
+    for clave, valor in extra.items():
+        os.environ[clave] = str(valor)
+
+
+def commit_actual():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
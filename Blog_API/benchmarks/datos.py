@@ -0,0 +1,181 @@
+# Blog_API/benchmarks/datos.py
+# Generador de datos sintéticos y reproducibles (misma semilla -> mismas filas) para benchmarks.
+# Crea autores, categorías, etiquetas, entradas con contenido en es/en/de, comentarios
+# (con hilos de respuestas) y mensajes de contacto, con INSERT en bloque.
+#
+#   cd Blog_API && python -m benchmarks.datos --database-uri sqlite:////tmp/blog.db --volumen mediano
+#   cd Blog_API && python -m benchmarks.datos --database-uri mysql+pymysql://... --entradas 50000
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+VOLUMENES = {
+    'pequeno': {'autores': 5, 'categorias': 8, 'etiquetas': 30, 'entradas': 500,
+                'comentarios_por_entrada': 3, 'mensajes': 200},
+    'mediano': {'autores': 20, 'categorias': 20, 'etiquetas': 200, 'entradas': 5000,
+                'comentarios_por_entrada': 5, 'mensajes': 2000},
+    'grande': {'autores': 100, 'categorias': 50, 'etiquetas': 1000, 'entradas': 50000,
+               'comentarios_por_entrada': 8, 'mensajes': 20000},
+}
+
+CONTRASENA_BENCHMARK = 'benchmark'
+EMAIL_ADMIN = 'admin@bench.example.com'
+LOTE_INSERT = 2000
+
+PALABRAS = {
+    'es': 'rendimiento consulta índice caché servidor página lectura escritura base datos red usuario '
+          'memoria proceso latencia carga artículo categoría etiqueta búsqueda ejemplo'.split(),
+    'en': 'performance query index cache server page read write database network user memory '
+          'process latency load article category tag search example'.split(),
+    'de': 'Leistung Abfrage Index Zwischenspeicher Server Seite Lesen Schreiben Datenbank Netzwerk '
+          'Benutzer Speicher Prozess Latenz Last Artikel Kategorie Schlagwort Suche Beispiel'.split(),
+}
+
+
+def _frase(rnd, idioma, n):
+    return ' '.join(rnd.choice(PALABRAS[idioma]) for _ in range(n)).capitalize()
+
+
+def _parrafos(rnd, idioma, n):
+    return '\n\n'.join(f'<p>{_frase(rnd, idioma, rnd.randint(40, 90))}.</p>' for _ in range(n))
+
+
+def _insertar(db, modelo, filas):
+    from sqlalchemy import insert
+    for inicio in range(0, len(filas), LOTE_INSERT):
+        db.session.execute(insert(modelo), filas[inicio:inicio + LOTE_INSERT])
+    db.session.commit()
+
+
+def generar(volumen, semilla=42, parrafos=4):
+    """
+    Puebla la base de datos de la app actual (requiere contexto de app y tablas creadas).
+    `volumen` es un dict como los de VOLUMENES. Devuelve el número de filas por tabla.
+    """
+    from app.models import db, Autor, Categoria, Etiqueta, Entrada, EntradaEtiqueta, Comentario, MensajeContacto
+    from app.contrasenas import generar_hash
+    from app.comentarios import recalcular_num_comentarios
+
+    rnd = random.Random(semilla)
+    ahora = datetime(2025, 1, 1)
+    # Un único hash para todos: bcrypt es deliberadamente lento
+    hash_contrasena = generar_hash(CONTRASENA_BENCHMARK)
+
+    autores = [{'nombre': 'Admin Bench', 'email': EMAIL_ADMIN, 'contrasena': hash_contrasena,
+                'is_admin': True, 'biografia': _frase(rnd, 'es', 20)}]
+    autores += [{'nombre': f'Autor {i}', 'email': f'autor{i}@bench.example.com', 'contrasena': hash_contrasena,
+                 'is_admin': False, 'biografia': _frase(rnd, 'es', 20)} for i in range(1, volumen['autores'])]
+    _insertar(db, Autor, autores)
+
+    _insertar(db, Categoria, [{'nombre_es': f'Categoría {i}', 'nombre_en': f'Category {i}',
+                               'nombre_de': f'Kategorie {i}', 'slug': f'categoria-{i}'}
+                              for i in range(volumen['categorias'])])
+    _insertar(db, Etiqueta, [{'nombre': f'etiqueta {i}', 'slug': f'etiqueta-{i}'} for i in range(volumen['etiquetas'])])
+
+    ids_autor = [i for (i,) in db.session.query(Autor.id)]
+    ids_categoria = [i for (i,) in db.session.query(Categoria.id)]
+    ids_etiqueta = [i for (i,) in db.session.query(Etiqueta.id)]
+
+    entradas = []
+    for i in range(volumen['entradas']):
+        publicada = rnd.random() < 0.85
+        creada = ahora - timedelta(minutes=rnd.randint(0, 60 * 24 * 730))
+        fila = {
+            'autor_id': rnd.choice(ids_autor), 'categoria_id': rnd.choice(ids_categoria),
+            'slug': f'entrada-{i}', 'estado': 'publicado' if publicada else 'borrador',
+            'fecha_creacion': creada, 'fecha_actualizacion': creada,
+            'fecha_publicacion': creada + timedelta(hours=1) if publicada else None,
+            'imagen_destacada': f'https://img.example.com/{i}.jpg' if i % 3 == 0 else None,
+        }
+        for idioma in ('es', 'en', 'de'):
+            fila[f'titulo_{idioma}'] = f'{_frase(rnd, idioma, 6)} {i}'
+            fila[f'resumen_{idioma}'] = _frase(rnd, idioma, 30)
+            fila[f'contenido_{idioma}'] = _parrafos(rnd, idioma, parrafos)
+        entradas.append(fila)
+    _insertar(db, Entrada, entradas)
+
+    ids_entrada = [i for (i,) in db.session.query(Entrada.id).order_by(Entrada.id)]
+    enlaces = set()
+    for entrada_id in ids_entrada:
+        for etiqueta_id in rnd.sample(ids_etiqueta, min(len(ids_etiqueta), rnd.randint(0, 4))):
+            enlaces.add((entrada_id, etiqueta_id))
+    _insertar(db, EntradaEtiqueta, [{'entrada_id': e, 'etiqueta_id': t} for e, t in sorted(enlaces)])
+
+    # Comentarios raíz primero y respuestas después, para poder apuntar a sus ids
+    raices = []
+    estados = ('APROBADO', 'APROBADO', 'APROBADO', 'PENDIENTE', 'SPAM')
+    for entrada_id in ids_entrada:
+        for _ in range(rnd.randint(0, volumen['comentarios_por_entrada'])):
+            raices.append({'entrada_id': entrada_id, 'nombre_autor': f'Lector {rnd.randint(1, 999)}',
+                           'email_autor': f'lector{rnd.randint(1, 999)}@example.com',
+                           'contenido': _frase(rnd, 'es', rnd.randint(8, 40)), 'estado': rnd.choice(estados),
+                           'fecha_creacion': ahora - timedelta(minutes=rnd.randint(0, 60 * 24 * 365))})
+    _insertar(db, Comentario, raices)
+    respuestas = []
+    for comentario_id, entrada_id in db.session.query(Comentario.id, Comentario.entrada_id):
+        if rnd.random() < 0.3:
+            respuestas.append({'entrada_id': entrada_id, 'comentario_padre_id': comentario_id,
+                               'nombre_autor': f'Lector {rnd.randint(1, 999)}', 'email_autor': 'respuesta@example.com',
+                               'contenido': _frase(rnd, 'es', rnd.randint(5, 25)), 'estado': 'APROBADO',
+                               'fecha_creacion': ahora})
+    _insertar(db, Comentario, respuestas)
+    recalcular_num_comentarios()
+    db.session.commit()
+
+    _insertar(db, MensajeContacto, [{
+        'nombre_remitente': f'Visitante {i}', 'email_remitente': f'visitante{i}@example.com',
+        'asunto': _frase(rnd, 'es', 5), 'mensaje': _frase(rnd, 'es', rnd.randint(20, 80)),
+        'leido': rnd.random() < 0.5, 'fecha_envio': ahora - timedelta(minutes=i),
+    } for i in range(volumen['mensajes'])])
+
+    return {
+        'autores': len(autores), 'categorias': len(ids_categoria), 'etiquetas': len(ids_etiqueta),
+        'entradas': len(ids_entrada), 'entradas_etiquetas': len(enlaces),
+        'comentarios': len(raices) + len(respuestas), 'mensajes_contacto': volumen['mensajes'],
+    }
+
+
+def leer_volumen(args):
+    volumen = dict(VOLUMENES[args.volumen])
+    for clave in volumen:
+        valor = getattr(args, clave, None)
+        if valor is not None:
+            volumen[clave] = valor
+    return volumen
+
+
+def anadir_argumentos_volumen(parser):
+    parser.add_argument('--volumen', choices=sorted(VOLUMENES), default='pequeno', help='preset de volumen')
+    for clave in VOLUMENES['pequeno']:
+        parser.add_argument(f"--{clave.replace('_', '-')}", dest=clave, type=int, default=None,
+                            help=f'sobrescribe {clave} del preset')
+    parser.add_argument('--semilla', type=int, default=42)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Puebla una base de datos con datos sintéticos.')
+    parser.add_argument('--database-uri', help='por defecto, una SQLite temporal')
+    anadir_argumentos_volumen(parser)
+    args = parser.parse_args()
+
+    if args.database_uri:
+        os.environ['DATABASE_URI'] = args.database_uri
+    else:
+        os.environ['DATABASE_URI'] = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='blog_datos_'), 'blog.db')}"
+    os.environ.setdefault('JWT_SECRET_KEY', 'benchmark-secret-key-benchmark-secret-key')
+    os.environ.setdefault('BCRYPT_LOG_ROUNDS', '4')
+
+    from app.app import app
+    from app.models import db
+    with app.app_context():
+        db.create_all()
+        inicio = time.perf_counter()
+        filas = generar(leer_volumen(args), semilla=args.semilla)
+    print(f"{os.environ['DATABASE_URI']}: {filas} en {time.perf_counter() - inicio:.1f} s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+# Blog_API/tests/conftest.py
+# Cada prueba crea su propia app (create_app lee la configuración del entorno) sobre una SQLite
+# temporal, poblada con el mismo generador que los benchmarks.
+#
+#   cd Blog_API && python -m pytest -q
+import os
+import sys
+import tempfile
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+# app/app.py crea una app al importarse: necesita un entorno válido antes del primer import
+_TEMPORAL = tempfile.mkdtemp(prefix='blog_pruebas_')
+ENTORNO_BASE = {
+    'DATABASE_URI': f"sqlite:///{os.path.join(_TEMPORAL, 'import.db')}",
+    'JWT_SECRET_KEY': 'pruebas-secret-key-pruebas-secret-key',
+    'BCRYPT_LOG_ROUNDS': '4',
+    'RESPONSE_CACHE_ENABLED': 'False',
+    'CONTACT_QUEUE_ENABLED': 'False',
+    'PROFILER_ENABLED': 'False',
+    'CHANGES_FEED_LAG_SECONDS': '0',
+    'SEARCH_SYNC_INTERVAL': '0',
+}
+for clave, valor in ENTORNO_BASE.items():
+    os.environ.setdefault(clave, valor)
+
+VOLUMEN_PRUEBAS = {'autores': 3, 'categorias': 3, 'etiquetas': 10, 'entradas': 20,
+                   'comentarios_por_entrada': 3, 'mensajes': 5}
+
+
+@pytest.fixture
+def crear_app(tmp_path, monkeypatch):
+    """Fábrica de apps: crear_app(VARIABLE='valor', ...) sobre una SQLite de tmp_path."""
+    def crear(**entorno):
+        valores = dict(ENTORNO_BASE, DATABASE_URI=f"sqlite:///{tmp_path / 'blog.db'}",
+                       CACHE_SQLITE_PATH=str(tmp_path / 'cache.sqlite3'), PROFILE_DIR=str(tmp_path / 'perfiles'),
+                       SNAPSHOT_JOURNAL_PATH=str(tmp_path / 'snapshot.ndjson'))
+        valores.update(entorno)
+        for clave, valor in valores.items():
+            monkeypatch.setenv(clave, valor)
+        from app.app import create_app
+        return create_app()
+    return crear
+
+
+def poblar(app, **volumen):
+    """Crea las tablas y las llena con datos sintéticos (benchmarks/datos.py)."""
+    from app.models import db
+    from benchmarks.datos import generar
+    with app.app_context():
+        db.create_all()
+        return generar(dict(VOLUMEN_PRUEBAS, **volumen))
+
+
+@pytest.fixture
+def app(crear_app):
+    app = crear_app()
+    poblar(app)
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def cabeceras_admin(client):
+    from benchmarks.datos import EMAIL_ADMIN, CONTRASENA_BENCHMARK
+    token = client.post('/login', json={'email': EMAIL_ADMIN, 'contrasena': CONTRASENA_BENCHMARK}).get_json()['access_token']
+    return {'Authorization': f'Bearer {token}'}
@@ -0,0 +1,94 @@
+# Blog_API/tests/test_busqueda.py
+# Búsqueda en memoria (SQLite): sincronización incremental con altas, bajas y el slug.
+from app.models import Autor, Categoria
+from conftest import poblar
+
+
+def _crear(client, cabeceras_admin, app, titulo, slug=None):
+    with app.app_context():
+        datos = {'autor_id': Autor.query.first().id, 'categoria_id': Categoria.query.first().id,
+                 'titulo_es': titulo, 'resumen_es': 'resumen', 'contenido_es': 'contenido', 'estado': 'borrador'}
+    if slug:
+        datos['slug'] = slug
+    response = client.post('/admin/entradas', json=datos, headers=cabeceras_admin)
+    assert response.status_code == 201, response.get_data(as_text=True)
+    return response.get_json()['id']
+
+
+def _ids(client, q):
+    response = client.get('/admin/entradas', query_string={'q': q, 'fields': 'id'})
+    assert response.status_code == 200
+    return [e['id'] for e in response.get_json()['entradas']]
+
+
+def test_baja_y_alta_entre_busquedas(client, cabeceras_admin, app):
+    borrada = _crear(client, cabeceras_admin, app, 'Ornitorrinco azul')
+    assert _ids(client, 'ornitorrinco') == [borrada]
+    # Una baja y una alta entre dos búsquedas no cambian el número de filas
+    assert client.delete(f'/admin/entradas/{borrada}', headers=cabeceras_admin).status_code == 200
+    nueva = _crear(client, cabeceras_admin, app, 'Ornitorrinco verde')
+    assert _ids(client, 'ornitorrinco') == [nueva]
+
+
+def test_busca_por_slug(client, cabeceras_admin, app):
+    entrada = _crear(client, cabeceras_admin, app, 'Sin relación', slug='guia-kubernetes')
+    assert _ids(client, 'kubernetes') == [entrada]
+
+
+def test_sincronizacion_acotada(crear_app):
+    from benchmarks.datos import EMAIL_ADMIN, CONTRASENA_BENCHMARK
+    app = crear_app(SEARCH_SYNC_INTERVAL='3600')
+    poblar(app)
+    client = app.test_client()
+    token = client.post('/login', json={'email': EMAIL_ADMIN, 'contrasena': CONTRASENA_BENCHMARK}).get_json()['access_token']
+    assert _ids(client, 'ornitorrinco') == []
+    _crear(client, {'Authorization': f'Bearer {token}'}, app, 'Ornitorrinco')
+    # Dentro del intervalo no se vuelve a leer la tabla
+    assert _ids(client, 'ornitorrinco') == []
+
+
+def test_sin_fulltext_usa_memoria(crear_app):
+    from app.busqueda import obtener_motor_busqueda
+    app = crear_app(SEARCH_BACKEND='mysql')
+    poblar(app, entradas=1)
+    with app.app_context():
+        assert obtener_motor_busqueda().nombre == 'memoria'
+
+
+def _publicar(client, cabeceras, entrada_id, estado):
+    response = client.put(f'/admin/entradas/{entrada_id}', json={'estado': estado}, headers=cabeceras)
+    assert response.status_code == 200, response.get_data(as_text=True)
+
+
+def test_buscar_no_devuelve_borradores_con_indice_atrasado(crear_app):
+    from benchmarks.datos import EMAIL_ADMIN, CONTRASENA_BENCHMARK
+    app = crear_app(SEARCH_SYNC_INTERVAL='3600')
+    poblar(app)
+    client = app.test_client()
+    token = client.post('/login', json={'email': EMAIL_ADMIN, 'contrasena': CONTRASENA_BENCHMARK}).get_json()['access_token']
+    cabeceras = {'Authorization': f'Bearer {token}'}
+    entrada = _crear(client, cabeceras, app, 'Ornitorrinco publicado')
+    _publicar(client, cabeceras, entrada, 'publicado')
+    resultados = client.get('/buscar', query_string={'q': 'ornitorrinco'}).get_json()['resultados']
+    assert [r['id'] for r in resultados] == [entrada]
+    # El índice no se resincroniza hasta dentro de una hora: la fila decide
+    _publicar(client, cabeceras, entrada, 'borrador')
+    assert client.get('/buscar', query_string={'q': 'ornitorrinco'}).get_json()['resultados'] == []
+
+
+def test_sincronizacion_relee_el_retraso(app):
+    from datetime import timedelta
+    from app.busqueda import IndiceInvertido
+    from app.models import db, Entrada
+    with app.app_context():
+        indice = IndiceInvertido(intervalo=0, retraso=2)
+        indice.sincronizar()
+        marca = indice._marca
+        entrada = Entrada.query.filter(Entrada.estado == 'publicado').first()
+        assert indice._documentos[entrada.id][1]
+        # Fila con fecha del flush anterior a la marca pero confirmada después de la sincronización
+        db.session.query(Entrada).filter(Entrada.id == entrada.id).update(
+            {'estado': 'borrador', 'fecha_actualizacion': marca - timedelta(seconds=1)}, synchronize_session=False)
+        db.session.commit()
+        indice.sincronizar()
+        assert not indice._documentos[entrada.id][1]
@@ -0,0 +1,219 @@
+# Blog_API/tests/test_cache_backends.py
+# Backends compartidos de la caché de respuestas: CacheRedis contra un servidor RESP falso sobre un
+# socket real y CacheSQLite con caducidad e invalidación desde otro proceso.
+import socket
+import socketserver
+import subprocess
+import sys
+import threading
+import pytest
+from app.cache_backends import ClienteRESP, CacheRedis, CacheSQLite, ErrorRESP
+from conftest import RAIZ, poblar
+
+
+class ServidorRESP(socketserver.ThreadingTCPServer):
+    """Sustituto de Redis con los comandos que usa CacheRedis (sin caducidad)."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), ManejadorRESP)
+        self.datos = {}
+        self.conexiones = 0
+        self._sockets = []
+        self._lock = threading.Lock()
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    @property
+    def url(self):
+        return f"redis://127.0.0.1:{self.server_address[1]}/0"
+
+    def cortar(self):
+        """Cierra las conexiones abiertas, como un servidor que reinicia o expulsa clientes ociosos."""
+        with self._lock:
+            for sock in self._sockets:
+                try:
+                    sock.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+            self._sockets.clear()
+
+    def parar(self):
+        self.cortar()
+        self.shutdown()
+        self.server_close()
+
+
+class ManejadorRESP(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        with self.server._lock:
+            self.server.conexiones += 1
+            self.server._sockets.append(self.connection)
+        try:
+            while True:
+                comando = self._leer_comando()
+                if comando is None:
+                    return
+                self.wfile.write(self._ejecutar(comando[0].upper().decode(), comando[1:]))
+        except OSError:
+            return
+        finally:
+            with self.server._lock:
+                if self.connection in self.server._sockets:
+                    self.server._sockets.remove(self.connection)
+
+    def _leer_comando(self):
+        linea = self.rfile.readline()
+        if not linea:
+            return None
+        partes = []
+        for _ in range(int(linea[1:-2])):
+            longitud = int(self.rfile.readline()[1:-2])
+            partes.append(self.rfile.read(longitud + 2)[:-2])
+        return partes
+
+    def _ejecutar(self, nombre, args):
+        datos = self.server.datos
+        if nombre in ('AUTH', 'SELECT'):
+            return b'+OK\r\n'
+        if nombre == 'GET':
+            valor = datos.get(args[0])
+            return b'$-1\r\n' if valor is None else b'$%d\r\n%s\r\n' % (len(valor), valor)
+        if nombre == 'SET':
+            if b'NX' in args[2:] and args[0] in datos:
+                return b'$-1\r\n'
+            datos[args[0]] = args[1]
+            return b'+OK\r\n'
+        if nombre == 'SADD':
+            miembros = datos.setdefault(args[0], set())
+            nuevos = set(args[1:]) - miembros
+            miembros.update(nuevos)
+            return b':%d\r\n' % len(nuevos)
+        if nombre == 'PEXPIRE':
+            return b':1\r\n'
+        if nombre == 'SMEMBERS':
+            miembros = sorted(datos.get(args[0], ()))
+            return b'*%d\r\n' % len(miembros) + b''.join(b'$%d\r\n%s\r\n' % (len(m), m) for m in miembros)
+        if nombre == 'DEL':
+            return b':%d\r\n' % sum(datos.pop(clave, None) is not None for clave in args)
+        if nombre == 'SCAN':
+            patron = args[2].rstrip(b'*')
+            claves = [c for c in datos if c.startswith(patron)]
+            return b'*2\r\n$1\r\n0\r\n*%d\r\n' % len(claves) + b''.join(b'$%d\r\n%s\r\n' % (len(c), c) for c in claves)
+        return b'-ERR unknown command \'%s\'\r\n' % nombre.encode()
+
+
+@pytest.fixture
+def servidor():
+    servidor = ServidorRESP()
+    yield servidor
+    servidor.parar()
+
+
+def _puerto_cerrado():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def test_respuestas_resp(servidor):
+    cliente = ClienteRESP.desde_url(servidor.url)
+    assert cliente.execute('SET', 'a', b'1\r\n2') == 'OK'
+    assert cliente.execute('GET', 'a') == b'1\r\n2'
+    assert cliente.execute('GET', 'nada') is None
+    assert cliente.execute('SADD', 's', 'x', 'y') == 2
+    assert cliente.execute('SMEMBERS', 's') == [b'x', b'y']
+    assert cliente.execute('SCAN', 0, 'MATCH', 'a*', 'COUNT', 10) == [b'0', [b'a']]
+    with pytest.raises(ErrorRESP, match='unknown command'):
+        cliente.execute('FLUSHALL')
+    # Tras un error la conexión sigue sincronizada
+    assert cliente.execute('GET', 'a') == b'1\r\n2'
+    assert servidor.conexiones == 1
+
+
+def test_reconecta_tras_cortar_el_socket(servidor):
+    cliente = ClienteRESP.desde_url(servidor.url)
+    cliente.execute('SET', 'a', '1')
+    servidor.cortar()
+    assert cliente.execute('GET', 'a') == b'1'
+    assert servidor.conexiones == 2
+
+
+def test_servidor_caido():
+    cliente = ClienteRESP('127.0.0.1', _puerto_cerrado(), timeout=0.5)
+    with pytest.raises(OSError):
+        cliente.execute('GET', 'a')
+
+
+def test_cache_redis(servidor):
+    cache = CacheRedis(ClienteRESP.desde_url(servidor.url), ttl=60)
+    cache.set('/entradas?', b'cuerpo', ('entradas', 'categorias'))
+    cache.set('/autores?', b'autores', ('autor',))
+    assert cache.get('/entradas?') == b'cuerpo'
+    cache.invalidar('categorias')
+    assert cache.get('/entradas?') is None
+    assert cache.get('/autores?') == b'autores'
+    assert cache.bloquear('k', 10) and not cache.bloquear('k', 10)
+    cache.liberar('k')
+    assert cache.bloquear('k', 10)
+    cache.limpiar()
+    assert servidor.datos == {}
+    assert cache.estadisticas()['invalidaciones'] == 1
+
+
+def test_app_sin_redis_sirve_sin_cache(crear_app):
+    app = crear_app(RESPONSE_CACHE_ENABLED='True', CACHE_BACKEND='redis',
+                    CACHE_REDIS_URL=f"redis://127.0.0.1:{_puerto_cerrado()}/0")
+    poblar(app)
+    client = app.test_client()
+    for _ in range(2):
+        response = client.get('/categorias')
+        assert response.status_code == 200
+        assert 'X-Cache' not in response.headers
+
+
+def test_app_con_redis(crear_app, servidor):
+    app = crear_app(RESPONSE_CACHE_ENABLED='True', CACHE_BACKEND='redis', CACHE_REDIS_URL=servidor.url)
+    poblar(app)
+    client = app.test_client()
+    assert client.get('/categorias').headers['X-Cache'] == 'MISS'
+    assert client.get('/categorias').headers['X-Cache'] == 'HIT'
+    # Redis se cae a mitad de servicio: las peticiones siguen respondiéndose desde la BD
+    servidor.parar()
+    response = client.get('/categorias')
+    assert response.status_code == 200
+    assert 'X-Cache' not in response.headers
+
+
+def test_sqlite_caducidad(tmp_path, monkeypatch):
+    ahora = [1000.0]
+    monkeypatch.setattr('app.cache_backends.time.time', lambda: ahora[0])
+    cache = CacheSQLite(str(tmp_path / 'cache.sqlite3'), ttl=60)
+    cache.set('a', b'1', ('entradas',))
+    ahora[0] += 59
+    assert cache.get('a') == b'1'
+    ahora[0] += 2
+    assert cache.get('a') is None
+    assert cache.caducadas == 1
+    assert cache.num_entradas() == 0
+
+
+def test_sqlite_invalidacion_entre_procesos(tmp_path):
+    ruta = str(tmp_path / 'cache.sqlite3')
+    cache = CacheSQLite(ruta, ttl=60)
+    cache.set('/entradas?', b'entradas', ('entradas',))
+    cache.set('/autores?', b'autores', ('autor',))
+    assert cache.get('/entradas?') == b'entradas'
+    # Otro worker (otro proceso) confirma una escritura en entradas y guarda su propia respuesta
+    codigo = (
+        "from app.cache_backends import CacheSQLite\n"
+        f"cache = CacheSQLite({ruta!r}, ttl=60)\n"
+        "cache.invalidar('entradas')\n"
+        "cache.set('/categorias?', b'categorias', ('categorias',))\n"
+    )
+    subprocess.run([sys.executable, '-c', codigo], cwd=RAIZ, check=True)
+    assert cache.get('/entradas?') is None
+    assert cache.get('/autores?') == b'autores'
+    assert cache.get('/categorias?') == b'categorias'
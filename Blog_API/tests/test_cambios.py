@@ -0,0 +1,47 @@
+# Blog_API/tests/test_cambios.py
+# Feed de cambios: el token avanza, sólo devuelve lo posterior y las bajas llegan como lápidas.
+# conftest fija CHANGES_FEED_LAG_SECONDS=0 para ver los cambios en cuanto se confirman.
+from app.models import Autor, Categoria
+
+
+def _cambios(client, **args):
+    response = client.get('/entradas/cambios', query_string=dict({'limit': 100, 'fields': 'id,slug'}, **args))
+    assert response.status_code == 200, response.get_data(as_text=True)
+    assert response.headers['Cache-Control'] == 'no-store'
+    return response.get_json()
+
+
+def test_sincronizacion_inicial_por_paginas(client):
+    vistos, token = [], None
+    while True:
+        pagina = _cambios(client, limit=7, **({'since': token} if token else {}))
+        vistos += [c['entrada']['id'] for c in pagina['cambios']]
+        assert pagina['next_since'] != token
+        token = pagina['next_since']
+        if not pagina['has_more']:
+            break
+    assert sorted(vistos) == list(range(1, 21))
+    assert _cambios(client, since=token)['cambios'] == []
+
+
+def test_modificacion_y_lapida(client, cabeceras_admin, app):
+    token = _cambios(client)['next_since']
+    with app.app_context():
+        referencias = {'autor_id': Autor.query.first().id, 'categoria_id': Categoria.query.first().id}
+    creada = client.post('/admin/entradas', headers=cabeceras_admin, json=dict(
+        referencias, titulo_es='Efímera', resumen_es='r', contenido_es='c', slug='efimera')).get_json()['id']
+    assert client.put('/admin/entradas/3', json={'resumen_es': 'Nuevo resumen'}, headers=cabeceras_admin).status_code == 200
+    assert client.delete(f'/admin/entradas/{creada}', headers=cabeceras_admin).status_code == 200
+
+    # El alta ya no existe: sólo queda su lápida, detrás de la modificación
+    pagina = _cambios(client, since=token)
+    assert [(c['tipo'], c.get('entrada', c).get('id')) for c in pagina['cambios']] == [('actualizada', 3), ('eliminada', creada)]
+    lapida = pagina['cambios'][1]
+    assert lapida['slug'] == 'efimera' and lapida['fecha_eliminacion']
+    # El token devuelto avanza por detrás de ambos cambios
+    assert _cambios(client, since=pagina['next_since'])['cambios'] == []
+
+
+def test_token_invalido(client):
+    response = client.get('/entradas/cambios', query_string={'since': 'no-es-un-token'})
+    assert response.status_code == 400
@@ -0,0 +1,49 @@
+# Blog_API/tests/test_cola_contacto.py
+# Cola write-behind de /mensajecontacto: reanudación tras un reinicio y límite por IP detrás de proxies.
+import json
+import sqlite3
+import time
+from app.models import db, MensajeContacto
+from conftest import poblar
+
+MENSAJE = {'nombre_remitente': 'Ana', 'email_remitente': 'ana@example.com', 'asunto': 'Hola', 'mensaje': 'Texto'}
+
+
+def _app_con_cola(crear_app, tmp_path, **entorno):
+    app = crear_app(CONTACT_QUEUE_ENABLED='True', CONTACT_QUEUE_PATH=str(tmp_path / 'cola.sqlite3'),
+                    CONTACT_FLUSH_INTERVAL='0.05', **entorno)
+    poblar(app, mensajes=0)
+    return app
+
+
+def test_vuelca_lo_pendiente_tras_reiniciar(crear_app, tmp_path):
+    app = _app_con_cola(crear_app, tmp_path)
+    # Mensajes que dejó en la cola un proceso anterior
+    with sqlite3.connect(str(tmp_path / 'cola.sqlite3')) as conn:
+        conn.executemany("INSERT INTO pendientes (datos, recibido) VALUES (?, ?)",
+                         [(json.dumps(dict(MENSAJE, asunto=f'Hola {i}')), time.time()) for i in range(3)])
+    assert app.test_client().get('/categorias').status_code == 200
+    limite = time.monotonic() + 5
+    with app.app_context():
+        while MensajeContacto.query.count() < 3 and time.monotonic() < limite:
+            time.sleep(0.05)
+            db.session.remove()
+        assert MensajeContacto.query.count() == 3
+
+
+def _enviar(client, ip, n):
+    return client.post('/mensajecontacto', json=dict(MENSAJE, mensaje=f'Texto {n}'),
+                       headers={'X-Forwarded-For': ip}).status_code
+
+
+def test_limite_por_ip_detras_de_proxy(crear_app, tmp_path):
+    client = _app_con_cola(crear_app, tmp_path, CONTACT_RATE_BURST='1', PROXY_FIX_HOPS='1').test_client()
+    assert _enviar(client, '203.0.113.1', 1) == 202
+    assert _enviar(client, '203.0.113.2', 2) == 202
+    assert _enviar(client, '203.0.113.1', 3) == 429
+
+
+def test_sin_proxy_ignora_x_forwarded_for(crear_app, tmp_path):
+    client = _app_con_cola(crear_app, tmp_path, CONTACT_RATE_BURST='1').test_client()
+    assert _enviar(client, '203.0.113.1', 1) == 202
+    assert _enviar(client, '203.0.113.2', 2) == 429
@@ -0,0 +1,60 @@
+# Blog_API/tests/test_consultas.py
+# Regresiones N+1: el número de consultas de los listados públicos no depende del número de filas.
+import pytest
+from app.consultas import ContadorConsultas
+from conftest import poblar
+
+# Página + etiquetas (única relación del resumen); el ETag sale de las filas de la página
+CONSULTAS_LISTADO = 2
+# Lo mismo con comentarios y etiquetas: una consulta IN por relación
+CONSULTAS_LISTADO_RELACIONES = 3
+# Validadores + huella de las relaciones + entrada con sus cuerpos + comentarios + etiquetas
+CONSULTAS_DETALLE = 5
+# Categoría + página + etiquetas
+CONSULTAS_FEED_CATEGORIA = 3
+
+
+@pytest.fixture(params=[10, 60], ids=lambda n: f'{n}_entradas')
+def client(request, crear_app):
+    app = crear_app()
+    poblar(app, entradas=request.param)
+    return app.test_client()
+
+
+def _contar(client, url):
+    with ContadorConsultas() as contador:
+        response = client.get(url)
+    assert response.status_code == 200, response.get_data(as_text=True)
+    return response, contador.total
+
+
+def test_listado_entradas(client):
+    response, total = _contar(client, '/entradas?limit=100')
+    assert response.get_json()
+    assert total == CONSULTAS_LISTADO
+
+
+def test_listado_entradas_con_relaciones(client):
+    response, total = _contar(client, '/entradas?limit=100&fields=id,comentarios,etiquetas')
+    assert response.get_json()
+    assert total == CONSULTAS_LISTADO_RELACIONES
+
+
+def test_entrada_por_slug(client):
+    response, total = _contar(client, '/entradas?slug=entrada-1')
+    assert response.get_json()['slug'] == 'entrada-1'
+    assert total == CONSULTAS_DETALLE
+
+
+def test_feed_de_categoria(client):
+    response, total = _contar(client, '/categorias/categoria-1/entradas?limit=100')
+    assert response.get_json()['entradas']
+    assert total == CONSULTAS_FEED_CATEGORIA
+
+
+def test_contador_con_maximo(app):
+    from app.models import db, Autor
+    with app.app_context():
+        with pytest.raises(AssertionError, match='como máximo 0 consultas'):
+            with ContadorConsultas(maximo=0):
+                db.session.query(Autor.id).first()
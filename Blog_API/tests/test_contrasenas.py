@@ -0,0 +1,55 @@
+# Blog_API/tests/test_contrasenas.py
+# EjecutorHash: un hash que no termina a tiempo responde SaturacionHash y conserva su plaza
+# mientras el hilo sigue ocupado.
+import threading
+import time
+import pytest
+from app.contrasenas import EjecutorHash, SaturacionHash
+
+
+def _plazas_libres(ejecutor, esperadas, plazo=2.0):
+    limite = time.monotonic() + plazo
+    while ejecutor._plazas._value != esperadas and time.monotonic() < limite:
+        time.sleep(0.01)
+    return ejecutor._plazas._value
+
+
+def test_timeout_es_saturacion():
+    ejecutor = EjecutorHash(max_concurrencia=1, max_pendientes=1, timeout=0.05)
+    continuar = threading.Event()
+    # En marcha: agota el plazo pero sigue ocupando el único hilo
+    with pytest.raises(SaturacionHash):
+        ejecutor.ejecutar(continuar.wait)
+    assert _plazas_libres(ejecutor, 1) == 1
+    # En cola detrás de la anterior: se cancela y devuelve su plaza
+    with pytest.raises(SaturacionHash):
+        ejecutor.ejecutar(lambda: 'nunca')
+    assert _plazas_libres(ejecutor, 1) == 1
+    continuar.set()
+    assert _plazas_libres(ejecutor, 2) == 2
+    assert ejecutor.ejecutar(lambda: 'hecho') == 'hecho'
+
+
+def test_sin_plazas():
+    ejecutor = EjecutorHash(max_concurrencia=1, max_pendientes=0, timeout=1)
+    continuar = threading.Event()
+    hilo = threading.Thread(target=ejecutor.ejecutar, args=(continuar.wait,))
+    hilo.start()
+    assert _plazas_libres(ejecutor, 0) == 0
+    with pytest.raises(SaturacionHash):
+        ejecutor.ejecutar(lambda: None)
+    continuar.set()
+    hilo.join()
+    assert _plazas_libres(ejecutor, 1) == 1
+
+
+def test_login_responde_503_si_el_hash_tarda(client, monkeypatch):
+    from benchmarks.datos import EMAIL_ADMIN, CONTRASENA_BENCHMARK
+    from app.contrasenas import obtener_ejecutor
+    with client.application.app_context():
+        ejecutor = obtener_ejecutor()
+    ejecutor.timeout = 0.01
+    monkeypatch.setattr('app.app.bcrypt.check_password_hash', lambda *args: time.sleep(0.2) or True)
+    response = client.post('/login', json={'email': EMAIL_ADMIN, 'contrasena': CONTRASENA_BENCHMARK})
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
@@ -0,0 +1,78 @@
+# Blog_API/tests/test_esquema.py
+# flask actualizar-esquema sobre una base creada con una versión anterior de los modelos.
+from sqlalchemy import inspect
+from sqlalchemy import func
+from app.models import db, Autor, Entrada, Comentario
+from conftest import poblar
+
+# Lo que una base anterior no tiene: se borra de una base recién creada y poblada
+ANTIGUO = (
+    'DROP INDEX ix_entradas_fecha_id',
+    'DROP TABLE entradas_eliminadas',
+    'ALTER TABLE autor DROP COLUMN token_version',
+    'ALTER TABLE autor DROP COLUMN fecha_actualizacion',
+    'ALTER TABLE categorias DROP COLUMN fecha_actualizacion',
+    'ALTER TABLE entradas DROP COLUMN num_comentarios',
+    'DROP INDEX ix_comentarios_entrada_estado_padre_id',
+)
+
+
+def _base_antigua(crear_app):
+    app = crear_app()
+    poblar(app, entradas=5)
+    with app.app_context(), db.engine.begin() as conexion:
+        for sentencia in ANTIGUO:
+            conexion.exec_driver_sql(sentencia)
+    return app
+
+
+def test_sql_pendiente(crear_app):
+    app = _base_antigua(crear_app)
+    salida = app.test_cli_runner().invoke(args=['actualizar-esquema', '--sql']).output
+    assert 'ALTER TABLE autor ADD COLUMN fecha_actualizacion' in salida
+    assert 'CREATE INDEX ix_entradas_fecha_id' in salida
+    assert 'CREATE TABLE entradas_eliminadas' in salida
+    # Sin ejecutar nada
+    with app.app_context():
+        assert 'fecha_actualizacion' not in {c['name'] for c in inspect(db.engine).get_columns('autor')}
+
+
+def test_actualiza_y_rellena(crear_app):
+    app = _base_antigua(crear_app)
+    runner = app.test_cli_runner()
+    resultado = runner.invoke(args=['actualizar-esquema'])
+    assert resultado.exit_code == 0, resultado.output
+    assert 'columna autor.fecha_actualizacion' in resultado.output
+    with app.app_context():
+        inspector = inspect(db.engine)
+        assert 'ix_entradas_fecha_id' in {i['name'] for i in inspector.get_indexes('entradas')}
+        assert 'entradas_eliminadas' in inspector.get_table_names()
+        assert all(autor.fecha_actualizacion.year > 1970 for autor in Autor.query)
+        assert {autor.token_version for autor in Autor.query} == {0}
+        assert 'ix_comentarios_entrada_estado_padre_id' in {i['name'] for i in inspector.get_indexes('comentarios')}
+        _comprobar_num_comentarios()
+    assert app.test_client().get('/autores').status_code == 200
+    # Los claims del login salen de token_version
+    from benchmarks.datos import EMAIL_ADMIN, CONTRASENA_BENCHMARK
+    assert app.test_client().post('/login', json={'email': EMAIL_ADMIN, 'contrasena': CONTRASENA_BENCHMARK}).status_code == 200
+    assert app.test_client().get('/categorias').status_code == 200
+    # Idempotente
+    assert '"aplicados": []' in runner.invoke(args=['actualizar-esquema']).output
+
+
+def _comprobar_num_comentarios():
+    aprobados = dict(db.session.query(Comentario.entrada_id, func.count(Comentario.id)).filter(
+        Comentario.estado == 'APROBADO'
+    ).group_by(Comentario.entrada_id).all())
+    assert any(aprobados.values())
+    for entrada in Entrada.query:
+        assert entrada.num_comentarios == aprobados.get(entrada.id, 0)
+
+
+def test_recalcular_comentarios(app):
+    with app.app_context(), db.engine.begin() as conexion:
+        conexion.exec_driver_sql('UPDATE entradas SET num_comentarios = 0')
+    resultado = app.test_cli_runner().invoke(args=['recalcular-comentarios'])
+    assert resultado.exit_code == 0, resultado.output
+    with app.app_context():
+        _comprobar_num_comentarios()
@@ -0,0 +1,43 @@
+# Blog_API/tests/test_importacion.py
+# Importación NDJSON: los valores con tipos inesperados son errores del registro, no del lote.
+import io
+import json
+import pytest
+from app.importacion import importar
+from app.models import Autor, Categoria, Entrada
+
+ENTRADA = {'tipo': 'entrada', 'titulo_es': 'Importada', 'resumen_es': 'r', 'contenido_es': 'c'}
+
+
+def _importar(app, *registros):
+    flujo = io.BytesIO(b''.join(json.dumps(r).encode('utf-8') + b'\n' for r in registros))
+    with app.app_context():
+        return importar(flujo).serialize()
+
+
+@pytest.mark.parametrize('referencia, error', [
+    ({'autor_id': [1]}, 'autor_id'),
+    ({'autor_id': {'id': 1}}, 'autor_id'),
+    ({'autor_id': True}, 'autor_id'),
+    ({'autor_id': '1'}, 'autor_id'),
+    ({'autor_email': ['admin']}, 'autor_email'),
+    ({'categoria_id': [1]}, 'categoria_id'),
+    ({'categoria_id': True}, 'categoria_id'),
+    ({'categoria': {'slug': 'x'}}, 'categoria'),
+])
+def test_referencias_con_tipo_invalido(app, referencia, error):
+    with app.app_context():
+        validos = {'autor_id': Autor.query.first().id, 'categoria_id': Categoria.query.first().id}
+        antes = Entrada.query.count()
+    informe = _importar(app, dict(ENTRADA, **dict(validos, **referencia)), dict(ENTRADA, **validos))
+    assert informe['num_errores'] == 1
+    assert informe['errores'][0]['linea'] == 1
+    assert f'"{error}"' in informe['errores'][0]['error']
+    assert informe['creados']['entrada'] == 1
+    with app.app_context():
+        assert Entrada.query.count() == antes + 1
+
+
+def test_tipo_no_textual(app):
+    informe = _importar(app, {'tipo': ['entrada']})
+    assert informe['num_errores'] == 1
@@ -0,0 +1,56 @@
+# Blog_API/tests/test_lotes.py
+# POST /batch: subpeticiones GET a main_bp despachadas dentro del proceso, cada una con su status.
+from app.consultas import ContadorConsultas
+
+
+def _lote(client, *peticiones, headers=None):
+    return client.post('/batch', json={'peticiones': list(peticiones)}, headers=headers)
+
+
+def test_status_por_subpeticion(client):
+    response = _lote(client,
+                     {'id': 'categorias', 'ruta': '/categorias'},
+                     {'id': 'falta', 'ruta': '/categorias/99999'},
+                     {'id': 'limite', 'ruta': '/entradas?limit=0'},
+                     {'ruta': '/entradas?limit=2'})
+    assert response.status_code == 200
+    respuestas = response.get_json()['respuestas']
+    assert [(r['id'], r['status']) for r in respuestas] == [('categorias', 200), ('falta', 404), ('limite', 400), (3, 200)]
+    assert len(respuestas[0]['cuerpo']) == 3
+    assert len(respuestas[3]['cuerpo']) == 2
+    assert respuestas[3]['cabeceras']['X-Next-Cursor']
+
+
+def test_hereda_la_autorizacion(app, cabeceras_admin):
+    client = app.test_client(use_cookies=False)
+    peticion = {'ruta': '/admin/mensajes_contacto'}
+    assert _lote(client, peticion).get_json()['respuestas'][0]['status'] == 401
+    assert _lote(client, peticion, headers=cabeceras_admin).get_json()['respuestas'][0]['status'] == 200
+
+
+def test_subpeticiones_identicas_una_vez(client):
+    with ContadorConsultas() as una:
+        client.get('/entradas?limit=5&fields=id,slug')
+    with ContadorConsultas() as lote:
+        response = _lote(client, {'ruta': '/entradas?limit=5&fields=id,slug'}, {'ruta': '/entradas?fields=id,slug&limit=5'})
+    primera, segunda = response.get_json()['respuestas']
+    assert primera['cuerpo'] == segunda['cuerpo']
+    assert lote.total == una.total
+
+
+def test_solo_get(client):
+    response = _lote(client, {'ruta': '/categorias'}, {'metodo': 'DELETE', 'ruta': '/admin/entradas/1'})
+    assert response.status_code == 400
+    assert 'GET' in response.get_json()['message']
+
+
+def test_solo_rutas_de_main_bp(client):
+    respuestas = _lote(client, {'ruta': '/static/app.js'}, {'ruta': '/no-existe'}).get_json()['respuestas']
+    assert [r['status'] for r in respuestas] == [404, 404]
+
+
+def test_lote_invalido(client, app):
+    assert client.post('/batch', json={'peticiones': []}).status_code == 400
+    assert _lote(client, {'ruta': 'categorias'}).status_code == 400
+    maximo = app.config['BATCH_MAX_REQUESTS']
+    assert _lote(client, *[{'ruta': '/categorias'}] * (maximo + 1)).status_code == 400
@@ -0,0 +1,44 @@
+# Blog_API/tests/test_pool_bd.py
+# Pool de conexiones: la espera publicada no incluye el tiempo de abrir conexiones y el descarte
+# tras un fork no se registra otra vez por cada app.
+import os
+import time
+import pytest
+from sqlalchemy import event
+from app.models import db
+from app.pool_bd import obtener_estadisticas_pool
+
+
+def test_espera_sin_tiempo_de_conexion(app):
+    with app.app_context():
+        engine = db.engine
+        engine.dispose()
+        event.listen(engine, 'do_connect', lambda *args: time.sleep(0.2))
+        with engine.connect():
+            pass
+        resumen = obtener_estadisticas_pool().resumen()
+    assert resumen['checkouts'] >= 1
+    assert resumen['maxima_ms'] < 100
+
+
+def test_un_solo_hook_de_fork(crear_app, monkeypatch):
+    def registrar(**kwargs):
+        raise AssertionError('init_pool no debe registrar hooks de fork')
+    monkeypatch.setattr(os, 'register_at_fork', registrar)
+    crear_app()
+    crear_app()
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='requiere fork()')
+def test_descarta_el_pool_tras_fork(app):
+    with app.app_context():
+        engine = db.engine
+        with engine.connect():
+            pass
+        pool = engine.pool
+        pid = os.fork()
+        if pid == 0:
+            os._exit(0 if engine.pool is not pool else 1)
+        _, estado = os.waitpid(pid, 0)
+    assert os.WEXITSTATUS(estado) == 0
+    assert engine.pool is pool
@@ -0,0 +1,114 @@
+# Blog_API/tests/test_replicas.py
+# Réplicas de lectura con dos ficheros SQLite: la réplica es una copia de la primaria que no recibe
+# las escrituras posteriores (una réplica con retraso), así que cada lectura dice de dónde salió.
+import sqlite3
+import time
+import pytest
+from app.models import db
+from app.replicas import CABECERA_PRIMARIA, COOKIE_PRIMARIA, PREFIJO_BIND
+from benchmarks.datos import EMAIL_ADMIN, CONTRASENA_BENCHMARK
+from conftest import poblar
+
+
+@pytest.fixture(autouse=True)
+def _olvidar_binds():
+    # Flask-SQLAlchemy registra un MetaData por bind en el objeto db global: sin quitarlos,
+    # db.create_all() de las apps sin réplicas de otras pruebas buscaría 'replica_0'
+    yield
+    for clave in [c for c in db.metadatas if isinstance(c, str) and c.startswith(PREFIJO_BIND)]:
+        del db.metadatas[clave]
+
+
+def _copiar(origen, destino):
+    with sqlite3.connect(origen) as fuente, sqlite3.connect(destino) as copia:
+        fuente.backup(copia)
+
+
+@pytest.fixture
+def crear_app_replica(crear_app, tmp_path):
+    """crear_app con DATABASE_REPLICA_URIS apuntando a una copia de la primaria ya poblada."""
+    def crear(**entorno):
+        app = crear_app(**entorno)
+        poblar(app)
+        _copiar(tmp_path / 'blog.db', tmp_path / 'replica.db')
+        return crear_app(DATABASE_REPLICA_URIS=f"sqlite:///{tmp_path / 'replica.db'}", **entorno)
+    return crear
+
+
+def _cabeceras_admin(client):
+    token = client.post('/login', json={'email': EMAIL_ADMIN, 'contrasena': CONTRASENA_BENCHMARK}).get_json()['access_token']
+    return {'Authorization': f'Bearer {token}'}
+
+
+def _renombrar(client, nombre):
+    """Escribe en la primaria; la réplica conserva el nombre anterior."""
+    response = client.put('/categorias/1', json={'nombre_es': nombre}, headers=_cabeceras_admin(client))
+    assert response.status_code == 200, response.get_data(as_text=True)
+    return response
+
+
+def _nombre(response):
+    return response.get_json()['nombre_es']
+
+
+def test_lecturas_van_a_la_replica(crear_app_replica):
+    app = crear_app_replica()
+    client = app.test_client(use_cookies=False)
+    _renombrar(client, 'Sólo en la primaria')
+    assert _nombre(client.get('/categorias/1')) != 'Sólo en la primaria'
+    assert app.extensions['replicas'].estado()[0]['sana']
+
+
+def test_cabecera_de_primaria_tras_escribir(crear_app_replica):
+    app = crear_app_replica(REPLICA_STICKY_SECONDS='30')
+    client = app.test_client(use_cookies=False)
+    response = _renombrar(client, 'Recién escrita')
+    assert COOKIE_PRIMARIA in response.headers['Set-Cookie']
+    hasta = response.headers[CABECERA_PRIMARIA]
+    assert time.time() < int(hasta) <= time.time() + 30
+    assert CABECERA_PRIMARIA in response.headers['Access-Control-Expose-Headers']
+
+    # Sin cookies (fetch desde otro origen) basta con reenviar la cabecera
+    assert _nombre(client.get('/categorias/1', headers={CABECERA_PRIMARIA: hasta})) == 'Recién escrita'
+    assert _nombre(client.get('/categorias/1')) != 'Recién escrita'
+    # Un plazo vencido o más largo que REPLICA_STICKY_SECONDS no fija el cliente a la primaria
+    for hasta in (time.time() - 1, time.time() + 3600, 'x'):
+        assert _nombre(client.get('/categorias/1', headers={CABECERA_PRIMARIA: str(hasta)})) != 'Recién escrita'
+
+
+def test_cookie_de_primaria(crear_app_replica):
+    app = crear_app_replica()
+    client = app.test_client()
+    _renombrar(client, 'Recién escrita')
+    assert _nombre(client.get('/categorias/1')) == 'Recién escrita'
+
+
+def test_no_cachea_lecturas_de_replica_en_el_plazo(crear_app_replica):
+    app = crear_app_replica(RESPONSE_CACHE_ENABLED='True', REPLICA_STICKY_SECONDS='30')
+    client = app.test_client(use_cookies=False)
+    assert client.get('/categorias').headers['X-Cache'] == 'MISS'
+    assert client.get('/categorias').headers['X-Cache'] == 'HIT'
+    _renombrar(client, 'Recién escrita')
+    # La réplica aún no tiene el cambio: se sirve, pero no se guarda
+    for _ in range(2):
+        response = client.get('/categorias')
+        assert response.headers['X-Cache'] == 'MISS'
+        assert 'Recién escrita' not in response.get_data(as_text=True)
+    # Las tablas sin escrituras recientes se siguen guardando
+    client.get('/autores')
+    assert client.get('/autores').headers['X-Cache'] == 'HIT'
+
+
+def test_replica_caida_lee_de_la_primaria(crear_app, tmp_path):
+    poblar(crear_app())
+    app = crear_app(DATABASE_REPLICA_URIS=f"sqlite:///{tmp_path / 'no-existe' / 'replica.db'}",
+                    REPLICA_RETRY_SECONDS='60')
+    client = app.test_client(use_cookies=False)
+    # La petición que descubre el fallo puede responder con error; las siguientes van a la primaria
+    client.get('/categorias/1')
+    estado = app.extensions['replicas'].estado()[0]
+    assert not estado['sana'] and estado['fallos'] == 1
+    response = client.get('/categorias/1')
+    assert response.status_code == 200
+    assert _nombre(response)
+    assert app.extensions['replicas'].estado()[0]['fallos'] == 1
@@ -0,0 +1,22 @@
+# Blog_API/tests/test_serializacion.py
+# Caché de esquemas compilados: acotada aunque ?fields= admita cualquier subconjunto de campos.
+from app import serializacion
+from app.models import Entrada, CAMPOS_ENTRADA
+
+
+def test_esquemas_acotados(monkeypatch):
+    monkeypatch.setattr(serializacion, 'MAX_ESQUEMAS', 3)
+    monkeypatch.setattr(serializacion, '_esquemas', serializacion.OrderedDict())
+    primero = serializacion.esquema_de(Entrada, ('id',))
+    for campo in CAMPOS_ENTRADA[1:6]:
+        serializacion.esquema_de(Entrada, ('id', campo))
+        # El más usado no se expulsa
+        assert serializacion.esquema_de(Entrada, ('id',)) is primero
+    assert len(serializacion._esquemas) == 3
+
+
+def test_fields_en_cualquier_orden_comparten_esquema(client, monkeypatch):
+    monkeypatch.setattr(serializacion, '_esquemas', serializacion.OrderedDict())
+    client.get('/entradas?limit=5&fields=slug,id')
+    client.get('/entradas?limit=5&fields=id,slug,id')
+    assert len(serializacion._esquemas) == 1
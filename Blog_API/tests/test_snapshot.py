@@ -0,0 +1,43 @@
+# Blog_API/tests/test_snapshot.py
+# Instantánea estática: lo que no pasa por el diario de entradas fuerza una regeneración completa.
+import io
+import json
+import pytest
+from app.importacion import importar
+from app.models import Autor, Categoria
+from app.snapshot import generar_snapshot
+from conftest import poblar
+
+
+@pytest.fixture
+def app_snapshot(crear_app, tmp_path):
+    app = crear_app(SNAPSHOT_DIR=str(tmp_path / 'estatico'))
+    poblar(app)
+    with app.app_context():
+        generar_snapshot(app.config['SNAPSHOT_DIR'])
+    return app
+
+
+def test_importacion_fuerza_ejecucion_completa(app_snapshot, tmp_path):
+    directorio = tmp_path / 'estatico'
+    with app_snapshot.app_context():
+        registro = {'tipo': 'entrada', 'slug': 'importada', 'titulo_es': 'Importada', 'resumen_es': 'r',
+                    'contenido_es': 'c', 'estado': 'publicado', 'fecha_publicacion': '2024-01-01T00:00:00',
+                    'autor_id': Autor.query.first().id, 'categoria_id': Categoria.query.first().id}
+        informe = importar(io.BytesIO(json.dumps(registro).encode('utf-8') + b'\n'))
+        assert informe.creados['entrada'] == 1
+        modo, _ = generar_snapshot(str(directorio), incremental=True)
+    assert modo == 'completo'
+    assert (directorio / 'entradas' / 'importada.json').exists()
+
+
+def test_completo_respeta_sitemaps_ajenos(app_snapshot, tmp_path):
+    sitemaps = tmp_path / 'estatico' / 'sitemaps'
+    for nombre in ('entradas-99.xml', 'entradas-archivo.xml', 'entradas-1.xml.bak'):
+        (sitemaps / nombre).write_text('<urlset/>')
+    with app_snapshot.app_context():
+        generar_snapshot(app_snapshot.config['SNAPSHOT_DIR'])
+    assert not (sitemaps / 'entradas-99.xml').exists()
+    assert (sitemaps / 'entradas-archivo.xml').exists()
+    assert (sitemaps / 'entradas-1.xml.bak').exists()
+    assert (sitemaps / 'entradas-0.xml').exists()
@@ -0,0 +1,62 @@
+# Blog_API/tests/test_validadores.py
+# El ETag de una entrada cambia cuando cambian sus comentarios o etiquetas, no sólo sus columnas;
+# el de una página de /entradas sólo depende de las filas de esa página.
+from app.models import db, Entrada, Etiqueta, EntradaEtiqueta
+
+
+def _etag(client, url):
+    response = client.get(url)
+    assert response.status_code == 200
+    return response.headers['ETag']
+
+
+def test_etag_cambia_al_moderar(client, cabeceras_admin, app):
+    with app.app_context():
+        entrada = Entrada.query.filter_by(slug='entrada-1').one()
+        comentario_id = entrada.comentarios[0].id
+        estado = entrada.comentarios[0].estado
+    urls = ['/entradas?slug=entrada-1', '/entradas?limit=5&fields=id,num_comentarios']
+    antes = [_etag(client, url) for url in urls]
+    nuevo = 'SPAM' if estado != 'SPAM' else 'APROBADO'
+    response = client.put('/admin/comentarios/estado', json={'ids': [comentario_id], 'estado': nuevo},
+                          headers=cabeceras_admin)
+    assert response.status_code == 200
+    assert [_etag(client, url) for url in urls] != antes
+    assert client.get(urls[0], headers={'If-None-Match': antes[0]}).status_code == 200
+
+
+def test_etag_cambia_con_las_etiquetas(client, app):
+    url = '/entradas?slug=entrada-1'
+    antes = _etag(client, url)
+    with app.app_context():
+        entrada = Entrada.query.filter_by(slug='entrada-1').one()
+        libre = Etiqueta.query.filter(Etiqueta.id.notin_([e.id for e in entrada.etiquetas])).first()
+        db.session.add(EntradaEtiqueta(entrada_id=entrada.id, etiqueta_id=libre.id))
+        db.session.commit()
+    assert _etag(client, url) != antes
+
+
+def test_etag_estable_sin_cambios(client):
+    url = '/entradas?slug=entrada-1'
+    etag = _etag(client, url)
+    assert client.get(url, headers={'If-None-Match': etag}).status_code == 304
+
+
+def test_etag_de_pagina(client, cabeceras_admin, app):
+    url = '/entradas?limit=3'
+    response = client.get(url)
+    etag, en_pagina = response.headers['ETag'], [e['id'] for e in response.get_json()]
+    assert client.get(url, headers={'If-None-Match': etag}).status_code == 304
+    with app.app_context():
+        fuera = Entrada.query.filter(Entrada.id.notin_(en_pagina), Entrada.estado == 'publicado').first().id
+        entrada = db.session.get(Entrada, en_pagina[0])
+        libre = Etiqueta.query.filter(Etiqueta.id.notin_([e.id for e in entrada.etiquetas])).first()
+    # Editar una entrada de otra página no invalida esta
+    response = client.put(f'/admin/entradas/{fuera}', json={'resumen_es': 'Otro resumen'}, headers=cabeceras_admin)
+    assert response.status_code == 200
+    assert _etag(client, url) == etag
+    # Etiquetar una entrada de la página sí
+    with app.app_context():
+        db.session.add(EntradaEtiqueta(entrada_id=en_pagina[0], etiqueta_id=libre.id))
+        db.session.commit()
+    assert _etag(client, url) != etag
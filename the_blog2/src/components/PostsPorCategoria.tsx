@@ -1,4 +1,4 @@
-import React, { useEffect, useState, useMemo } from "react";
+import React, { useEffect, useState, useMemo, useRef } from "react";
 import { useParams, Link } from "react-router-dom";
 import { useLanguage } from "../features/LanguageContext";
 import type { LanguageCode } from "../features/LanguageContext";
@@ -30,11 +30,13 @@ interface BlogPost {
   titulo_de?: string;
   resumen_de?: string;
   contenido_de?: string;
+  autor_nombre?: string;
 }
 
-interface Author {
-  id: number;
-  nombre: string;
+interface CategoryFeedResponse {
+  categoria: Category;
+  entradas: BlogPost[];
+  next_cursor: string | null;
 }
 
 // --- Translations ---
@@ -84,6 +86,31 @@ const PostsCategoryTranslations: Record<
     EN: "Category not found",
     DE: "Kategorie nicht gefunden",
   },
+  loadMore: {
+    ES: "Cargar más entradas",
+    EN: "Load more posts",
+    DE: "Weitere Beiträge laden",
+  },
+  loadingMore: {
+    ES: "Cargando...",
+    EN: "Loading...",
+    DE: "Wird geladen...",
+  },
+};
+
+// Entradas por página del feed de categoría (paginado por cursor en el servidor)
+const PAGE_SIZE = 20;
+
+const buildFeedUrl = (
+  baseUrl: string,
+  categorySlug: string,
+  cursor: string | null
+): string => {
+  const params = new URLSearchParams({ limit: String(PAGE_SIZE) });
+  if (cursor) params.set("after", cursor);
+  return `${baseUrl}/categorias/${encodeURIComponent(
+    categorySlug
+  )}/entradas?${params.toString()}`;
 };
 
 const getLabel = (
@@ -144,9 +171,14 @@ const PostsPorCategoria: React.FC = () => {
 
   const [filteredPosts, setFilteredPosts] = useState<BlogPost[]>([]);
   const [currentCategory, setCurrentCategory] = useState<Category | null>(null);
-  const [authors, setAuthors] = useState<Author[]>([]);
   const [isLoading, setIsLoading] = useState<boolean>(true);
   const [error, setError] = useState<string | null>(null);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [isLoadingMore, setIsLoadingMore] = useState<boolean>(false);
+  const [loadMoreError, setLoadMoreError] = useState<string | null>(null);
+  // Categoría mostrada: una página pedida para otra categoría se descarta
+  const currentSlugRef = useRef(slug);
+  currentSlugRef.current = slug;
 
   const API_BASE_URL = "http://127.0.0.1:5000";
 
@@ -157,54 +189,72 @@ const PostsPorCategoria: React.FC = () => {
       return;
     }
 
+    // Al cambiar de categoría se descarta la respuesta de la anterior si llega tarde
+    const controller = new AbortController();
+
     const fetchData = async () => {
       setIsLoading(true);
       setError(null);
+      setNextCursor(null);
+      setLoadMoreError(null);
       try {
-        const [categoriesRes, postsRes, authorsRes] = await Promise.all([
-          fetch(`${API_BASE_URL}/categorias`),
-          fetch(`${API_BASE_URL}/entradas`),
-          fetch(`${API_BASE_URL}/autores`),
-        ]);
-
-        if (!categoriesRes.ok) throw new Error("Failed to fetch categories");
-        if (!postsRes.ok) throw new Error("Failed to fetch posts");
-        if (!authorsRes.ok) throw new Error("Failed to fetch authors");
-
-        const allCategories: Category[] = await categoriesRes.json();
-        const allPosts: BlogPost[] = await postsRes.json();
-        const allAuthors: Author[] = await authorsRes.json();
+        // Un único endpoint paginado en servidor: categoría, entradas publicadas y nombre de autor
+        const response = await fetch(buildFeedUrl(API_BASE_URL, slug, null), {
+          signal: controller.signal,
+        });
 
-        setAuthors(allAuthors);
-
-        const foundCategory = allCategories.find((cat) => cat.slug === slug);
-        if (!foundCategory) {
+        if (response.status === 404) {
           setError(`Category with slug "${slug}" not found.`);
           setCurrentCategory(null);
           setFilteredPosts([]);
-        } else {
-          setCurrentCategory(foundCategory);
-          const postsForCategory = allPosts.filter(
-            (post) => post.categoria_id === foundCategory.id
-          );
-          setFilteredPosts(postsForCategory);
+          return;
         }
+        if (!response.ok) throw new Error("Failed to fetch posts");
+
+        const feed: CategoryFeedResponse = await response.json();
+        setCurrentCategory(feed.categoria);
+        setFilteredPosts(feed.entradas);
+        setNextCursor(feed.next_cursor);
       } catch (e: unknown) {
+        if (controller.signal.aborted) return;
         if (e instanceof Error) setError(e.message);
         else setError("An unknown error occurred.");
         setFilteredPosts([]);
         setCurrentCategory(null);
       } finally {
-        setIsLoading(false);
+        if (!controller.signal.aborted) setIsLoading(false);
       }
     };
 
     fetchData();
+    return () => controller.abort();
   }, [slug, API_BASE_URL]);
 
-  const getAuthorName = (autorId: number): string => {
-    const author = authors.find((auth) => auth.id === autorId);
-    return author ? author.nombre : getLabel("defaultAuthor", currentLanguage);
+  // Siguiente página del feed a partir de next_cursor
+  const loadMore = async () => {
+    if (!slug || !nextCursor || isLoadingMore) return;
+    const requestedSlug = slug;
+    setIsLoadingMore(true);
+    setLoadMoreError(null);
+    try {
+      const response = await fetch(buildFeedUrl(API_BASE_URL, slug, nextCursor));
+      if (!response.ok) throw new Error("Failed to fetch posts");
+      const feed: CategoryFeedResponse = await response.json();
+      if (currentSlugRef.current !== requestedSlug) return;
+      setFilteredPosts((prev) => {
+        const seen = new Set(prev.map((post) => post.id));
+        return [...prev, ...feed.entradas.filter((post) => !seen.has(post.id))];
+      });
+      setNextCursor(feed.next_cursor);
+    } catch (e: unknown) {
+      setLoadMoreError(e instanceof Error ? e.message : "An unknown error occurred.");
+    } finally {
+      setIsLoadingMore(false);
+    }
+  };
+
+  const getAuthorName = (post: BlogPost): string => {
+    return post.autor_nombre || getLabel("defaultAuthor", currentLanguage);
   };
 
   const formatDate = (dateString: string): string => {
@@ -340,7 +390,7 @@ const PostsPorCategoria: React.FC = () => {
                   </p>
                   <div className="posts-categoria-meta">
                     <div className="posts-categoria-author">
-                      {getAuthorName(post.autor_id)}
+                      {getAuthorName(post)}
                     </div>
                     <div className="posts-categoria-date">
                       {formatDate(post.fecha_publicacion)}
@@ -356,6 +406,27 @@ const PostsPorCategoria: React.FC = () => {
         </div>
       )}
 
+      {/* Pagination: more posts behind next_cursor */}
+      {nextCursor && (
+        <div className="posts-categoria-load-more">
+          {loadMoreError && (
+            <div className="posts-categoria-error">
+              {getLabel("errorMessage", currentLanguage)}: {loadMoreError}
+            </div>
+          )}
+          <button
+            type="button"
+            className="posts-categoria-load-more-button"
+            onClick={loadMore}
+            disabled={isLoadingMore}
+          >
+            {isLoadingMore
+              ? getLabel("loadingMore", currentLanguage)
+              : getLabel("loadMore", currentLanguage)}
+          </button>
+        </div>
+      )}
+
       {/* Navigation back to categories */}
       <nav className="posts-categoria-navigation">
         <Link to="/" className="posts-categoria-back-link">
@@ -1,4 +1,4 @@
-import React, { useEffect, useState, useCallback } from "react";
+import React, { useEffect, useState, useCallback, useRef } from "react";
 import { useNavigate } from "react-router-dom";
 import { useAuth } from "../../context/AuthContext";
 
@@ -32,6 +32,9 @@ interface ApiResponse {
 }
 
 const API_BASE_URL = "http://127.0.0.1:5000"; // Considera mover esto a variables de entorno
+// Tras escribir, la API devuelve hasta cuándo leer de la primaria (réplicas); se reenvía en
+// las lecturas siguientes porque la cookie equivalente no viaja en un fetch entre orígenes.
+const READ_PRIMARY_HEADER = "X-Read-Primary-Until";
 const ITEMS_PER_PAGE = 10; // Coincide con el per_page por defecto del backend o el que desees usar
 
 const ManagePostsPage: React.FC = () => {
@@ -45,6 +48,7 @@ const ManagePostsPage: React.FC = () => {
 
   const { token } = useAuth();
   const navigate = useNavigate();
+  const readPrimaryUntil = useRef<string | null>(null);
 
   const fetchPosts = useCallback(
     async (page: number, currentSearchTerm: string = "") => {
@@ -64,11 +68,13 @@ const ManagePostsPage: React.FC = () => {
       }
 
       try {
-        const response = await fetch(url, {
-          headers: {
-            Authorization: `Bearer ${token}`,
-          },
-        });
+        const headers: Record<string, string> = {
+          Authorization: `Bearer ${token}`,
+        };
+        if (readPrimaryUntil.current) {
+          headers[READ_PRIMARY_HEADER] = readPrimaryUntil.current;
+        }
+        const response = await fetch(url, { headers });
 
         if (!response.ok) {
           let errorData = {
@@ -167,6 +173,8 @@ const ManagePostsPage: React.FC = () => {
         method: "DELETE",
         headers: { Authorization: `Bearer ${token}` },
       });
+      readPrimaryUntil.current =
+        response.headers.get(READ_PRIMARY_HEADER) ?? readPrimaryUntil.current;
 
       if (!response.ok) {
         let errorData = { message: "Error al eliminar la entrada." };